@@ -1,9 +1,41 @@
 import logging
+import os
 from sanic import Sanic
+
+from satellite_tracker import run_catalog_refresher
+from satellite_tracker.tle_importer import run_catalog_publisher
+from satellite_tracker.shared_catalog import (
+    create_shared_catalog_control,
+    destroy_shared_catalog,
+    shared_catalog_name,
+    shared_memory_supported,
+)
+from .executor import (
+    COMPUTE_PROCESS_NAME,
+    DEFAULT_COMPUTE_PROCESSES,
+    DEFAULT_COMPUTE_QUEUE_DEPTH,
+    LOG_DATE_FORMAT,
+    LOG_FORMAT,
+    ComputeExecutor,
+    create_compute_queues,
+    run_compute_process,
+    worker_compute_channel,
+)
+from .result_cache import (
+    DEFAULT_RESULT_CACHE_QUANTIZATION,
+    DEFAULT_RESULT_CACHE_SIZE,
+    DEFAULT_RESULT_CACHE_TTL_S,
+    ResultCache,
+)
+from .single_flight import SingleFlight
 from .routes.risk import bp as risk_blueprint
 from .routes.health import bp as health_blueprint
 from .routes.web import web_bp as web_blueprint
 from .routes.data import data_bp as data_blueprint
+from .routes.conjunctions import conjunctions_bp as conjunctions_blueprint
+from .routes.congestion import congestion_bp as congestion_blueprint
+
+logger = logging.getLogger(__name__)
 
 
 def create_app():
@@ -13,8 +45,8 @@ def create_app():
     # Configure logging
     logging.basicConfig(
         level=logging.INFO,
-        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S",
+        format=LOG_FORMAT,
+        datefmt=LOG_DATE_FORMAT,
     )
 
     app = Sanic("SatelliteTrackerAPI")
@@ -25,10 +57,103 @@ def create_app():
     app.config.OAS_TITLE = "Satellite Tracker API"
     app.config.CORS_ORIGINS = "*"
 
+    # Публиковать каталог TLE в shared memory для всех воркеров; по умолчанию
+    # включено там, где есть /dev/shm (можно отключить переменной окружения
+    # SANIC_CATALOG_SHARED_MEMORY=false)
+    app.config.CATALOG_SHARED_MEMORY = app.config.get(
+        "CATALOG_SHARED_MEMORY", shared_memory_supported()
+    )
+
+    # Число вычислительных процессов для тяжелых расчетов на каждый воркер и предельное
+    # число задач в очереди сверх числа процессов (SANIC_COMPUTE_PROCESSES=0 — расчет
+    # в потоке воркера, без отдельных процессов)
+    app.config.COMPUTE_PROCESSES = app.config.get("COMPUTE_PROCESSES", DEFAULT_COMPUTE_PROCESSES)
+    app.config.COMPUTE_QUEUE_DEPTH = app.config.get("COMPUTE_QUEUE_DEPTH", DEFAULT_COMPUTE_QUEUE_DEPTH)
+
+    # Кэш ответов /orbit_risk и /takeoff_risk в каждом воркере: размер, срок жизни
+    # записи и шаги округления параметров запроса (SANIC_RESULT_CACHE_SIZE=0 — без кэша)
+    app.config.RESULT_CACHE_SIZE = app.config.get("RESULT_CACHE_SIZE", DEFAULT_RESULT_CACHE_SIZE)
+    app.config.RESULT_CACHE_TTL_S = app.config.get("RESULT_CACHE_TTL_S", DEFAULT_RESULT_CACHE_TTL_S)
+    app.config.RESULT_CACHE_QUANTIZATION = app.config.get(
+        "RESULT_CACHE_QUANTIZATION", dict(DEFAULT_RESULT_CACHE_QUANTIZATION)
+    )
+
     # Register blueprints
     app.blueprint(risk_blueprint)
     app.blueprint(health_blueprint)
     app.blueprint(web_blueprint)
     app.blueprint(data_blueprint)
+    app.blueprint(conjunctions_blueprint)
+    app.blueprint(congestion_blueprint)
+
+    # В режиме нескольких воркеров каталог обновляет отдельный процесс и публикует
+    # снимки в shared memory; воркеры подключают их только для чтения.
+    @app.main_process_start
+    async def create_shared_catalog(app):
+        app.ctx.shared_catalog = None
+        if app.config.CATALOG_SHARED_MEMORY and not shared_memory_supported():
+            logger.warning(
+                "Общий каталог недоступен на этой платформе (нет /dev/shm): "
+                "каждый воркер обновляет каталог сам."
+            )
+        elif app.config.CATALOG_SHARED_MEMORY:
+            name = f"rt0s_catalog_{os.getpid()}"
+            app.ctx.shared_catalog = (name, create_shared_catalog_control(name))
+
+    @app.main_process_ready
+    async def start_catalog_publisher(app):
+        if app.ctx.shared_catalog is not None:
+            name, _ = app.ctx.shared_catalog
+            app.manager.manage("CatalogPublisher", run_catalog_publisher, {"name": name})
+
+    # Вычислительные процессы запускает менеджер Sanic (см. ComputeExecutor):
+    # у каждого воркера своя группа процессов и своя пара очередей
+    @app.main_process_ready
+    async def start_compute_processes(app):
+        if app.config.COMPUTE_PROCESSES > 0:
+            create_compute_queues(app.shared_ctx, app.state.workers)
+            channels = zip(app.shared_ctx.compute_tasks, app.shared_ctx.compute_results)
+            for slot, (tasks, results) in enumerate(channels):
+                app.manager.manage(
+                    f"{COMPUTE_PROCESS_NAME}-{slot}",
+                    run_compute_process,
+                    {"tasks": tasks, "results": results},
+                    workers=app.config.COMPUTE_PROCESSES,
+                )
+
+    @app.main_process_stop
+    async def remove_shared_catalog(app):
+        if app.ctx.shared_catalog is not None:
+            destroy_shared_catalog(*app.ctx.shared_catalog)
+
+    # Без общего каталога (один процесс) каталог TLE обновляется в фоне
+    # в самом воркере; запросы обслуживаются текущим снимком
+    @app.after_server_start
+    async def start_catalog_refresher(app):
+        if shared_catalog_name() is None:
+            app.add_task(run_catalog_refresher(), name="catalog_refresher")
+
+    @app.before_server_stop
+    async def stop_catalog_refresher(app):
+        if shared_catalog_name() is None:
+            await app.cancel_task("catalog_refresher", raise_exception=False)
+
+    @app.after_server_start
+    async def start_compute_executor(app):
+        channel = worker_compute_channel(app.shared_ctx)
+        if channel is None and app.config.COMPUTE_PROCESSES > 0:
+            logger.info("У воркера нет вычислительных процессов: тяжелые расчеты выполняются в потоке.")
+        app.ctx.compute = ComputeExecutor(app.config.COMPUTE_PROCESSES, app.config.COMPUTE_QUEUE_DEPTH, channel)
+        app.add_task(app.ctx.compute.warm_up(), name="compute_warm_up")
+
+    @app.after_server_start
+    async def create_request_caches(app):
+        app.ctx.single_flight = SingleFlight()
+        app.ctx.result_cache = ResultCache(app.config.RESULT_CACHE_SIZE, app.config.RESULT_CACHE_TTL_S)
+
+    @app.before_server_stop
+    async def stop_compute_executor(app):
+        await app.cancel_task("compute_warm_up", raise_exception=False)
+        app.ctx.compute.shutdown()
 
     return app
@@ -0,0 +1,316 @@
+import asyncio
+import itertools
+import logging
+import multiprocessing
+import os
+import pickle
+import queue
+import signal
+import threading
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from sanic.response import json
+from sanic.worker.process import WorkerProcess
+
+from satellite_tracker import TLECatalog, get_cached_catalog, get_catalog_async
+from satellite_tracker.propagation import get_catalog_satrecs
+from satellite_tracker.shared_catalog import StaleCatalogError
+
+logger = logging.getLogger(__name__)
+
+# Формат логов сервиса; вычислительные процессы настраивают логирование заново
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+LOG_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Значения по умолчанию для настроек COMPUTE_PROCESSES и COMPUTE_QUEUE_DEPTH
+DEFAULT_COMPUTE_PROCESSES = 2
+DEFAULT_COMPUTE_QUEUE_DEPTH = 8
+
+# Через сколько секунд клиенту предлагается повторить запрос при переполнении очереди
+BUSY_RETRY_AFTER_S = 1
+
+# Как часто воркер проверяет, живы ли процессы, выполняющие его задачи
+RESULT_POLL_INTERVAL_S = 1.0
+
+# Имя группы вычислительных процессов воркера в менеджере Sanic
+COMPUTE_PROCESS_NAME = "Compute"
+
+# Сообщения вычислительного процесса воркеру: задача взята / задача выполнена
+_TASK_STARTED = "started"
+_TASK_DONE = "done"
+
+
+class ComputeBusyError(Exception):
+    """
+    Очередь тяжелых вычислений заполнена, запрос нужно повторить позже.
+    """
+
+
+def create_compute_queues(shared_ctx, workers: int) -> None:
+    """
+    Создает очереди задач и результатов для каждого серверного воркера. Вызывается
+    в главном процессе до запуска воркеров: очереди передаются им через shared_ctx.
+    """
+    context = multiprocessing.get_context("spawn")
+    shared_ctx.compute_tasks = tuple(context.Queue() for _ in range(workers))
+    shared_ctx.compute_results = tuple(context.Queue() for _ in range(workers))
+
+
+def worker_compute_channel(shared_ctx) -> Optional[Tuple[Any, Any]]:
+    """
+    Очереди задач и результатов текущего воркера (по его идентификатору в менеджере
+    Sanic) или None, если у воркера нет своих вычислительных процессов: приложение
+    запущено в одном процессе без менеджера или воркер добавлен после запуска.
+    """
+    tasks = getattr(shared_ctx, "compute_tasks", ())
+    ident = os.environ.get("SANIC_WORKER_IDENTIFIER", "")
+    if not ident.startswith(WorkerProcess.SERVER_IDENTIFIER):
+        return None
+    try:
+        slot = int(ident[len(WorkerProcess.SERVER_IDENTIFIER):])
+    except ValueError:
+        return None
+    if not 0 <= slot < len(tasks):
+        return None
+    return tasks[slot], shared_ctx.compute_results[slot]
+
+
+def _warm_up(catalog: TLECatalog) -> int:
+    """
+    Готовит снимок каталога в вычислительном процессе заранее: модели SGP4
+    и индексы, чтобы первый запрос не платил за их построение.
+    """
+    get_catalog_satrecs(catalog)
+    catalog.shell_index
+    return len(catalog)
+
+
+def run_compute_process(tasks, results) -> None:
+    """
+    Точка входа вычислительного процесса. Процессами управляет менеджер Sanic
+    (app.manager.manage), каждый воркер получает свою группу процессов с общей
+    очередью задач.
+
+    Задача — (id, поколение каталога воркера, pickle функции и аргументов).
+    Каталог процесс берет сам через get_cached_catalog() именно для этого
+    поколения и никогда не загружает его с CelesTrak.
+    """
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT, datefmt=LOG_DATE_FORMAT)
+    # SIGTERM завершает процесс так же штатно, как SIGINT от менеджера Sanic
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    # Не ждать при выходе, пока завершившийся воркер заберет результаты
+    results.cancel_join_thread()
+    try:
+        while True:
+            task_id, generation, payload = tasks.get()
+            results.put((task_id, _TASK_STARTED, os.getpid()))
+            try:
+                function, args = pickle.loads(payload)
+                result = pickle.dumps((True, function(get_cached_catalog(generation), *args)))
+            except Exception as error:
+                try:
+                    result = pickle.dumps((False, error))
+                except Exception:
+                    result = pickle.dumps((False, RuntimeError(repr(error))))
+            results.put((task_id, _TASK_DONE, result))
+    except KeyboardInterrupt:
+        pass
+
+
+class ComputeExecutor:
+    """
+    Вычислительные процессы для тяжелых расчетов (пропагация, поиск пересечений
+    и сближений), чтобы они не блокировали event loop воркера Sanic.
+
+    Воркеры Sanic — демонические процессы и не могут запускать дочерние, поэтому
+    процессы запускает менеджер Sanic в главном процессе (см. run_compute_process),
+    а воркер обменивается с ними задачами через свою пару очередей `channel`.
+
+    Задача — функция уровня модуля вида function(catalog, *args): в процесс
+    передаются только аргументы и номер поколения каталога воркера. Число
+    одновременно принятых задач ограничено: сверх processes + queue_depth задачи
+    отклоняются с ComputeBusyError, а не копятся в очереди.
+
+    Без процессов (processes = 0 или у воркера нет своей пары очередей) задачи
+    выполняются в потоке (asyncio.to_thread) с текущим снимком каталога воркера.
+    """
+
+    def __init__(
+        self,
+        processes: int = DEFAULT_COMPUTE_PROCESSES,
+        queue_depth: int = DEFAULT_COMPUTE_QUEUE_DEPTH,
+        channel: Optional[Tuple[Any, Any]] = None,
+    ):
+        self.processes = max(0, int(processes)) if channel is not None else 0
+        self.max_pending = max(1, self.processes) + max(0, int(queue_depth))
+        self.pending = 0
+        self._tasks, self._results = channel if self.processes else (None, None)
+        # Номера задач уникальны и между перезапусками воркера: в очереди
+        # результатов могут остаться ответы его предыдущего процесса
+        self._task_ids = zip(itertools.repeat(os.getpid()), itertools.count())
+        self._futures: Dict[Tuple[int, int], asyncio.Future] = {}
+        # Какой процесс выполняет задачу: если он завершится аварийно, задача упадет
+        self._running: Dict[Tuple[int, int], int] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._reader: Optional[threading.Thread] = None
+        self._closed = threading.Event()
+        if self._tasks is not None:
+            self._loop = asyncio.get_running_loop()
+            self._reader = threading.Thread(target=self._read_results, name="compute-results", daemon=True)
+            self._reader.start()
+
+    async def warm_up(self) -> None:
+        """
+        Загружает каталог и модели SGP4 в вычислительные процессы заранее.
+        """
+        if self._tasks is None:
+            return
+        # Сначала каталог должен появиться в самом воркере: процессы берут тот же
+        # снимок из файлового кэша (или из shared memory) и сами его не загружают
+        catalog = await get_catalog_async()
+        sizes = await asyncio.gather(
+            *(self._submit(catalog.generation, _warm_up, ()) for _ in range(self.processes))
+        )
+        logger.info(f"Вычислительные процессы готовы: {self.processes}, каталог {sizes[0]} объектов.")
+
+    def _submit(self, generation: int, function: Callable[..., Any], args: tuple) -> asyncio.Future:
+        # Сериализация здесь, а не в фоновом потоке очереди: ошибка достанется вызывающему
+        payload = pickle.dumps((function, args))
+        task_id = next(self._task_ids)
+        future = self._loop.create_future()
+        self._futures[task_id] = future
+        self._tasks.put((task_id, generation, payload))
+        return future
+
+    def _read_results(self) -> None:
+        while not self._closed.is_set():
+            try:
+                message = self._results.get(timeout=RESULT_POLL_INTERVAL_S)
+            except queue.Empty:
+                message = None
+            except (EOFError, OSError):
+                break
+            try:
+                self._loop.call_soon_threadsafe(self._handle_result, message)
+            except RuntimeError:
+                # Event loop воркера уже закрыт
+                break
+
+    def _handle_result(self, message: Optional[tuple]) -> None:
+        if message is None:
+            self._check_processes()
+            return
+
+        task_id, kind, value = message
+        if task_id not in self._futures:
+            return
+        if kind == _TASK_STARTED:
+            self._running[task_id] = value
+            return
+
+        self._running.pop(task_id, None)
+        future = self._futures.pop(task_id)
+        if future.done():
+            return
+        ok, result = pickle.loads(value)
+        if ok:
+            future.set_result(result)
+        else:
+            future.set_exception(result)
+
+    def _check_processes(self) -> None:
+        for task_id, pid in list(self._running.items()):
+            try:
+                os.kill(pid, 0)
+            except ProcessLookupError:
+                del self._running[task_id]
+                future = self._futures.pop(task_id)
+                if not future.done():
+                    future.set_exception(
+                        BrokenProcessPool(f"Вычислительный процесс {pid} аварийно завершился во время расчета.")
+                    )
+
+    def _release(self, future: asyncio.Future) -> None:
+        self.pending -= 1
+        # Ошибка задачи, результат которой уже никто не ждет, не должна теряться молча
+        if not future.cancelled() and future.exception() is not None:
+            logger.debug(f"Задача вычислительного процесса завершилась ошибкой: {future.exception()}")
+
+    async def run(self, function: Callable[..., Any], *args: Any) -> Any:
+        """
+        Выполняет function(catalog, *args) в вычислительном процессе и возвращает результат.
+
+        Исключения:
+            ComputeBusyError: Уже принято max_pending задач или снимок каталога
+                воркера успел устареть и удален из shared memory.
+        """
+        if self.pending >= self.max_pending:
+            raise ComputeBusyError(f"Compute queue is full ({self.max_pending} tasks).")
+
+        self.pending += 1
+        try:
+            catalog = await get_catalog_async()
+            if self._tasks is None:
+                future = asyncio.ensure_future(asyncio.to_thread(function, catalog, *args))
+            else:
+                future = self._submit(catalog.generation, function, args)
+        except BaseException:
+            self.pending -= 1
+            raise
+
+        # Место в очереди освобождается, когда задача действительно завершилась,
+        # даже если клиент уже отключился и обработчик запроса отменен
+        future.add_done_callback(self._release)
+        try:
+            return await asyncio.shield(future)
+        except StaleCatalogError:
+            # Воркер еще не перешел на новый снимок; к повтору запроса перейдет
+            raise ComputeBusyError("Catalog snapshot was replaced, retry.") from None
+
+    def shutdown(self) -> None:
+        """
+        Останавливает чтение результатов и отменяет незавершенные задачи.
+        Сами процессы останавливает менеджер Sanic.
+        """
+        if self._reader is None:
+            return
+        self._closed.set()
+        self._reader.join()
+        self._reader = None
+        # Задачи, которые еще лежат в очереди, не должны задерживать выход воркера
+        self._tasks.cancel_join_thread()
+        for future in self._futures.values():
+            future.cancel()
+        self._futures.clear()
+        self._running.clear()
+
+
+async def run_compute(
+    app, function: Callable[..., Any], *args: Any, key: Optional[Hashable] = None
+) -> Any:
+    """
+    Выполняет тяжелый расчет через вычислительные процессы приложения.
+
+    Если задан `key` (нормализованные параметры запроса), одинаковые расчеты,
+    выполняющиеся одновременно для одного поколения каталога, объединяются
+    в один (см. SingleFlight).
+    """
+    if key is None:
+        return await app.ctx.compute.run(function, *args)
+
+    catalog = await get_catalog_async()
+    return await app.ctx.single_flight.run(
+        (key, catalog.generation), lambda: app.ctx.compute.run(function, *args)
+    )
+
+
+def busy_response():
+    """
+    Ответ 503 при переполненной очереди вычислений.
+    """
+    return json(
+        {"message": "Server is busy, retry later."},
+        status=503,
+        headers={"Retry-After": str(BUSY_RETRY_AFTER_S)},
+    )
@@ -0,0 +1,131 @@
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from utils.trajectory import ALTITUDE_QUANTUM_KM, LAUNCH_ANGLE_QUANTUM_DEG
+
+logger = logging.getLogger(__name__)
+
+# Значения по умолчанию для настроек RESULT_CACHE_SIZE и RESULT_CACHE_TTL_S.
+# Результат /takeoff_risk зависит от текущего момента (положение Земли и
+# объектов), поэтому срок жизни записи ограничен.
+DEFAULT_RESULT_CACHE_SIZE = 1024
+DEFAULT_RESULT_CACHE_TTL_S = 300.0
+
+# Шаг округления параметров запросов (RESULT_CACHE_QUANTIZATION). Параметры
+# запуска округляются так же, как в кэше траекторий.
+DEFAULT_RESULT_CACHE_QUANTIZATION = {
+    "height": 1.0,
+    "lat": LAUNCH_ANGLE_QUANTUM_DEG,
+    "lon": LAUNCH_ANGLE_QUANTUM_DEG,
+    "altitude": ALTITUDE_QUANTUM_KM,
+    "inclination": LAUNCH_ANGLE_QUANTUM_DEG,
+}
+
+
+def quantize_params(params: Dict[str, float], quantization: Dict[str, float]) -> Dict[str, float]:
+    """
+    Округляет параметры запроса до шагов из `quantization`; параметры без шага
+    не меняются. Расчет выполняется уже по округленным значениям, поэтому
+    ответ из кэша совпадает с ответом, посчитанным заново.
+    """
+    quantized = dict(params)
+    for name, step in quantization.items():
+        if name in quantized and step:
+            quantized[name] = round(round(quantized[name] / step) * step, 9)
+    return quantized
+
+
+class ResultCache:
+    """
+    Кэш ответов эндпоинтов с ограничением по размеру (LRU) и сроку жизни (TTL).
+
+    Каждая запись относится к поколению каталога TLE: как только приходит
+    запрос с новым поколением, кэш очищается целиком, и ответы по старому
+    снимку больше не выдаются.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_RESULT_CACHE_SIZE,
+        ttl_s: float = DEFAULT_RESULT_CACHE_TTL_S,
+    ):
+        self.max_entries = int(max_entries)
+        self.ttl_s = float(ttl_s)
+        self.generation: Optional[int] = None
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _follow_generation(self, generation: int) -> bool:
+        """
+        Переходит на новое поколение каталога. Возвращает False для устаревшего поколения.
+        """
+        if self.generation is not None and generation < self.generation:
+            return False
+        if generation != self.generation:
+            if self._entries:
+                logger.info(
+                    f"Кэш результатов очищен: поколение каталога {self.generation} -> {generation} "
+                    f"({len(self._entries)} записей)."
+                )
+                self._entries.clear()
+                self.invalidations += 1
+            self.generation = generation
+        return True
+
+    def get(self, key: Hashable, generation: int) -> Optional[Any]:
+        """
+        Возвращает сохраненный результат или None, если его нет или он устарел.
+        """
+        if self.max_entries <= 0 or not self._follow_generation(generation):
+            self.misses += 1
+            return None
+
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: Hashable, generation: int, value: Any) -> None:
+        """
+        Сохраняет результат, посчитанный по снимку каталога поколения `generation`.
+        """
+        if self.max_entries <= 0 or not self._follow_generation(generation):
+            return
+
+        self._entries[key] = (time.monotonic() + self.ttl_s, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Счетчики кэша для мониторинга.
+        """
+        requests = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_s": self.ttl_s,
+            "generation": self.generation,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / requests, 4) if requests else None,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
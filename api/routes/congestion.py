@@ -0,0 +1,136 @@
+import logging
+import math
+import time
+
+from sanic import Blueprint
+from sanic.response import json, raw
+
+from satellite_tracker import get_catalog_async
+
+logger = logging.getLogger(__name__)
+
+congestion_bp = Blueprint("congestion", url_prefix="/api")
+
+# Параметры запроса, по которым фильтруются ячейки карты
+_FILTERS = ("min_altitude", "max_altitude", "min_inclination", "max_inclination")
+
+# Окно куба по умолчанию и предельное число ячеек в ответе /congestion/cube
+CUBE_DEFAULT_WINDOW = {
+    "min_altitude": 0.0,
+    "max_altitude": 2000.0,
+    "min_inclination": 0.0,
+    "max_inclination": 180.0,
+}
+CUBE_DEFAULT_MAX_CELLS = 10000
+CUBE_MAX_CELLS_LIMIT = 100000
+
+
+@congestion_bp.get("/congestion")
+async def congestion(request):
+    """
+    Карта загруженности орбит всего каталога по ячейкам
+    (среднее движение 0.1 об/сут × наклонение 1°).
+
+    Карта пересчитывается при каждом обновлении каталога TLE, поэтому запрос
+    ничего не вычисляет: без фильтров отдается заранее закодированный JSON.
+
+    Параметры запроса (все необязательные):
+        min_altitude, max_altitude (float): Диапазон высот (км).
+        min_inclination, max_inclination (float): Диапазон наклонений (градусы).
+    """
+    request_start_time = time.time()
+    try:
+        filters = {name: float(request.args[name][0]) for name in _FILTERS if name in request.args}
+    except ValueError:
+        return json({"message": "Filters must be numbers."}, status=400)
+
+    try:
+        catalog = await get_catalog_async()
+        report = catalog.congestion_report
+
+        if filters:
+            body = report.encode(
+                report.select(
+                    filters.get("min_altitude"),
+                    filters.get("max_altitude"),
+                    filters.get("min_inclination"),
+                    filters.get("max_inclination"),
+                )
+            )
+        else:
+            body = report.json_bytes
+
+        logger.info(f"Запрос /congestion успешно обработан за {time.time() - request_start_time:.4f} сек.")
+        return raw(body, content_type="application/json")
+
+    except Exception as e:
+        logger.error(f"Ошибка в /congestion: {e}", exc_info=True)
+        return json({"message": "An error occurred"}, status=500)
+
+
+@congestion_bp.get("/congestion/cube")
+async def congestion_cube(request):
+    """
+    Тепловая карта количества объектов по высоте × наклонению (× RAAN) из
+    многоуровневого куба загруженности. Уровень разрешения выбирается самым
+    мелким, при котором окно дает не больше max_cells ячеек; если окно не
+    укладывается в max_cells ни на одном уровне, возвращается 400.
+
+    Параметры запроса (все необязательные):
+        min_altitude, max_altitude (float): Диапазон высот (км), по умолчанию 0–2000.
+        min_inclination, max_inclination (float): Диапазон наклонений (градусы), по умолчанию 0–180.
+        min_raan, max_raan (float): Диапазон RAAN (градусы); если задан, сетка трехмерная.
+        max_cells (int): Предельное число ячеек ответа, по умолчанию 10000.
+    """
+    request_start_time = time.time()
+    try:
+        window = {
+            name: float(request.args.get(name, default))
+            for name, default in CUBE_DEFAULT_WINDOW.items()
+        }
+        raan = {
+            name: float(request.args[name][0]) for name in ("min_raan", "max_raan") if name in request.args
+        }
+        max_cells = int(request.args.get("max_cells", CUBE_DEFAULT_MAX_CELLS))
+    except ValueError:
+        return json({"message": "Parameters must be numbers."}, status=400)
+
+    # nan и inf не квантуются на сетку уровней куба
+    if not all(math.isfinite(value) for value in (*window.values(), *raan.values())):
+        return json({"message": "Bounds must be finite numbers."}, status=400)
+    if window["min_altitude"] >= window["max_altitude"] or window["min_inclination"] >= window["max_inclination"]:
+        return json({"message": "Minimum must be less than maximum."}, status=400)
+    if not 1 <= max_cells <= CUBE_MAX_CELLS_LIMIT:
+        return json({"message": f"max_cells must be between 1 and {CUBE_MAX_CELLS_LIMIT}."}, status=400)
+
+    try:
+        catalog = await get_catalog_async()
+        cube = catalog.congestion_cube
+        try:
+            level, edges, counts = cube.grid(
+                window["min_altitude"],
+                window["max_altitude"],
+                window["min_inclination"],
+                window["max_inclination"],
+                raan.get("min_raan"),
+                raan.get("max_raan"),
+                max_cells=max_cells,
+            )
+        except ValueError as e:
+            return json({"message": str(e)}, status=400)
+
+        axes = ("altitude_edges", "inclination_edges", "raan_edges")
+        response = {
+            "generation": cube.generation,
+            "level": level.describe(),
+            **{axis: edge.tolist() for axis, edge in zip(axes, edges)},
+            "count": counts.tolist(),
+            "total": int(counts.sum()),
+        }
+
+        logger.info(f"Запрос /congestion/cube успешно обработан за {time.time() - request_start_time:.4f} сек.")
+        return json(response)
+
+    except Exception as e:
+        logger.error(f"Ошибка в /congestion/cube: {e}", exc_info=True)
+        return json({"message": "An error occurred"}, status=500)
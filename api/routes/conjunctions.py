@@ -0,0 +1,118 @@
+import logging
+import time
+
+import numpy as np
+from sanic import Blueprint
+from sanic.response import json
+
+from satellite_tracker import screen_conjunctions
+from ..executor import ComputeBusyError, busy_response, run_compute
+
+logger = logging.getLogger(__name__)
+
+conjunctions_bp = Blueprint("conjunctions", url_prefix="/api")
+
+# Ограничения параметров, чтобы один запрос не занимал сервер надолго
+MAX_WINDOW_HOURS = 24.0
+MIN_STEP_S = 1.0
+MAX_STEP_S = 120.0
+MAX_THRESHOLD_KM = 100.0
+
+
+def _screen_conjunctions(catalog, numbers, window_hours, step_s, threshold_km):
+    """
+    Поиск сближений для /conjunctions; выполняется в пуле вычислений.
+    Номера NORAD переводятся в индексы уже здесь, в том же снимке каталога.
+    Возвращает None, если ни один из номеров не найден.
+    """
+    primary = None
+    if numbers:
+        primary = np.flatnonzero(np.isin(catalog.number, numbers))
+        if len(primary) == 0:
+            return None
+
+    return screen_conjunctions(
+        catalog,
+        window_hours=window_hours,
+        step_s=step_s,
+        threshold_km=threshold_km,
+        primary=primary,
+    )
+
+
+@conjunctions_bp.get("/conjunctions")
+async def conjunctions(request):
+    """
+    Поиск сближений объектов каталога в заданном окне времени.
+
+    Параметры запроса:
+        threshold_km (float): Порог расстояния сближения (км), по умолчанию 5.
+        window_hours (float): Длина окна от текущего момента (часы), по умолчанию 1.
+        step_s (float): Шаг пропагации SGP4 (секунды), по умолчанию 60; пары внутри шага
+            ищутся с фиксированным подшагом (PAIR_SEARCH_STEP_S), а время сближения
+            затем уточняется по SGP4.
+        norad (str): Номера NORAD через запятую; если заданы, ищутся сближения
+            только этих объектов со всем каталогом.
+        limit (int): Максимальное число событий в ответе, по умолчанию 100.
+    """
+    request_start_time = time.time()
+    logger.info(f"Начало обработки запроса /conjunctions с параметрами: {request.args}")
+
+    try:
+        try:
+            threshold_km = float(request.args.get("threshold_km", 5.0))
+            window_hours = float(request.args.get("window_hours", 1.0))
+            step_s = float(request.args.get("step_s", 60.0))
+            limit = int(request.args.get("limit", 100))
+            norad = request.args.get("norad")
+            numbers = (
+                tuple(sorted({int(number) for number in norad.split(",") if number.strip()}))
+                if norad
+                else None
+            )
+        except ValueError:
+            return json(
+                {"message": "threshold_km, window_hours and step_s must be numbers, "
+                            "limit and norad must be integers."},
+                status=400,
+            )
+
+        if not (0 < threshold_km <= MAX_THRESHOLD_KM):
+            return json({"message": f"threshold_km must be in (0, {MAX_THRESHOLD_KM}]"}, status=400)
+        if not (0 < window_hours <= MAX_WINDOW_HOURS):
+            return json({"message": f"window_hours must be in (0, {MAX_WINDOW_HOURS}]"}, status=400)
+        if not (MIN_STEP_S <= step_s <= MAX_STEP_S):
+            return json({"message": f"step_s must be in [{MIN_STEP_S}, {MAX_STEP_S}]"}, status=400)
+        if limit < 0:
+            return json({"message": "limit must be non-negative"}, status=400)
+
+        # Расчет занимает заметное время, поэтому выполняется в пуле вычислений.
+        # limit намеренно не входит в ключ объединения запросов: расчет всегда
+        # возвращает полный список сближений, и каждый запрос обрезает его своим
+        # limit уже после расчета (общий список не изменяется).
+        params = (numbers, window_hours, step_s, threshold_km)
+        events = await run_compute(
+            request.app, _screen_conjunctions, *params, key=("conjunctions",) + params
+        )
+        if events is None:
+            return json({"message": "Objects not found in catalog."}, status=404)
+
+        logger.info(
+            f"Запрос /conjunctions успешно обработан за {time.time() - request_start_time:.4f} сек.: "
+            f"найдено {len(events)} сближений."
+        )
+        return json(
+            {
+                "threshold_km": threshold_km,
+                "window_hours": window_hours,
+                "step_s": step_s,
+                "count": len(events),
+                "conjunctions": events[:limit],
+            }
+        )
+
+    except ComputeBusyError:
+        return busy_response()
+    except Exception as e:
+        logger.error(f"Ошибка в /conjunctions: {e}", exc_info=True)
+        return json({"message": "An error occurred"}, status=500)
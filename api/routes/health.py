@@ -24,3 +24,33 @@ async def health(request):
                   example: OK
     """
     return json({"status": "OK"})
+
+
+@bp.get("/stats")
+async def stats(request):
+    """
+    Счетчики кэша результатов, объединения запросов и пула вычислений воркера,
+    обработавшего запрос (у каждого воркера они свои).
+    openapi:
+    summary: Worker Stats
+    description: Попадания и промахи кэша результатов, объединенные запросы и загрузка очереди вычислений.
+    responses:
+      '200':
+        description: Счетчики воркера.
+    """
+    app = request.app
+    return json(
+        {
+            "result_cache": app.ctx.result_cache.stats(),
+            "single_flight": {
+                "in_flight": len(app.ctx.single_flight),
+                "started": app.ctx.single_flight.started,
+                "coalesced": app.ctx.single_flight.coalesced,
+            },
+            "compute": {
+                "processes": app.ctx.compute.processes,
+                "pending": app.ctx.compute.pending,
+                "max_pending": app.ctx.compute.max_pending,
+            },
+        }
+    )
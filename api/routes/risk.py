@@ -1,26 +1,35 @@
 import logging
-import math
 import time
 from datetime import datetime, timezone, timedelta
 
 import numpy as np
 from sanic import Blueprint
 from sanic.response import json
-from skyfield.api import EarthSatellite
 
 from satellite_tracker import (
-    get_all_trackable_objects,
-    calculate_orbit_congestion_by_altitude,
+    find_corridor_intersections,
+    find_corridor_intersections_batch,
+    get_catalog_async,
 )
 from utils.risk_calculator import (
+    TAKEOFF_CORRIDOR_RADIUS_KM,
+    RISK_CLASS_DESCRIPTIONS,
     calculate_collision_financial_risk,
+    calculate_collision_financial_risk_batch,
+    calculate_takeoff_collision_risk,
 )
-from utils.trajectory import generate_simplified_trajectory, ts
+from utils.trajectory import TIME_STEP_S, get_cached_trajectory, integrate_trajectories_batch
+from ..executor import ComputeBusyError, busy_response, run_compute
+from ..result_cache import quantize_params
+from .data import LAUNCH_SITES
 
 logger = logging.getLogger(__name__)
 
 bp = Blueprint("risks", url_prefix="/api")
 
+# Полуширина слоя высот, в котором считаются объекты для риска на орбите (км)
+ORBIT_SHELL_HALF_WIDTH_KM = 50
+
 
 @bp.get("/orbit_risk")
 async def orbit_collision_risk(request):
@@ -29,137 +38,385 @@ async def orbit_collision_risk(request):
     """
     request_start_time = time.time()
     try:
-        height = float(request.args["height"][0])
+        params = quantize_params(
+            {
+                "height": float(request.args["height"][0]),
+                "A_effective": float(request.args["A_effective"][0]),
+                "T_years": float(request.args["T_years"][0]),
+                "C_full": float(request.args["C_full"][0]),
+                "D_lost": float(request.args["D_lost"][0]),
+                "V_rel": (
+                    float(request.args.get("V_rel")[0]) if request.args.get("V_rel") else 12.5
+                ),
+            },
+            request.app.config.RESULT_CACHE_QUANTIZATION,
+        )
+        height = params["height"]
+
+        catalog = await get_catalog_async()
+        cache_key = ("orbit_risk",) + tuple(params.values())
+        orbit_risk_data = request.app.ctx.result_cache.get(cache_key, catalog.generation)
+        if orbit_risk_data is None:
+            # Для слоя с границами по целым километрам — O(1) по кубу загруженности
+            total_objects_in_layer = catalog.congestion_cube.count(
+                height - ORBIT_SHELL_HALF_WIDTH_KM, height + ORBIT_SHELL_HALF_WIDTH_KM
+            )
+            if total_objects_in_layer is None:
+                total_objects_in_layer = catalog.shell_index.count(
+                    height - ORBIT_SHELL_HALF_WIDTH_KM, height + ORBIT_SHELL_HALF_WIDTH_KM
+                )
+
+            orbit_risk_data = calculate_collision_financial_risk(
+                total_objects_in_layer,
+                height + ORBIT_SHELL_HALF_WIDTH_KM,
+                height - ORBIT_SHELL_HALF_WIDTH_KM,
+                params["V_rel"],
+                params["A_effective"],
+                params["T_years"],
+                params["C_full"],
+                params["D_lost"],
+            )
+            request.app.ctx.result_cache.put(cache_key, catalog.generation, orbit_risk_data)
+
+        logger.info(f"Запрос /orbit_risk успешно обработан за {time.time() - request_start_time:.4f} сек.")
+        return json(orbit_risk_data)
+
+    except Exception as e:
+        logger.error(f"Ошибка в /orbit_risk: {e}", exc_info=True)
+        return json({"message": "An error occurred"}, status=500)
+
+
+# Ограничение размера сетки в одном запросе /orbit_risk/sweep
+MAX_SWEEP_CELLS = 20000
+
+
+def _sweep_range(args, name: str, default_min: float, default_max: float, default_step: float) -> np.ndarray:
+    """
+    Значения от {name}_min до {name}_max включительно с шагом {name}_step.
+    """
+    low = float(args.get(f"{name}_min", default_min))
+    high = float(args.get(f"{name}_max", default_max))
+    step = float(args.get(f"{name}_step", default_step))
+    if step <= 0 or high < low:
+        raise ValueError(f"Invalid {name} range.")
+    if (high - low) / step >= MAX_SWEEP_CELLS:
+        raise ValueError(f"Too many {name} values: step is too small.")
+    # Небольшой допуск, чтобы верхняя граница не терялась из-за округления
+    return np.arange(low, high + step * 1e-9, step)
+
+
+@bp.get("/orbit_risk/sweep")
+async def orbit_risk_sweep(request):
+    """
+    Риск на орбите для сетки «высота × интервал наклонения» одним запросом.
+
+    Для каждой высоты h объекты считаются в слое [h - 50, h + 50] км, как
+    в /orbit_risk, и дополнительно раскладываются по интервалам наклонения
+    [inclination, inclination + inclination_step). Матрица количеств строится
+    за один проход по индексу слоев, риск считается векторно для всей сетки.
+    Строка 'total' содержит риск по всем наклонениям и совпадает с /orbit_risk.
+
+    Параметры запроса:
+        altitude_min, altitude_max, altitude_step (float): Высоты (км), по умолчанию 200..2000 с шагом 10.
+        inclination_min, inclination_max, inclination_step (float): Границы интервалов
+            наклонения (градусы), по умолчанию 0..180 с шагом 10.
+        A_effective, T_years, C_full, D_lost, V_rel: Как в /orbit_risk.
+    """
+    request_start_time = time.time()
+    logger.info(f"Начало обработки запроса /orbit_risk/sweep с параметрами: {request.args}")
+
+    try:
+        try:
+            altitudes = _sweep_range(request.args, "altitude", 200.0, 2000.0, 10.0)
+            inclination_edges = _sweep_range(request.args, "inclination", 0.0, 180.0, 10.0)
+        except ValueError as e:
+            return json({"message": str(e)}, status=400)
+        if len(inclination_edges) < 2:
+            return json({"message": "At least one inclination interval is required."}, status=400)
+
+        cells = len(altitudes) * (len(inclination_edges) - 1)
+        if cells > MAX_SWEEP_CELLS:
+            return json({"message": f"Too many grid cells: {cells} > {MAX_SWEEP_CELLS}."}, status=400)
+
         a_effective = float(request.args["A_effective"][0])
         t_years = float(request.args["T_years"][0])
         c_full = float(request.args["C_full"][0])
         d_lost = float(request.args["D_lost"][0])
-        v_rel = (
-            float(request.args.get("V_rel")[0]) if request.args.get("V_rel") else 12.5
+        v_rel = float(request.args.get("V_rel", 12.5))
+
+        catalog = await get_catalog_async()
+        lower = altitudes - ORBIT_SHELL_HALF_WIDTH_KM
+        upper = altitudes + ORBIT_SHELL_HALF_WIDTH_KM
+        object_counts = catalog.shell_index.count_grid(lower, upper, inclination_edges)
+        total_counts = np.array(
+            [catalog.shell_index.count(low, high) for low, high in zip(lower, upper)]
         )
 
-        all_objects = get_all_trackable_objects()
-
-        _, filtered_sats = calculate_orbit_congestion_by_altitude(
-            all_objects, height - 50, height + 50, 0, 180
+        risk = calculate_collision_financial_risk_batch(
+            object_counts, upper[:, np.newaxis], lower[:, np.newaxis],
+            v_rel, a_effective, t_years, c_full, d_lost,
         )
-        total_objects_in_layer = len(filtered_sats)
-
-        orbit_risk_data = calculate_collision_financial_risk(
-            total_objects_in_layer,
-            height + 50,
-            height - 50,
-            v_rel,
-            a_effective,
-            t_years,
-            c_full,
-            d_lost,
+        total_risk = calculate_collision_financial_risk_batch(
+            total_counts, upper, lower, v_rel, a_effective, t_years, c_full, d_lost,
         )
 
-        logger.info(f"Запрос /orbit_risk успешно обработан за {time.time() - request_start_time:.4f} сек.")
-        return json(orbit_risk_data)
+        logger.info(
+            f"Запрос /orbit_risk/sweep ({cells} ячеек) успешно обработан "
+            f"за {time.time() - request_start_time:.4f} сек."
+        )
+        return json(
+            {
+                "altitudes": altitudes.tolist(),
+                "inclination_edges": inclination_edges.tolist(),
+                "object_count": object_counts.tolist(),
+                "financial_risk": risk["financial_risk"].tolist(),
+                "collision_risk": risk["collision_risk"].tolist(),
+                "insurance_premium": risk["insurance_premium"].tolist(),
+                "risk_class": risk["risk_class"],
+                "total": {
+                    "object_count": total_counts.tolist(),
+                    "financial_risk": total_risk["financial_risk"].tolist(),
+                    "collision_risk": total_risk["collision_risk"].tolist(),
+                    "insurance_premium": total_risk["insurance_premium"].tolist(),
+                    "risk_class": total_risk["risk_class"],
+                },
+                "risk_class_descriptions": RISK_CLASS_DESCRIPTIONS,
+            }
+        )
 
     except Exception as e:
-        logger.error(f"Ошибка в /orbit_risk: {e}", exc_info=True)
+        logger.error(f"Ошибка в /orbit_risk/sweep: {e}", exc_info=True)
         return json({"message": "An error occurred"}, status=500)
 
 
+def _compute_takeoff_risk(catalog, launch_lat, launch_lon, target_altitude, inclination, a_rocket, c_total_loss):
+    """
+    Расчет риска при запуске для /takeoff_risk; выполняется в пуле вычислений.
+
+    Возвращает:
+        Tuple[dict, int]: тело ответа и HTTP-статус.
+    """
+    # Шаг 1: Генерируем эталонную траекторию
+    trajectory_positions, _ = get_cached_trajectory(
+        launch_lat, launch_lon, target_altitude, inclination
+    )
+    if len(trajectory_positions) < 2:
+        return {"message": "Failed to generate trajectory."}, 500
+
+    ascent_time_s = len(trajectory_positions) * TIME_STEP_S
+    logger.info(f"Шаг 1: Траектория сгенерирована. Расчетное время полета: {ascent_time_s} сек.")
+
+    # Шаг 2: Создаем габаритный контейнер (bounding box) вокруг траектории
+    min_coords = np.min(trajectory_positions, axis=0) - 200  # Запас 200 км
+    max_coords = np.max(trajectory_positions, axis=0) + 200  # Запас 200 км
+    logger.info("Шаг 2: Габаритный контейнер для траектории создан.")
+
+    # Шаг 3: Находим все объекты, чьи орбиты пересекают наш контейнер
+    intersecting_sats = find_corridor_intersections(catalog, min_coords, max_coords)
+
+    N_objects = len(intersecting_sats)
+    logger.info(f"Шаг 3: Найдено {N_objects} объектов, чьи орбиты пересекают коридор запуска.")
+
+    # Шаг 4: Расчет статистического риска
+    trajectory_length_km = np.linalg.norm(np.diff(trajectory_positions, axis=0), axis=1).sum()
+    risk = calculate_takeoff_collision_risk(
+        N_objects, trajectory_length_km, ascent_time_s, a_rocket, c_total_loss
+    )
+
+    if risk["corridor_volume_km3"][0] == 0:
+        return {"message": "Corridor volume is zero."}, 500
+
+    P_collision = float(risk["collision_risk"][0])
+    takeoff_risk_data = {
+        "financial_risk": round(float(risk["financial_risk"][0]), 2),
+        "collision_risk": P_collision,
+        "insurance_premium": round(float(risk["insurance_premium"][0]), 2),
+        "risk_class": risk["risk_class"][0],
+        "risk_class_description": "...",
+        "object_count": N_objects,
+        "launch_corridor_radius_km": TAKEOFF_CORRIDOR_RADIUS_KM
+    }
+    return takeoff_risk_data, 200
+
+
 @bp.get("/takeoff_risk")
 async def takeoff_collision_risk(request):
     """
     Рассчитывает ОБЩИЙ УСРЕДНЕННЫЙ риск при запуске, используя гибридный статистический метод.
+
+    Траектория строится в базисе восток-север от оси вращения Земли; по сравнению
+    с прежним базисом от полюса GCRS она смещена на 3–25 км, и результаты для тех
+    же параметров могут отличаться от ранее выданных (см. README).
     """
     request_start_time = time.time()
     logger.info(f"Начало обработки запроса /takeoff_risk (гибридный метод) с параметрами: {request.args}")
 
     try:
-        launch_lat = float(request.args["lat"][0])
-        launch_lon = float(request.args["lon"][0])
-        target_altitude = float(request.args["altitude"][0])
-        inclination = float(request.args["inclination"][0])
-        a_rocket = float(request.args["A_rocket"][0])
-        c_total_loss = float(request.args["C_total_loss"][0])
-
-        # Шаг 1: Генерируем эталонную траекторию
-        trajectory = generate_simplified_trajectory(
-            launch_lat, launch_lon, target_altitude, inclination
+        params = quantize_params(
+            {
+                "lat": float(request.args["lat"][0]),
+                "lon": float(request.args["lon"][0]),
+                "altitude": float(request.args["altitude"][0]),
+                "inclination": float(request.args["inclination"][0]),
+                "A_rocket": float(request.args["A_rocket"][0]),
+                "C_total_loss": float(request.args["C_total_loss"][0]),
+            },
+            request.app.config.RESULT_CACHE_QUANTIZATION,
         )
-        if not trajectory or len(trajectory) < 2:
-            return json({"message": "Failed to generate trajectory."}, status=500)
-
-        ascent_time_s = len(trajectory) * 10
-        logger.info(f"Шаг 1: Траектория сгенерирована. Расчетное время полета: {ascent_time_s} сек.")
-
-        # Шаг 2: Создаем габаритный контейнер (bounding box) вокруг траектории
-        all_pos = np.array([p['position'] for p in trajectory])
-        min_coords = np.min(all_pos, axis=0) - 200  # Запас 200 км
-        max_coords = np.max(all_pos, axis=0) + 200  # Запас 200 км
-        logger.info("Шаг 2: Габаритный контейнер для траектории создан.")
-
-        # Шаг 3: Находим все объекты, чьи орбиты пересекают наш контейнер
-        all_objects = get_all_trackable_objects()
-        intersecting_sats = []
-
-        for sat_data in all_objects:
-            try:
-                satellite = EarthSatellite(sat_data['line1'], sat_data['line2'], 'sat', ts)
-                # Рассчитываем одну точку на орбите, чтобы проверить, не слишком ли она далеко
-                t = ts.now()
-                pos = satellite.at(t).position.km
-                # Грубая проверка - если объект сейчас очень далеко, его орбита вряд ли пересечет контейнер
-                if np.linalg.norm(pos) > 15000: continue
-
-                # Проверяем пересечение с контейнером (упрощенная проверка)
-                # Берем несколько точек с орбиты и смотрим, попадает ли хоть одна в контейнер
-                period_minutes = (1 / (satellite.model.no_kozai * (1440.0 / (2 * np.pi)))) * 1440
-                if period_minutes == 0: continue
-
-                times = ts.utc(t.utc.year, t.utc.month, t.utc.day, t.utc.hour,
-                               np.arange(0, period_minutes, 5) * 60 / 3600)
-                sat_path = satellite.at(times).position.km.T
-
-                inside = np.any(np.all((sat_path >= min_coords) & (sat_path <= max_coords), axis=1))
-                if inside:
-                    intersecting_sats.append(sat_data)
-
-            except Exception:
-                continue
-
-        N_objects = len(intersecting_sats)
-        logger.info(f"Шаг 3: Найдено {N_objects} объектов, чьи орбиты пересекают коридор запуска.")
-
-        # Шаг 4: Расчет статистического риска
-        avg_radius_km = 75  # Средний радиус для расчета объема
-        trajectory_length_km = sum(np.linalg.norm(trajectory[i + 1]['position'] - trajectory[i]['position']) for i in
-                                   range(len(trajectory) - 1))
-        corridor_volume_km3 = np.pi * (avg_radius_km ** 2) * trajectory_length_km
-
-        if corridor_volume_km3 == 0:
-            return json({"message": "Corridor volume is zero."}, status=500)
-
-        density = N_objects / corridor_volume_km3
-        V_rel_km_s = 10.0
-        A_effective_km2 = a_rocket / 1_000_000
-
-        expected_collisions = density * V_rel_km_s * A_effective_km2 * ascent_time_s
-        P_collision = 1.0 - math.exp(-expected_collisions)
-        financial_risk = P_collision * c_total_loss
-
-        takeoff_risk_data = {
-            "financial_risk": round(financial_risk, 2),
-            "collision_risk": P_collision,
-            "insurance_premium": round(financial_risk * 1.5, 2),
-            "risk_class": "A+ (Minimal)" if P_collision < 1e-7 else "A (Very Low)" if P_collision < 1e-6 else "B (Low)" if P_collision < 1e-5 else "C (Moderate)" if P_collision < 1e-4 else "D (High)" if P_collision < 1e-3 else "E (Very High)" if P_collision < 1e-2 else "F (Extremely High)",
-            "risk_class_description": "...",
-            "object_count": N_objects,
-            "launch_corridor_radius_km": avg_radius_km
-        }
+        values = tuple(params.values())
+
+        catalog = await get_catalog_async()
+        cache_key = ("takeoff_risk",) + values
+        takeoff_risk_data = request.app.ctx.result_cache.get(cache_key, catalog.generation)
+        if takeoff_risk_data is None:
+            # Пропагация каталога занимает заметное время, поэтому выполняется в пуле вычислений
+            takeoff_risk_data, status = await run_compute(
+                request.app, _compute_takeoff_risk, *values, key=cache_key
+            )
+            if status != 200:
+                return json(takeoff_risk_data, status=status)
+            request.app.ctx.result_cache.put(cache_key, catalog.generation, takeoff_risk_data)
 
         total_time = time.time() - request_start_time
         logger.info(f"Запрос /takeoff_risk (гибридный) успешно обработан за {total_time:.4f} сек.")
 
         return json(takeoff_risk_data)
 
+    except ComputeBusyError:
+        return busy_response()
     except Exception as e:
         logger.error(f"Критическая ошибка в /takeoff_risk: {e}", exc_info=True)
-        return json({"message": f"An internal error occurred: {e}"}, status=500)
\ No newline at end of file
+        return json({"message": f"An internal error occurred: {e}"}, status=500)
+
+# Ограничение размера сетки вариантов в одном запросе /takeoff_risk/survey
+MAX_SURVEY_COMBINATIONS = 2000
+
+
+def _survey_takeoff_risk(catalog, sites, inclinations, altitudes, a_rocket, c_total_loss):
+    """
+    Считает риск при выведении для всей сетки (площадка x наклонение x высота)
+    одним пакетом: траектории интегрируются вдоль ведущей оси, пересечения
+    коридоров с каталогом ищутся одной пакетной пропагацией, а риск считается
+    векторно.
+    """
+    site_grid, inclination_grid, altitude_grid = (
+        grid.ravel()
+        for grid in np.meshgrid(np.arange(len(sites)), inclinations, altitudes, indexing="ij")
+    )
+    lats = np.array([sites[i]["lat"] for i in site_grid])
+    lons = np.array([sites[i]["lon"] for i in site_grid])
+
+    positions, _, steps = integrate_trajectories_batch(lats, lons, altitude_grid, inclination_grid)
+    valid = steps >= 2
+
+    object_counts = np.zeros(len(site_grid), dtype=int)
+    if np.any(valid):
+        min_coords = np.nanmin(positions[valid], axis=1) - 200  # Запас 200 км
+        max_coords = np.nanmax(positions[valid], axis=1) + 200  # Запас 200 км
+        intersecting = find_corridor_intersections_batch(catalog, min_coords, max_coords)
+        object_counts[valid] = [len(objects) for objects in intersecting]
+
+    trajectory_length_km = np.nansum(np.linalg.norm(np.diff(positions, axis=1), axis=2), axis=1)
+    risk = calculate_takeoff_collision_risk(
+        object_counts, trajectory_length_km, steps * TIME_STEP_S, a_rocket, c_total_loss
+    )
+
+    results = []
+    for i, site_index in enumerate(site_grid):
+        result = {
+            "site": sites[site_index]["name"],
+            "lat": sites[site_index]["lat"],
+            "lon": sites[site_index]["lon"],
+            "inclination": float(inclination_grid[i]),
+            "altitude": float(altitude_grid[i]),
+        }
+        if not valid[i] or risk["corridor_volume_km3"][i] == 0:
+            result["message"] = "Failed to generate trajectory."
+        else:
+            result.update(
+                {
+                    "financial_risk": round(float(risk["financial_risk"][i]), 2),
+                    "collision_risk": float(risk["collision_risk"][i]),
+                    "insurance_premium": round(float(risk["insurance_premium"][i]), 2),
+                    "risk_class": risk["risk_class"][i],
+                    "object_count": int(object_counts[i]),
+                }
+            )
+        results.append(result)
+    return results
+
+
+@bp.get("/takeoff_risk/survey")
+async def takeoff_risk_survey(request):
+    """
+    Обзор риска при запуске для сетки вариантов: площадки из LAUNCH_SITES
+    (все или выбранные по номерам) x наклонения x целевые высоты.
+    """
+    request_start_time = time.time()
+    logger.info(f"Начало обработки запроса /takeoff_risk/survey с параметрами: {request.args}")
+
+    try:
+        try:
+            inclinations = np.array([float(value) for value in request.args["inclinations"][0].split(",")])
+            altitudes = np.array([float(value) for value in request.args["altitudes"][0].split(",")])
+            a_rocket = float(request.args["A_rocket"][0])
+            c_total_loss = float(request.args["C_total_loss"][0])
+            if request.args.get("sites"):
+                site_indices = tuple(int(index) for index in request.args["sites"][0].split(","))
+            else:
+                site_indices = tuple(range(len(LAUNCH_SITES)))
+        except (KeyError, ValueError):
+            return json(
+                {"message": "inclinations, altitudes, A_rocket and C_total_loss are required numbers, "
+                            "sites must be comma-separated integers."},
+                status=400,
+            )
+        # float() принимает nan и inf: такие значения не годятся ни для расчета,
+        # ни для ключа объединения запросов (nan != nan), ни для JSON-ответа
+        if not (
+            np.all(np.isfinite(inclinations)) and np.all(np.isfinite(altitudes))
+            and np.isfinite(a_rocket) and np.isfinite(c_total_loss)
+        ):
+            return json({"message": "All numeric parameters must be finite."}, status=400)
+        if np.any((inclinations < 0) | (inclinations > 180)):
+            return json({"message": "inclinations must be within [0, 180] degrees."}, status=400)
+        if np.any(altitudes <= 0):
+            return json({"message": "altitudes must be positive."}, status=400)
+        if a_rocket <= 0 or c_total_loss < 0:
+            return json({"message": "A_rocket must be positive and C_total_loss non-negative."}, status=400)
+        invalid_sites =[index for index in site_indices if index not in range(len(LAUNCH_SITES))]
+        if invalid_sites:
+            return json(
+                {"message": f"Unknown launch sites: {invalid_sites}. "
+                            f"Valid indices are 0..{len(LAUNCH_SITES) - 1}."},
+                status=400,
+            )
+        sites = [LAUNCH_SITES[index] for index in site_indices]
+
+        combinations = len(sites) * len(inclinations) * len(altitudes)
+        if combinations > MAX_SURVEY_COMBINATIONS:
+            return json(
+                {"message": f"Too many combinations: {combinations} > {MAX_SURVEY_COMBINATIONS}."},
+                status=400,
+            )
+
+        # Расчет занимает заметное время, поэтому выполняется в пуле вычислений
+        results = await run_compute(
+            request.app, _survey_takeoff_risk, sites, inclinations, altitudes, a_rocket, c_total_loss,
+            key=(
+                "takeoff_risk/survey", site_indices, tuple(inclinations), tuple(altitudes),
+                a_rocket, c_total_loss,
+            ),
+        )
+
+        logger.info(
+            f"Запрос /takeoff_risk/survey ({combinations} вариантов) успешно обработан "
+            f"за {time.time() - request_start_time:.4f} сек."
+        )
+        return json({"count": len(results), "results": results})
+
+    except ComputeBusyError:
+        return busy_response()
+    except Exception as e:
+        logger.error(f"Ошибка в /takeoff_risk/survey: {e}", exc_info=True)
+        return json({"message": "An error occurred"}, status=500)
@@ -0,0 +1,50 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Объединяет одинаковые одновременные вычисления в одно.
+
+    Первый запрос с данным ключом запускает вычисление, а запросы с тем же
+    ключом, пришедшие до его завершения, ждут тот же результат (или ту же
+    ошибку). После завершения ключ удаляется, поэтому готовые результаты здесь
+    не хранятся и не устаревают. В ключ входит номер поколения каталога, чтобы
+    запрос после обновления каталога не получил результат по старому снимку.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Возвращает результат factory() для ключа, запуская вычисление только
+        если такого же вычисления еще нет в работе.
+        """
+        future = self._calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(factory())
+            self._calls[key] = future
+            future.add_done_callback(lambda done: self._forget(key, done))
+            self.started += 1
+        else:
+            self.coalesced += 1
+            logger.debug(f"Запрос присоединен к выполняемому вычислению: {key}")
+
+        # Отмена одного из ожидающих запросов не должна отменять общее вычисление
+        return await asyncio.shield(future)
+
+    def _forget(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._calls.get(key) is future:
+            del self._calls[key]
+        # Ошибку получают ожидающие запросы; если их не осталось, она не логируется повторно
+        if not future.cancelled():
+            future.exception()
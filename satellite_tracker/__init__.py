@@ -1,11 +1,40 @@
-from .tle_importer import get_all_trackable_objects
+from .tle_importer import (
+    get_all_trackable_objects,
+    get_cached_catalog,
+    get_catalog,
+    get_catalog_async,
+    refresh_catalog_async,
+    run_catalog_refresher,
+)
+from .catalog import TLECatalog, build_catalog
 from .orbit import calculate_orbit_congestion_by_altitude
 from .calculate_position import calculate_satellite_position
+from .propagation import propagate_catalog
+from .shell_index import AltitudeShellIndex
+from .congestion import CongestionCube, CongestionReport
+from .corridor import find_corridor_intersections, find_corridor_intersections_batch
+from .spatial_index import SpatialIndex
+from .conjunctions import screen_conjunctions
 from .find_debris import get_debris_filtered_satcat_final
 
 __all__ = [
     "get_all_trackable_objects",
+    "get_cached_catalog",
+    "get_catalog",
+    "get_catalog_async",
+    "refresh_catalog_async",
+    "run_catalog_refresher",
+    "TLECatalog",
+    "build_catalog",
     "calculate_orbit_congestion_by_altitude",
     "calculate_satellite_position",
+    "propagate_catalog",
+    "AltitudeShellIndex",
+    "CongestionCube",
+    "CongestionReport",
+    "find_corridor_intersections",
+    "find_corridor_intersections_batch",
+    "SpatialIndex",
+    "screen_conjunctions",
     "get_debris_filtered_satcat_final",
 ]
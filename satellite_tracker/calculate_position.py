@@ -1,11 +1,13 @@
 import numpy as np
-from skyfield.api import load, EarthSatellite
+from skyfield.api import load
 from skyfield.timelib import Time
 from datetime import datetime, timezone
 from typing import Dict, Any
 
 from skyfield.toposlib import wgs84
 
+from .satellite_cache import get_earth_satellite
+
 # Загрузка таймскейла Skyfield
 ts = load.timescale()
 
@@ -37,7 +39,7 @@ def calculate_satellite_position(
         )
 
     try:
-        satellite = EarthSatellite(line1, line2, name, ts)
+        satellite = get_earth_satellite(sat_data)
 
         if target_time.tzinfo is None:
             target_time = target_time.replace(tzinfo=timezone.utc)
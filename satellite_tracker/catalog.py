@@ -0,0 +1,209 @@
+import math
+import logging
+from datetime import datetime
+from functools import cached_property
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Tuple
+
+import numpy as np
+from sgp4.api import jday
+
+if TYPE_CHECKING:
+    from .congestion import CongestionCube, CongestionReport
+    from .shell_index import AltitudeShellIndex
+
+logger = logging.getLogger(__name__)
+
+# Константы SGP4, используемые для перевода элементов TLE во внутренние единицы.
+# Вычисления повторяют sgp4.twoline2rv, чтобы значения в каталоге совпадали
+# с satellite.model.no_kozai / satellite.model.inclo бит в бит.
+_XPDOTP = 1440.0 / (2.0 * math.pi)
+_DEG2RAD = math.pi / 180.0
+
+# Структура одной записи каталога. Орбитальные элементы хранятся уже разобранными,
+# исходные строки TLE сохраняются для SGP4 и для совместимости со словарным API.
+# Запись фиксированного размера (ее разделяют процессы через файлы и shared memory),
+# поэтому имя хранится в поле длиной CATALOG_NAME_LENGTH: более длинные имена
+# обрезаются (имена CelesTrak обычно не длиннее 25 символов).
+CATALOG_NAME_LENGTH = 64
+CATALOG_DTYPE = np.dtype(
+    [
+        ("number", "i4"),
+        ("name", f"U{CATALOG_NAME_LENGTH}"),
+        ("line1", "S69"),
+        ("line2", "S69"),
+        ("epoch_jd", "f8"),  # Эпоха TLE (юлианская дата, UTC)
+        ("mean_motion", "f8"),  # Среднее движение (об/сут)
+        ("inclination", "f8"),  # Наклонение (градусы)
+        ("eccentricity", "f8"),
+        ("raan", "f8"),  # Долгота восходящего узла (градусы)
+        ("arg_perigee", "f8"),  # Аргумент перигея (градусы)
+        ("mean_anomaly", "f8"),  # Средняя аномалия (градусы)
+        ("bstar", "f8"),  # Баллистический коэффициент B* (1/радиус Земли)
+    ]
+)
+
+
+class TLECatalog:
+    """
+    Колоночный снимок каталога TLE, который строится один раз на каждое
+    обновление кэша и живет в памяти процесса.
+
+    Все поля доступны как массивы NumPy (представления над `records`),
+    что позволяет фильтровать весь каталог векторными операциями вместо
+    повторного разбора TLE в каждом запросе.
+    """
+
+    def __init__(
+        self,
+        records: np.ndarray,
+        generation: int = 0,
+        fetched_at: Optional[datetime] = None,
+        objects: Optional[List[Dict[str, Any]]] = None,
+    ):
+        self.records = records
+        self.generation = generation
+        self.fetched_at = fetched_at
+
+        self.number = records["number"]
+        self.epoch_jd = records["epoch_jd"]
+        self.mean_motion = records["mean_motion"]
+        self.inclination = records["inclination"]
+        self.eccentricity = records["eccentricity"]
+        self.raan = records["raan"]
+        self.arg_perigee = records["arg_perigee"]
+        self.mean_anomaly = records["mean_anomaly"]
+        self.bstar = records["bstar"]
+
+        if objects is not None:
+            # Исходные словари уже есть — не материализуем их повторно
+            self.objects = objects
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @cached_property
+    def objects(self) -> List[Dict[str, Any]]:
+        """
+        Словарное представление каталога в формате, который исторически возвращал
+        get_all_trackable_objects(). Строится один раз на снимок; список общий
+        для всех вызывающих, изменять его нельзя.
+        """
+        return [
+            {
+                "name": str(record["name"]),
+                "number": int(record["number"]),
+                "line1": record["line1"].decode("ascii"),
+                "line2": record["line2"].decode("ascii"),
+            }
+            for record in self.records
+        ]
+
+    @cached_property
+    def shell_index(self) -> "AltitudeShellIndex":
+        """
+        Индекс высотных слоев для быстрого подсчета объектов в диапазоне высот.
+        """
+        from .shell_index import AltitudeShellIndex
+
+        return AltitudeShellIndex(self)
+
+    @cached_property
+    def congestion_report(self) -> "CongestionReport":
+        """
+        Карта загруженности всего каталога по ячейкам (среднее движение, наклонение).
+        """
+        from .congestion import CongestionReport
+
+        return CongestionReport(self)
+
+    @cached_property
+    def congestion_cube(self) -> "CongestionCube":
+        """
+        Многоуровневый куб загруженности (высота × наклонение × RAAN) для подсчета
+        объектов в прямоугольных диапазонах за O(1).
+        """
+        from .congestion import CongestionCube
+
+        return CongestionCube(self)
+
+
+def _parse_tle_exponent(field: str) -> float:
+    """
+    Разбирает поле TLE в формате с неявной десятичной точкой, например ' 93860-5'.
+    """
+    mantissa = float(field[0] + "." + field[1:6])
+    return mantissa * 10.0 ** int(field[6:8])
+
+
+def _parse_tle_record(sat_data: Dict[str, Any]) -> tuple:
+    """
+    Разбирает одну пару строк TLE в кортеж, соответствующий CATALOG_DTYPE.
+    """
+    line1 = sat_data["line1"]
+    line2 = sat_data["line2"]
+    name = sat_data.get("name", "UNKNOWN")
+    # Иначе некорректное имя обнаружится только при сборке массива записей
+    if not isinstance(name, str):
+        raise TypeError(f"Имя объекта должно быть строкой, получено {type(name).__name__}")
+
+    two_digit_year = int(line1[18:20])
+    epoch_year = 1900 + two_digit_year if two_digit_year >= 57 else 2000 + two_digit_year
+    jd, fraction = jday(epoch_year, 1, 1, 0, 0, 0.0)
+    epoch_jd = jd + fraction + float(line1[20:32]) - 1.0
+
+    no_kozai = float(line2[52:63]) / _XPDOTP
+
+    return (
+        int(sat_data.get("number", line1[2:7])),
+        name,
+        line1.encode("ascii"),
+        line2.encode("ascii"),
+        epoch_jd,
+        no_kozai * (1440.0 / (2 * math.pi)),
+        math.degrees(float(line2[8:16]) * _DEG2RAD),
+        float("0." + line2[26:33].strip()),
+        float(line2[17:25]),
+        float(line2[34:42]),
+        float(line2[43:51]),
+        _parse_tle_exponent(line1[53:61]),
+    )
+
+
+def parse_tle_records(
+    tle_data_dicts: List[Dict[str, Any]],
+) -> Tuple[np.ndarray, List[Dict[str, Any]]]:
+    """
+    Разбирает список словарей с TLE-строками в массив записей CATALOG_DTYPE.
+    Объекты с некорректными TLE пропускаются.
+
+    Возвращает массив записей и список исходных словарей, прошедших разбор.
+    """
+    rows = []
+    valid_objects = []
+    for sat_data in tle_data_dicts:
+        try:
+            rows.append(_parse_tle_record(sat_data))
+            valid_objects.append(sat_data)
+        except (KeyError, IndexError, TypeError, ValueError, UnicodeEncodeError) as e:
+            logger.warning(
+                f"Ошибка при разборе TLE объекта {sat_data.get('name', 'UNKNOWN')}: {e}"
+            )
+            continue
+
+    return np.array(rows, dtype=CATALOG_DTYPE), valid_objects
+
+
+def build_catalog(
+    tle_data_dicts: List[Dict[str, Any]],
+    generation: int = 0,
+    fetched_at: Optional[datetime] = None,
+) -> TLECatalog:
+    """
+    Строит колоночный каталог из списка словарей с TLE-строками.
+    Объекты с некорректными TLE пропускаются.
+    """
+    records, valid_objects = parse_tle_records(tle_data_dicts)
+    logger.info(f"Каталог построен: {len(records)} объектов (поколение {generation}).")
+    return TLECatalog(
+        records, generation=generation, fetched_at=fetched_at, objects=valid_objects
+    )
@@ -0,0 +1,336 @@
+import itertools
+import json
+import logging
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .catalog import TLECatalog
+from .orbit import _altitude_to_mean_motion, aggregate_congestion_cells
+
+logger = logging.getLogger(__name__)
+
+# Размер ячеек карты загруженности: среднее движение (об/сут) и наклонение (градусы)
+MEAN_MOTION_BIN_SIZE = 0.1
+INCLINATION_BIN_SIZE = 1
+
+# Одна ячейка карты загруженности
+CONGESTION_DTYPE = np.dtype(
+    [
+        ("mean_motion_bin", "i4"),  # Номер ячейки среднего движения (десятые доли об/сут)
+        ("inclination_bin", "i2"),  # Номер ячейки наклонения (градусы)
+        ("count", "i4"),
+        ("avg_inclination", "f8"),
+        ("avg_mean_motion", "f8"),
+    ]
+)
+
+
+class CongestionReport:
+    """
+    Карта загруженности всего каталога — то же, что возвращает
+    calculate_orbit_congestion_by_altitude(), но для всех объектов с
+    положительным средним движением и в виде массива ячеек CONGESTION_DTYPE,
+    отсортированного по (ячейка среднего движения, ячейка наклонения).
+
+    Строится один раз на снимок каталога; JSON полной карты кодируется сразу
+    и отдается без дополнительных вычислений.
+    """
+
+    def __init__(self, catalog: TLECatalog):
+        self.generation = catalog.generation
+        self.fetched_at = catalog.fetched_at
+
+        mean_motion = catalog.mean_motion
+        inclination = catalog.inclination
+        selected = np.flatnonzero(mean_motion > 0)
+
+        cells = np.zeros(0, dtype=CONGESTION_DTYPE)
+        if len(selected):
+            mean_motion_bins, inclination_bins, _, counts, sum_inclination, sum_mean_motion = (
+                aggregate_congestion_cells(mean_motion[selected], inclination[selected])
+            )
+            cells = np.zeros(len(counts), dtype=CONGESTION_DTYPE)
+            cells["mean_motion_bin"] = mean_motion_bins
+            cells["inclination_bin"] = inclination_bins
+            cells["count"] = counts
+            cells["avg_inclination"] = sum_inclination / counts
+            cells["avg_mean_motion"] = sum_mean_motion / counts
+        self.cells = cells
+        self.json_bytes = self.encode(cells)
+
+        logger.info(
+            f"Карта загруженности построена: {len(cells)} ячеек, {len(selected)} объектов "
+            f"(поколение {self.generation})."
+        )
+
+    def select(
+        self,
+        min_altitude_km: Optional[float] = None,
+        max_altitude_km: Optional[float] = None,
+        min_inclination: Optional[float] = None,
+        max_inclination: Optional[float] = None,
+    ) -> np.ndarray:
+        """
+        Ячейки, центры которых попадают в диапазоны высот и наклонений.
+        Высота переводится в среднее движение так же, как в
+        calculate_orbit_congestion_by_altitude().
+        """
+        cells = self.cells
+        mean_motion = cells["mean_motion_bin"] / 10
+
+        # Ячейки отсортированы по среднему движению: диапазон высот — это отрезок массива
+        start, stop = 0, len(cells)
+        if max_altitude_km is not None:
+            start = np.searchsorted(mean_motion, _altitude_to_mean_motion(max_altitude_km), side="left")
+        if min_altitude_km is not None:
+            stop = np.searchsorted(mean_motion, _altitude_to_mean_motion(min_altitude_km), side="right")
+        cells = cells[start:max(start, stop)]
+
+        inclination = cells["inclination_bin"]
+        mask = np.ones(len(cells), dtype=bool)
+        if min_inclination is not None:
+            mask &= inclination >= min_inclination
+        if max_inclination is not None:
+            mask &= inclination <= max_inclination
+        return cells[mask]
+
+    def encode(self, cells: np.ndarray) -> bytes:
+        """
+        Кодирует ячейки в компактный JSON: по одному массиву на поле.
+        """
+        payload = {
+            "generation": self.generation,
+            "fetched_at": self.fetched_at.isoformat() if self.fetched_at is not None else None,
+            "mean_motion_bin_size": MEAN_MOTION_BIN_SIZE,
+            "inclination_bin_size": INCLINATION_BIN_SIZE,
+            "cell_count": len(cells),
+            "object_count": int(cells["count"].sum()),
+            "mean_motion": (cells["mean_motion_bin"] / 10).tolist(),
+            "inclination": cells["inclination_bin"].tolist(),
+            "count": cells["count"].tolist(),
+            "avg_inclination": cells["avg_inclination"].tolist(),
+            "avg_mean_motion": cells["avg_mean_motion"].tolist(),
+        }
+        return json.dumps(payload, separators=(",", ":")).encode()
+
+
+# Уровни куба загруженности от мелкого к крупному, сначала двумерные, затем с RAAN:
+# (шаг высоты км, шаг наклонения °, шаг RAAN ° или None, верхняя граница высоты км).
+# Мелкий уровень покрывает только низкие орбиты, где нужна точность подсчета;
+# уровни с RAAN крупные, чтобы трехмерные таблицы были небольшими. Крупные уровни
+# нужны и для сеток: окно любого размера укладывается в ограничение числа ячеек.
+CUBE_LEVELS = (
+    (1.0, 0.5, None, 2500.0),
+    (10.0, 1.0, None, 50000.0),
+    (50.0, 2.0, None, 50000.0),
+    (500.0, 10.0, None, 50000.0),
+    (100.0, 5.0, 10.0, 50000.0),
+    (500.0, 10.0, 30.0, 50000.0),
+    (5000.0, 30.0, 60.0, 50000.0),
+)
+
+# Допуск при проверке, что граница запроса совпадает с границей ячейки
+_EDGE_TOLERANCE = 1e-9
+
+
+class CongestionCubeLevel:
+    """
+    Один уровень куба загруженности: сетка высота × наклонение (× RAAN) с заданным
+    шагом, хранимая как таблица накопленных сумм (summed-area table). Количество
+    объектов в любом прямоугольнике из целых ячеек считается по 2^d ее элементам
+    (d — число осей), независимо от размера прямоугольника.
+    """
+
+    def __init__(
+        self,
+        values: np.ndarray,
+        altitude_step: float,
+        inclination_step: float,
+        raan_step: Optional[float],
+        max_altitude_km: float,
+    ):
+        """
+        Аргументы:
+            values (np.ndarray): Координаты объектов (N, d): высота, наклонение и, если
+                задан raan_step, RAAN.
+        """
+        self.steps = np.array(
+            [altitude_step, inclination_step] + ([raan_step] if raan_step is not None else []),
+            dtype=float,
+        )
+        self.upper = np.array(
+            [max_altitude_km, 180.0] + ([360.0] if raan_step is not None else []), dtype=float
+        )
+        self.shape = tuple(np.round(self.upper / self.steps).astype(int))
+
+        values = values[:, : len(self.steps)]
+        # Объекты выше уровня в него не попадают; запросы выше его границы
+        # обслуживает более крупный уровень
+        values = values[np.all(np.isfinite(values), axis=1) & (values[:, 0] >= 0) & (values[:, 0] < self.upper[0])]
+        # Наклонение 180° и RAAN 360° относятся к последней ячейке
+        bins = np.minimum((values / self.steps).astype(np.int64), np.array(self.shape) - 1)
+
+        histogram = np.bincount(
+            np.ravel_multi_index(tuple(bins.T), self.shape), minlength=int(np.prod(self.shape))
+        ).reshape(self.shape)
+
+        # table[i, j, ...] — количество объектов в ячейках с номерами меньше (i, j, ...)
+        table = np.zeros(tuple(size + 1 for size in self.shape), dtype=np.int32)
+        inner = histogram
+        for axis in range(len(self.shape)):
+            inner = np.cumsum(inner, axis=axis)
+        table[(slice(1, None),) * len(self.shape)] = inner
+        self.table = table
+
+    @property
+    def dimensions(self) -> int:
+        return len(self.steps)
+
+    def describe(self) -> dict:
+        description = {"altitude_step_km": float(self.steps[0]), "inclination_step_deg": float(self.steps[1])}
+        if self.dimensions == 3:
+            description["raan_step_deg"] = float(self.steps[2])
+        return description
+
+    def edge_index(self, axis: int, value: float) -> Optional[int]:
+        """
+        Номер границы ячеек, совпадающей с `value`, или None.
+        """
+        position = value / self.steps[axis]
+        index = int(round(position))
+        if abs(position - index) > _EDGE_TOLERANCE or not 0 <= index <= self.shape[axis]:
+            return None
+        return index
+
+    def count(self, lows: Tuple[int, ...], highs: Tuple[int, ...]) -> int:
+        """
+        Количество объектов в ячейках [lows, highs) по номерам границ — за O(1).
+        """
+        total = 0
+        # Формула включений-исключений по всем вершинам прямоугольника
+        for corner in itertools.product((0, 1), repeat=self.dimensions):
+            index = tuple(highs[axis] if take_high else lows[axis] for axis, take_high in enumerate(corner))
+            sign = -1 if (self.dimensions - sum(corner)) % 2 else 1
+            total += sign * int(self.table[index])
+        return total
+
+    def grid(self, lows: Tuple[int, ...], highs: Tuple[int, ...]) -> np.ndarray:
+        """
+        Количество объектов в каждой ячейке прямоугольника [lows, highs).
+        """
+        block = self.table[tuple(slice(low, high + 1) for low, high in zip(lows, highs))]
+        for axis in range(self.dimensions):
+            block = np.diff(block, axis=axis)
+        return block
+
+
+class CongestionCube:
+    """
+    Куб загруженности по высоте × наклонению (и RAAN на крупном уровне)
+    на нескольких уровнях разрешения CUBE_LEVELS.
+
+    Высота — та же, что в индексе высотных слоев: по большой полуоси из среднего
+    движения. Количество объектов в прямоугольном диапазоне, границы которого
+    совпадают с границами ячеек какого-либо уровня, считается за O(1) на самом
+    мелком из таких уровней; для сетки (тепловой карты) уровень выбирается по
+    допустимому числу ячеек ответа.
+    """
+
+    def __init__(self, catalog: TLECatalog):
+        self.generation = catalog.generation
+        values = np.stack(
+            [catalog.shell_index.altitude_km, catalog.inclination, catalog.raan % 360.0], axis=1
+        )
+        self.levels = [CongestionCubeLevel(values, *level) for level in CUBE_LEVELS]
+        logger.info(
+            f"Куб загруженности построен: {len(self.levels)} уровней, "
+            f"{sum(level.table.nbytes for level in self.levels) / 1e6:.1f} МБ (поколение {self.generation})."
+        )
+
+    def count(
+        self,
+        min_altitude_km: float,
+        max_altitude_km: float,
+        min_inclination: float = 0.0,
+        max_inclination: float = 180.0,
+        min_raan: Optional[float] = None,
+        max_raan: Optional[float] = None,
+    ) -> Optional[int]:
+        """
+        Количество объектов с высотой в [min_altitude_km, max_altitude_km),
+        наклонением в [min_inclination, max_inclination) (180° включительно)
+        и, если задан, RAAN в [min_raan, max_raan).
+
+        Возвращает None, если границы не совпадают с границами ячеек ни одного
+        уровня: тогда точный ответ дает AltitudeShellIndex.
+        """
+        bounds = [(min_altitude_km, max_altitude_km), (min_inclination, max_inclination)]
+        if min_raan is not None or max_raan is not None:
+            bounds.append((min_raan or 0.0, 360.0 if max_raan is None else max_raan))
+
+        for level in self.levels:
+            if level.dimensions < len(bounds):
+                continue
+            lows, highs = [], []
+            for axis in range(level.dimensions):
+                low, high = bounds[axis] if axis < len(bounds) else (0.0, 360.0)
+                lows.append(level.edge_index(axis, low))
+                highs.append(level.edge_index(axis, high))
+            if None not in lows and None not in highs:
+                if any(low > high for low, high in zip(lows, highs)):
+                    return 0
+                return level.count(tuple(lows), tuple(highs))
+        return None
+
+    def grid(
+        self,
+        min_altitude_km: float,
+        max_altitude_km: float,
+        min_inclination: float = 0.0,
+        max_inclination: float = 180.0,
+        min_raan: Optional[float] = None,
+        max_raan: Optional[float] = None,
+        max_cells: int = 10000,
+    ) -> Tuple[CongestionCubeLevel, List[np.ndarray], np.ndarray]:
+        """
+        Сетка количеств для окна на самом мелком уровне, на котором окно
+        (расширенное до границ ячеек) дает не больше `max_cells` ячеек.
+
+        Возвращает:
+            Tuple: уровень, границы ячеек по каждой оси и массив количеств.
+
+        Исключения:
+            ValueError: Окно не укладывается в `max_cells` ячеек ни на одном уровне.
+        """
+        use_raan = min_raan is not None or max_raan is not None
+        bounds = [(min_altitude_km, max_altitude_km), (min_inclination, max_inclination)]
+        if use_raan:
+            bounds.append((min_raan or 0.0, 360.0 if max_raan is None else max_raan))
+
+        matching = [level for level in self.levels if (level.dimensions == 3) == use_raan]
+        candidates = [level for level in matching if max_altitude_km <= level.upper[0]] or matching[-1:]
+
+        chosen = None
+        for level in candidates:
+            lows, highs = [], []
+            for axis, (low, high) in enumerate(bounds):
+                lows.append(int(np.clip(np.floor(low / level.steps[axis] + _EDGE_TOLERANCE), 0, level.shape[axis])))
+                highs.append(int(np.clip(np.ceil(high / level.steps[axis] - _EDGE_TOLERANCE), 0, level.shape[axis])))
+            highs = [max(low, high) for low, high in zip(lows, highs)]
+            cells = int(np.prod([high - low for low, high in zip(lows, highs)]))
+            if cells <= max_cells:
+                chosen = (level, lows, highs)
+                break
+
+        if chosen is None:
+            raise ValueError(
+                f"The window needs {cells} cells even at the coarsest level, max_cells is {max_cells}."
+            )
+
+        level, lows, highs = chosen
+        edges = [
+            np.arange(low, high + 1) * level.steps[axis]
+            for axis, (low, high) in enumerate(zip(lows, highs))
+        ]
+        return level, edges, level.grid(tuple(lows), tuple(highs))
@@ -0,0 +1,400 @@
+import logging
+from datetime import timedelta
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+from skyfield.constants import DAY_S
+from skyfield.timelib import Time
+
+from utils.cpa_calculator import calculate_cpa_batch
+from .catalog import TLECatalog
+from .orbit import MU_KM3_PER_S2, EARTH_RADIUS_KM
+from .propagation import get_catalog_satrecs, propagate_catalog
+from .satellite_cache import ts
+from .spatial_index import SpatialIndex
+
+logger = logging.getLogger(__name__)
+
+# Максимальная относительная скорость двух объектов на околоземной орбите (км/с).
+# За время t пара сближается не больше чем на MAX_RELATIVE_SPEED_KM_S * t,
+# поэтому кандидаты ищутся в радиусе порога плюс этот запас.
+MAX_RELATIVE_SPEED_KM_S = 16.0
+
+# Шаг, с которым внутри шага сетки ищутся пары по линейно продолженным положениям.
+# Радиус поиска пар зависит только от него, а не от шага пропагации: иначе число
+# пар-кандидатов растет как куб шага сетки.
+PAIR_SEARCH_STEP_S = 30.0
+
+# Градиент гравитационного ускорения у поверхности Земли (1/с²): оценка сверху
+# для расхождения относительного движения пары с линейной моделью
+GRAVITY_GRADIENT_PER_S2 = 2 * MU_KM3_PER_S2 / EARTH_RADIUS_KM**3
+
+# Точка сетки принимает линейные оценки TCA в пределах этой доли шага; интервалы
+# соседних точек перекрываются, дубликаты схлопываются после уточнения
+CPA_ACCEPT_FRACTION = 0.75
+
+# Уточнение TCA методом Ньютона по скорости изменения расстояния
+REFINE_MAX_ITERATIONS = 8
+REFINE_TOLERANCE_S = 1e-3
+
+# Запас фильтра по перигею/апогею (средние элементы против мгновенной орбиты SGP4)
+SHELL_FILTER_MARGIN_KM = 50.0
+
+# Максимальное число пар (объект, момент времени) в одном вызове SGP4
+_MAX_CHUNK_POINTS = 400_000
+
+
+def _shell_overlap_mask(
+    catalog: TLECatalog,
+    threshold_km: float,
+    primary: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Отмечает объекты, чей диапазон высот [перигей, апогей] пересекается
+    с диапазоном хотя бы одного другого объекта (или одного из `primary`).
+    Остальные объекты ни с кем сблизиться не могут и не пропагируются.
+    """
+    shell_index = catalog.shell_index
+    margin = threshold_km + SHELL_FILTER_MARGIN_KM
+    low = shell_index.perigee_km - margin
+    high = shell_index.apogee_km + margin
+
+    others = np.arange(len(catalog)) if primary is None else primary
+    sorted_low = np.sort(low[others])
+    sorted_high = np.sort(high[others])
+
+    # Число отрезков, пересекающих [low_j, high_j]: начавшиеся не позже high_j
+    # минус закончившиеся раньше low_j
+    overlaps = np.searchsorted(sorted_low, high, side="right") - np.searchsorted(
+        sorted_high, low, side="left"
+    )
+    if primary is None:
+        overlaps -= 1  # отрезок объекта пересекается сам с собой
+    else:
+        overlaps[primary] = np.maximum(overlaps[primary], 1)
+    return overlaps > 0
+
+
+def screen_conjunctions(
+    catalog: TLECatalog,
+    t_start: Optional[Time] = None,
+    window_hours: float = 1.0,
+    step_s: float = 60.0,
+    threshold_km: float = 5.0,
+    primary: Optional[np.ndarray] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Ищет сближения объектов каталога ближе `threshold_km` в окне времени.
+
+    1. Объекты, чьи диапазоны высот ни с кем не пересекаются, отбрасываются.
+    2. Оставшиеся пропагируются на сетку с шагом `step_s`.
+    3. Внутри каждого шага сетки положения продолжаются линейно с шагом
+       PAIR_SEARCH_STEP_S, и пространственный индекс отбирает пары, которые
+       могут сблизиться до порога в пределах этого подшага. Если задан
+       `primary`, индекс опрашивается только вокруг этих объектов.
+    4. Линейная модель (calculate_cpa_batch) сразу для всех пар шага отбирает
+       кандидатов с запасом на ее погрешность.
+    5. Время и расстояние сближения кандидатов уточняются по SGP4 (refine_tca).
+
+    Шаг сетки определяет только число вызовов SGP4; радиус поиска пар от него
+    не зависит.
+
+    Аргументы:
+        catalog (TLECatalog): Снимок каталога.
+        t_start (Time, optional): Начало окна; по умолчанию ts.now().
+        window_hours (float): Длина окна (часы).
+        step_s (float): Шаг сетки времени (секунды).
+        threshold_km (float): Порог расстояния сближения (км).
+        primary (np.ndarray, optional): Индексы объектов, для которых ищутся сближения
+            со всем каталогом; по умолчанию — все пары каталога.
+
+    Возвращает:
+        List[Dict[str, Any]]: События сближения, отсортированные по расстоянию.
+    """
+    if t_start is None:
+        t_start = ts.now()
+
+    candidates = np.flatnonzero(
+        _shell_overlap_mask(catalog, threshold_km, primary) & (catalog.mean_motion > 0)
+    )
+    if primary is not None:
+        is_primary = np.zeros(len(catalog), dtype=bool)
+        is_primary[primary] = True
+        primary_rows = np.flatnonzero(is_primary[candidates])
+    logger.info(
+        f"Поиск сближений: к пропагации {len(candidates)} из {len(catalog)} объектов "
+        f"после фильтра по перигею/апогею."
+    )
+
+    window_s = window_hours * 3600.0
+    offsets_s = np.arange(0.0, window_s + step_s / 2, step_s)
+    grid = t_start + offsets_s / 86400.0
+
+    # Линейная модель на отрезке accept_s от точки сетки ошибается не больше чем
+    # на половину относительного ускорения (градиент гравитации на расстояние)
+    # за это время, поэтому кандидаты отбираются с запасом и затем уточняются
+    accept_s = CPA_ACCEPT_FRACTION * step_s
+    linear_error_km = 0.5 * GRAVITY_GRADIENT_PER_S2 * MAX_RELATIVE_SPEED_KM_S * accept_s**3
+    candidate_threshold_km = threshold_km + linear_error_km
+
+    # Подшаги равномерно покрывают интервал [-step_s / 2, step_s / 2] вокруг точки
+    # сетки: любой момент окна не дальше половины подшага от одного из них
+    sub_steps = max(1, int(np.ceil(step_s / PAIR_SEARCH_STEP_S - 1e-9)))
+    sub_step_s = step_s / sub_steps
+    sub_offsets_s = (np.arange(sub_steps) + 0.5) * sub_step_s - step_s / 2
+    search_radius_km = candidate_threshold_km + MAX_RELATIVE_SPEED_KM_S * sub_step_s / 2
+    chunk_steps = max(1, _MAX_CHUNK_POINTS // max(len(candidates), 1))
+
+    pair_first, pair_second, pair_offsets = [], [], []
+    for chunk_start in range(0, len(offsets_s), chunk_steps):
+        chunk = slice(chunk_start, chunk_start + chunk_steps)
+        positions, velocities, _ = propagate_catalog(catalog, grid[chunk], candidates)
+
+        for step in range(positions.shape[1]):
+            step_offset_s = offsets_s[chunk_start + step]
+            if primary is None:
+                pairs = _query_pairs_along_step(
+                    positions[:, step, :], velocities[:, step, :], sub_offsets_s, search_radius_km
+                )
+            else:
+                pairs = _query_primary_pairs_along_step(
+                    positions[:, step, :], velocities[:, step, :], primary_rows, sub_offsets_s, search_radius_km
+                )
+
+            first, second = pairs[:, 0], pairs[:, 1]
+
+            t_cpa, distance = calculate_cpa_batch(
+                positions[first, step], velocities[first, step],
+                positions[second, step], velocities[second, step],
+            )
+            hit = (np.abs(t_cpa) <= accept_s) & (distance <= candidate_threshold_km)
+            if not np.any(hit):
+                continue
+
+            pair_first.append(candidates[first[hit]])
+            pair_second.append(candidates[second[hit]])
+            pair_offsets.append(step_offset_s + t_cpa[hit])
+
+    if not pair_first:
+        return []
+
+    first = np.concatenate(pair_first)
+    second = np.concatenate(pair_second)
+    offsets, distance, relative_speed = refine_tca(
+        catalog, first, second, t_start, np.concatenate(pair_offsets), step_s
+    )
+
+    found = (distance <= threshold_km) & (offsets >= 0.0) & (offsets <= window_s)
+    logger.info(
+        f"Поиск сближений: уточнено {len(first)} кандидатов, "
+        f"ближе {threshold_km} км — {np.count_nonzero(found)}."
+    )
+    events = list(
+        zip(
+            first[found].tolist(),
+            second[found].tolist(),
+            offsets[found].tolist(),
+            distance[found].tolist(),
+            relative_speed[found].tolist(),
+        )
+    )
+    return _collect_events(catalog, t_start, events, step_s)
+
+
+def _query_pairs_along_step(
+    positions: np.ndarray,
+    velocities: np.ndarray,
+    sub_offsets_s: np.ndarray,
+    radius_km: float,
+) -> np.ndarray:
+    """
+    Пары объектов, которые при линейном продолжении движения от точки сетки
+    оказываются ближе `radius_km` хотя бы в один из моментов `sub_offsets_s`.
+
+    Возвращает:
+        np.ndarray: Пары индексов (P, 2) без повторов, первый индекс меньше второго.
+    """
+    count = len(positions)
+    keys = []
+    for sub_offset_s in sub_offsets_s:
+        index = SpatialIndex(positions + velocities * sub_offset_s, np.arange(count), radius_km)
+        pairs, _ = index.query_pairs(radius_km)
+        keys.append(pairs[:, 0] * count + pairs[:, 1])
+
+    keys = np.unique(np.concatenate(keys))
+    return np.stack([keys // count, keys % count], axis=1)
+
+
+def _query_primary_pairs_along_step(
+    positions: np.ndarray,
+    velocities: np.ndarray,
+    primary_rows: np.ndarray,
+    sub_offsets_s: np.ndarray,
+    radius_km: float,
+) -> np.ndarray:
+    """
+    То же, что _query_pairs_along_step, но только пары с участием объектов
+    `primary_rows`: вокруг каждого из них выполняется запрос по радиусу, поэтому
+    работа растет с числом этих объектов, а не с числом всех пар.
+    """
+    count = len(positions)
+    keys = [np.empty(0, dtype=np.int64)]
+    for sub_offset_s in sub_offsets_s:
+        moved = positions + velocities * sub_offset_s
+        index = SpatialIndex(moved, np.arange(count), radius_km)
+        for row in primary_rows.tolist():
+            if not np.all(np.isfinite(moved[row])):
+                continue
+            neighbors = index.query_radius(moved[row], radius_km)
+            neighbors = neighbors[neighbors != row]
+            keys.append(np.minimum(neighbors, row) * count + np.maximum(neighbors, row))
+
+    keys = np.unique(np.concatenate(keys))
+    return np.stack([keys // count, keys % count], axis=1)
+
+
+def _propagate_pairs(
+    satrecs: list,
+    first: np.ndarray,
+    second: np.ndarray,
+    jd: float,
+    fraction: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Пропагирует оба объекта каждой пары на свой момент времени (TEME).
+    Моменты группируются по объектам: для каждого объекта выполняется один
+    векторный вызов Satrec.sgp4_array на все его моменты.
+    Для пар с ошибкой SGP4 положения заполняются NaN.
+    """
+    objects = np.concatenate([first, second])
+    order = np.argsort(objects, kind="stable")
+    sorted_objects = objects[order]
+    sorted_fraction = np.ascontiguousarray(np.concatenate([fraction, fraction])[order], dtype=float)
+    sorted_jd = np.full(len(order), jd)
+    unique, starts = np.unique(sorted_objects, return_index=True)
+    stops = np.append(starts[1:], len(order))
+
+    errors = np.empty(len(order), dtype=np.uint8)
+    positions = np.empty((len(order), 3))
+    velocities = np.empty((len(order), 3))
+    for index, start, stop in zip(unique.tolist(), starts.tolist(), stops.tolist()):
+        errors[start:stop], positions[start:stop], velocities[start:stop] = satrecs[index].sgp4_array(
+            sorted_jd[start:stop], sorted_fraction[start:stop]
+        )
+    positions[errors != 0] = np.nan
+    velocities[errors != 0] = np.nan
+
+    # Обратно в порядок пар: сначала первые объекты, затем вторые
+    states = np.empty((len(order), 2, 3))
+    states[order, 0] = positions
+    states[order, 1] = velocities
+    count = len(first)
+    return states[:count, 0], states[count:, 0], states[:count, 1] - states[count:, 1]
+
+
+def refine_tca(
+    catalog: TLECatalog,
+    first: np.ndarray,
+    second: np.ndarray,
+    t_start: Time,
+    offsets_s: np.ndarray,
+    max_step_s: float,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Уточняет время максимального сближения (TCA) пар объектов методом Ньютона
+    по скорости изменения расстояния: f(t) = r·v, f'(t) = v·v + r·a, где r, v —
+    относительные положение и скорость по SGP4, a — разность ускорений
+    центрального поля. Расстояние не зависит от системы координат, поэтому
+    используется сырой выход SGP4 (TEME).
+
+    Аргументы:
+        catalog (TLECatalog): Снимок каталога.
+        first, second (np.ndarray): Индексы объектов пар в каталоге.
+        t_start (Time): Начало окна.
+        offsets_s (np.ndarray): Начальные оценки TCA в секундах от `t_start`.
+        max_step_s (float): Ограничение одного шага Ньютона (секунды).
+
+    Возвращает:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: уточненные TCA (с от `t_start`),
+        расстояния (км) и относительные скорости (км/с) в момент TCA.
+    """
+    satrecs = get_catalog_satrecs(catalog)
+    # Та же шкала времени, что в propagate_catalog
+    jd = float(t_start.whole)
+    fraction = float(t_start.tai_fraction - t_start._leap_seconds() / DAY_S)
+
+    offsets = np.asarray(offsets_s, dtype=float).copy()
+    active = np.ones(len(offsets), dtype=bool)
+    for _ in range(REFINE_MAX_ITERATIONS):
+        index = np.flatnonzero(active)
+        if len(index) == 0:
+            break
+
+        position_1, position_2, relative_velocity = _propagate_pairs(
+            satrecs, first[index], second[index], jd, fraction + offsets[index] / DAY_S
+        )
+        relative_position = position_1 - position_2
+        acceleration_1 = -MU_KM3_PER_S2 * position_1 / np.linalg.norm(position_1, axis=1, keepdims=True) ** 3
+        acceleration_2 = -MU_KM3_PER_S2 * position_2 / np.linalg.norm(position_2, axis=1, keepdims=True) ** 3
+
+        range_rate = np.einsum("ij,ij->i", relative_position, relative_velocity)
+        derivative = np.einsum("ij,ij->i", relative_velocity, relative_velocity) + np.einsum(
+            "ij,ij->i", relative_position, acceleration_1 - acceleration_2
+        )
+
+        # Шаг Ньютона ограничен, вблизи максимума расстояния (f' <= 0) не делается
+        step = np.zeros(len(index))
+        np.divide(-range_rate, derivative, out=step, where=derivative > 0)
+        step = np.clip(np.nan_to_num(step), -max_step_s, max_step_s)
+        offsets[index] += step
+        active[index] = np.abs(step) > REFINE_TOLERANCE_S
+
+    position_1, position_2, relative_velocity = _propagate_pairs(
+        satrecs, first, second, jd, fraction + offsets / DAY_S
+    )
+    distance = np.linalg.norm(position_1 - position_2, axis=1)
+    relative_speed = np.linalg.norm(relative_velocity, axis=1)
+    return offsets, distance, relative_speed
+
+
+def _collect_events(
+    catalog: TLECatalog,
+    t_start: Time,
+    events: List[tuple],
+    step_s: float,
+) -> List[Dict[str, Any]]:
+    """
+    Объединяет срабатывания соседних шагов для одной пары в одно событие
+    (с минимальным расстоянием) и формирует результат.
+    """
+    events.sort(key=lambda event: (event[0], event[1], event[2]))
+    start_utc = t_start.utc_datetime()
+    objects = catalog.objects
+
+    closest = []
+    for event in events:
+        previous = closest[-1] if closest else None
+        if (
+            previous is not None
+            and previous[:2] == event[:2]
+            and event[2] - previous[5] <= 2 * step_s
+        ):
+            if event[3] < previous[3]:
+                closest[-1] = event + (event[2],)
+            else:
+                closest[-1] = previous[:5] + (event[2],)
+            continue
+        closest.append(event + (event[2],))
+
+    results = []
+    for first, second, offset_s, distance, relative_speed, _ in sorted(closest, key=lambda e: e[3]):
+        results.append(
+            {
+                "object_1": {"name": objects[first]["name"], "number": objects[first]["number"]},
+                "object_2": {"name": objects[second]["name"], "number": objects[second]["number"]},
+                "tca": (start_utc + timedelta(seconds=float(offset_s))).isoformat(),
+                "miss_distance_km": round(distance, 3),
+                "relative_speed_km_s": round(relative_speed, 3),
+            }
+        )
+    return results
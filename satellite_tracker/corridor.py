@@ -0,0 +1,227 @@
+import logging
+from typing import List, Optional
+
+import numpy as np
+from skyfield.timelib import Time
+
+from .catalog import TLECatalog
+from .orbit import EARTH_RADIUS_KM
+from .propagation import propagate_catalog
+from .satellite_cache import ts
+
+logger = logging.getLogger(__name__)
+
+# Шаг выборки точек орбиты: k-я точка берется через k * 5 * 60 / 3600 минут
+# от начала текущего часа, число точек — как в np.arange(0, period_minutes, 5)
+CORRIDOR_SAMPLE_STEP = 5
+
+# Объекты, которые в текущий момент дальше этого расстояния от центра Земли,
+# не проверяются (грубый отсев далеких орбит)
+MAX_OBJECT_DISTANCE_KM = 15000.0
+
+# Запас аналитического отсева: перигей и апогей считаются по средним элементам
+# на эпоху TLE, а SGP4 дает мгновенную орбиту с короткопериодическими
+# возмущениями и торможением в атмосфере
+PREFILTER_RADIUS_MARGIN_KM = 50.0
+# Запас по широте: наклонение задано в TEME, контейнер — в GCRS
+PREFILTER_LATITUDE_MARGIN_DEG = 1.0
+
+# Максимальное число пар (объект, момент времени) в одном вызове SGP4
+_MAX_CHUNK_POINTS = 400_000
+# Во сколько раз число точек орбиты может различаться внутри одной группы:
+# короткие орбиты не пропагируются на всю длину самой длинной в группе
+_MAX_CHUNK_SAMPLE_RATIO = 1.25
+# Максимальное число точек (пара объект-контейнер, момент времени) в одном сравнении
+_MAX_BOX_COMPARISONS = 2_000_000
+
+
+def prefilter_corridor_candidates(
+    catalog: TLECatalog,
+    min_coords: np.ndarray,
+    max_coords: np.ndarray,
+) -> np.ndarray:
+    """
+    Отсеивает объекты, которые не могут попасть в контейнер коридора,
+    по элементам орбиты из каталога, без пропагации.
+
+    Объект отбрасывается, если его перигей выше самой дальней точки контейнера,
+    апогей ниже самой близкой точки контейнера, или если наклонение орбиты
+    меньше минимальной широты (склонения) точек контейнера.
+
+    Возвращает:
+        np.ndarray: Индексы объектов каталога, которые нужно проверить пропагацией.
+    """
+    min_coords = np.asarray(min_coords, dtype=float)
+    max_coords = np.asarray(max_coords, dtype=float)
+    shell_index = catalog.shell_index
+
+    # Дальняя вершина контейнера и ближайшая к центру Земли точка контейнера
+    farthest = np.maximum(np.abs(min_coords), np.abs(max_coords))
+    nearest = np.clip(0.0, min_coords, max_coords)
+    box_max_radius = np.linalg.norm(farthest)
+    box_min_radius = np.linalg.norm(nearest)
+
+    perigee_radius = shell_index.perigee_km + EARTH_RADIUS_KM
+    apogee_radius = shell_index.apogee_km + EARTH_RADIUS_KM
+    candidates = (perigee_radius - PREFILTER_RADIUS_MARGIN_KM <= box_max_radius) & (
+        apogee_radius + PREFILTER_RADIUS_MARGIN_KM >= box_min_radius
+    )
+
+    # Минимальная широта точек контейнера: наименьший |z| при наибольшем
+    # удалении от оси Z. Если контейнер пересекает экватор, отсева нет.
+    if min_coords[2] > 0 or max_coords[2] < 0:
+        min_abs_z = min(abs(min_coords[2]), abs(max_coords[2]))
+        box_min_latitude = np.degrees(np.arctan2(min_abs_z, np.linalg.norm(farthest[:2])))
+        max_latitude = np.minimum(catalog.inclination, 180.0 - catalog.inclination)
+        candidates &= max_latitude + PREFILTER_LATITUDE_MARGIN_DEG >= box_min_latitude
+
+    return np.flatnonzero(candidates)
+
+
+def find_corridor_intersections(
+    catalog: TLECatalog,
+    min_coords: np.ndarray,
+    max_coords: np.ndarray,
+    t_now: Optional[Time] = None,
+    indices: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Находит объекты каталога, хотя бы одна точка орбиты которых попадает
+    в габаритный контейнер коридора запуска.
+
+    Все объекты пропагируются на общую сетку времени векторными вызовами SGP4,
+    а попадание в контейнер проверяется одним сравнением с broadcasting.
+    Для каждого объекта учитываются только первые ceil(period_minutes / 5) точек
+    сетки, поэтому результат совпадает с поштучной проверкой.
+
+    Аргументы:
+        catalog (TLECatalog): Снимок каталога.
+        min_coords (np.ndarray): Нижний угол контейнера (x, y, z) в км, GCRS.
+        max_coords (np.ndarray): Верхний угол контейнера (x, y, z) в км, GCRS.
+        t_now (Time, optional): Текущий момент; по умолчанию ts.now().
+        indices (np.ndarray, optional): Индексы проверяемых объектов; по умолчанию
+            объекты, прошедшие prefilter_corridor_candidates().
+
+    Возвращает:
+        np.ndarray: Отсортированные индексы объектов каталога, пересекающих контейнер.
+    """
+    return find_corridor_intersections_batch(
+        catalog,
+        np.asarray(min_coords, dtype=float)[np.newaxis, :],
+        np.asarray(max_coords, dtype=float)[np.newaxis, :],
+        t_now,
+        indices,
+    )[0]
+
+
+def find_corridor_intersections_batch(
+    catalog: TLECatalog,
+    min_coords: np.ndarray,
+    max_coords: np.ndarray,
+    t_now: Optional[Time] = None,
+    indices: Optional[np.ndarray] = None,
+) -> List[np.ndarray]:
+    """
+    Пакетный вариант find_corridor_intersections() для B контейнеров сразу.
+
+    Объединение кандидатов всех контейнеров пропагируется один раз. Пары
+    (объект, контейнер) сначала отбираются по габаритам пути объекта, затем
+    точки орбиты проверяются сразу для всех отобранных пар. Для каждого
+    контейнера учитываются только объекты, прошедшие его собственный отсев,
+    поэтому результат совпадает с B отдельными вызовами.
+
+    Аргументы:
+        min_coords (np.ndarray): Нижние углы контейнеров (B, 3) в км, GCRS.
+        max_coords (np.ndarray): Верхние углы контейнеров (B, 3) в км, GCRS.
+
+    Возвращает:
+        List[np.ndarray]: Для каждого контейнера — отсортированные индексы
+        объектов каталога, пересекающих его.
+    """
+    if t_now is None:
+        t_now = ts.now()
+    min_coords = np.atleast_2d(np.asarray(min_coords, dtype=float))
+    max_coords = np.atleast_2d(np.asarray(max_coords, dtype=float))
+    boxes = len(min_coords)
+
+    if indices is None:
+        # Маска (объект, контейнер): объект прошел отсев этого контейнера
+        allowed = np.zeros((len(catalog), boxes), dtype=bool)
+        for box in range(boxes):
+            allowed[prefilter_corridor_candidates(catalog, min_coords[box], max_coords[box]), box] = True
+        indices = np.flatnonzero(allowed.any(axis=1))
+        allowed = allowed[indices]
+        logger.info(
+            f"Аналитический отсев коридора: к пропагации {len(indices)} из {len(catalog)} объектов."
+        )
+    else:
+        allowed = np.ones((len(indices), boxes), dtype=bool)
+
+    # Объекты с нулевым или отрицательным средним движением не имеют точек орбиты
+    keep = catalog.mean_motion[indices] > 0
+    indices, allowed = indices[keep], allowed[keep]
+
+    # Грубая проверка: объект сейчас слишком далеко от Земли
+    positions, _, _ = propagate_catalog(catalog, t_now, indices)
+    distance = np.linalg.norm(positions[:, 0, :], axis=1)
+    keep = ~(distance > MAX_OBJECT_DISTANCE_KM)
+    indices, allowed = indices[keep], allowed[keep]
+    if len(indices) == 0:
+        return [indices for _ in range(boxes)]
+
+    period_minutes = 1440.0 / catalog.mean_motion[indices]
+    sample_counts = np.ceil(period_minutes / CORRIDOR_SAMPLE_STEP).astype(int)
+
+    # Общая сетка времени от начала текущего часа на самый длинный период
+    utc = t_now.utc
+    steps = np.arange(0, sample_counts.max() * CORRIDOR_SAMPLE_STEP, CORRIDOR_SAMPLE_STEP)
+    grid = ts.utc(utc.year, utc.month, utc.day, utc.hour, steps * 60 / 3600)
+
+    # Объекты с близким числом точек обрабатываются вместе, чтобы не
+    # пропагировать короткие орбиты на всю длину сетки
+    order = np.argsort(sample_counts, kind="stable")
+    inside = np.zeros((len(indices), boxes), dtype=bool)
+
+    start = 0
+    while start < len(order):
+        stop = start + 1
+        while (
+            stop < len(order)
+            and (stop - start + 1) * sample_counts[order[stop]] <= _MAX_CHUNK_POINTS
+            and sample_counts[order[stop]] <= _MAX_CHUNK_SAMPLE_RATIO * sample_counts[order[start]]
+        ):
+            stop += 1
+
+        chunk = order[start:stop]
+        points = sample_counts[chunk[-1]]
+        sat_path, _, _ = propagate_catalog(catalog, grid[:points], indices[chunk])
+        valid = (np.arange(points) < sample_counts[chunk, np.newaxis]) & np.all(
+            np.isfinite(sat_path), axis=2
+        )
+
+        # Габариты пути каждого объекта: контейнеры, с которыми они не
+        # пересекаются, точно не содержат ни одной его точки
+        path_min = np.where(valid[:, :, np.newaxis], sat_path, np.inf).min(axis=1)
+        path_max = np.where(valid[:, :, np.newaxis], sat_path, -np.inf).max(axis=1)
+        overlap = np.all(
+            (path_min[:, np.newaxis, :] <= max_coords) & (path_max[:, np.newaxis, :] >= min_coords),
+            axis=2,
+        )
+        overlap &= allowed[chunk]
+
+        # Точная проверка по точкам только для пар (объект, контейнер) с пересечением
+        objects, boxes_hit = np.nonzero(overlap)
+        block = max(1, _MAX_BOX_COMPARISONS // points)
+        for pair_start in range(0, len(objects), block):
+            pair = slice(pair_start, pair_start + block)
+            path = sat_path[objects[pair]]
+            in_box = np.all(
+                (path >= min_coords[boxes_hit[pair], np.newaxis, :])
+                & (path <= max_coords[boxes_hit[pair], np.newaxis, :]),
+                axis=2,
+            )
+            hit = np.any(in_box & valid[objects[pair]], axis=1)
+            inside[chunk[objects[pair][hit]], boxes_hit[pair][hit]] = True
+        start = stop
+
+    return [np.sort(indices[inside[:, box]]) for box in range(boxes)]
@@ -1,13 +1,12 @@
 import math
 import logging
-from typing import List, Dict, Tuple, Any
+from typing import List, Dict, Tuple, Any, Union
 
-from skyfield.api import EarthSatellite, load
+import numpy as np
 
-logger = logging.getLogger(__name__)
+from .catalog import TLECatalog, build_catalog
 
-# Загрузка таймскейла Skyfield
-ts = load.timescale()
+logger = logging.getLogger(__name__)
 
 # Константы, необходимые для преобразования высоты в среднее движение.
 # Они используются для фильтрации по высоте, так как TLE напрямую не содержит высоту.
@@ -39,8 +38,24 @@ def _altitude_to_mean_motion(altitude_km: float) -> float:
     return mean_motion_rev_per_day
 
 
+def _round_mean_motion_bins(mean_motion: np.ndarray) -> np.ndarray:
+    """
+    Возвращает номера ячеек среднего движения (в десятых долях об/сут),
+    совпадающие с round(mean_motion, 1) из стандартной библиотеки.
+    """
+    scaled = mean_motion * 10.0
+    bins = np.rint(scaled).astype(np.int64)
+
+    # np.rint(x * 10) может разойтись с десятичным округлением round() только
+    # вблизи середины ячейки; такие значения досчитываем поэлементно.
+    ambiguous = np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)
+    for i in ambiguous:
+        bins[i] = int(round(round(float(mean_motion[i]), 1) * 10))
+    return bins
+
+
 def calculate_orbit_congestion_by_altitude(
-    tle_data_dicts: List[Dict[str, Any]],
+    tle_data_dicts: Union[TLECatalog, List[Dict[str, Any]]],
     min_altitude_km: float,
     max_altitude_km: float,
     min_inclination: float,
@@ -49,6 +64,9 @@ def calculate_orbit_congestion_by_altitude(
     """
     Рассчитывает загруженность орбитальных слоев и возвращает как карту
     загруженности, так и отфильтрованный список спутников.
+
+    Принимает снимок каталога (TLECatalog) или список словарей с TLE; фильтрация
+    и агрегация по ячейкам выполняются векторно над массивами каталога.
     """
     try:
         max_mean_motion_filter = _altitude_to_mean_motion(min_altitude_km)
@@ -61,56 +79,78 @@ def calculate_orbit_congestion_by_altitude(
         f"Фильтр по среднему движению (об/сут): от {min_mean_motion_filter:.4f} до {max_mean_motion_filter:.4f}"
     )
 
+    catalog = (
+        tle_data_dicts
+        if isinstance(tle_data_dicts, TLECatalog)
+        else build_catalog(tle_data_dicts)
+    )
+    mean_motion = catalog.mean_motion
+    inclination = catalog.inclination
+
+    mask = (
+        (mean_motion >= min_mean_motion_filter)
+        & (mean_motion <= max_mean_motion_filter)
+        & (inclination >= min_inclination)
+        & (inclination <= max_inclination)
+    )
+    selected = np.flatnonzero(mask)
+
+    objects = catalog.objects
+    filtered_satellites: List[Dict[str, Any]] = [objects[i] for i in selected]
+
+    if len(selected) == 0:
+        return {}, filtered_satellites
+
+    # Кластеризация и агрегация
+    mean_motion_bins, inclination_bins, first_index, counts, sum_inclination, sum_mean_motion = (
+        aggregate_congestion_cells(mean_motion[selected], inclination[selected])
+    )
+
     congestion_map: Dict[Tuple[float, int], Dict[str, Any]] = {}
-    filtered_satellites: List[Dict[str, Any]] = []
-
-    for sat_data in tle_data_dicts:
-        name = sat_data.get("name", "UNKNOWN")
-        line1 = sat_data.get("line1")
-        line2 = sat_data.get("line2")
-
-        if not line1 or not line2:
-            continue
-
-        try:
-            satellite = EarthSatellite(line1, line2, name, ts)
-            mean_motion = satellite.model.no_kozai * (1440.0 / (2 * math.pi))
-            inclination_deg = math.degrees(satellite.model.inclo)
-
-            if not (min_mean_motion_filter <= mean_motion <= max_mean_motion_filter):
-                continue
-            if not (min_inclination <= inclination_deg <= max_inclination):
-                continue
-
-            # Спутник прошел фильтрацию, добавляем его в список
-            filtered_satellites.append(sat_data)
-
-            # Кластеризация и агрегация
-            mean_motion_bin = round(mean_motion, 1)
-            inclination_bin = int(round(inclination_deg))
-            cell_key = (mean_motion_bin, inclination_bin)
-
-            if cell_key not in congestion_map:
-                congestion_map[cell_key] = {
-                    "count": 0,
-                    "avg_inclination": 0.0,
-                    "avg_mean_motion": 0.0,
-                }
-
-            data = congestion_map[cell_key]
-            current_count = data["count"]
-            new_count = current_count + 1
-
-            data["avg_inclination"] = (
-                data["avg_inclination"] * current_count + inclination_deg
-            ) / new_count
-            data["avg_mean_motion"] = (
-                data["avg_mean_motion"] * current_count + mean_motion
-            ) / new_count
-            data["count"] = new_count
-
-        except Exception as e:
-            logger.warning(f"Ошибка при обработке спутника {name}: {e}")
-            continue
+
+    # Ячейки добавляются в порядке первого появления, как при поэлементном обходе
+    for cell in np.argsort(first_index, kind="stable"):
+        count = int(counts[cell])
+        cell_key = (int(mean_motion_bins[cell]) / 10, int(inclination_bins[cell]))
+        congestion_map[cell_key] = {
+            "count": count,
+            "avg_inclination": float(sum_inclination[cell]) / count,
+            "avg_mean_motion": float(sum_mean_motion[cell]) / count,
+        }
 
     return congestion_map, filtered_satellites
+
+
+def aggregate_congestion_cells(
+    mean_motion: np.ndarray, inclination: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Группирует объекты по ячейкам карты загруженности: среднее движение
+    с шагом 0.1 об/сут и наклонение с шагом 1°.
+
+    Возвращает (для каждой ячейки, в порядке возрастания пары номеров):
+        номер ячейки среднего движения (в десятых долях об/сут), номер ячейки
+        наклонения, индекс первого объекта ячейки, количество объектов, суммы
+        наклонений и средних движений объектов ячейки.
+    """
+    mean_motion_bins = _round_mean_motion_bins(mean_motion)
+    inclination_bins = np.rint(inclination).astype(np.int64)
+
+    # Наклонение лежит в диапазоне [0, 180], поэтому пара ячеек однозначно
+    # кодируется одним целым числом.
+    cell_ids = mean_motion_bins * 1000 + inclination_bins
+    _, first_index, inverse, counts = np.unique(
+        cell_ids, return_index=True, return_inverse=True, return_counts=True
+    )
+    inverse = inverse.ravel()
+    sum_inclination = np.bincount(inverse, weights=inclination, minlength=len(counts))
+    sum_mean_motion = np.bincount(inverse, weights=mean_motion, minlength=len(counts))
+
+    return (
+        mean_motion_bins[first_index],
+        inclination_bins[first_index],
+        first_index,
+        counts,
+        sum_inclination,
+        sum_mean_motion,
+    )
@@ -0,0 +1,86 @@
+import logging
+from typing import List, Optional, Tuple
+
+import numpy as np
+from sgp4.api import Satrec, SatrecArray
+from skyfield.constants import DAY_S
+from skyfield.sgp4lib import TEME
+from skyfield.timelib import Time
+
+from .catalog import TLECatalog
+
+logger = logging.getLogger(__name__)
+
+# Список моделей SGP4 для текущего поколения каталога: (поколение, модели).
+_satrecs: Tuple[int, List[Satrec]] = (-1, [])
+
+
+def get_catalog_satrecs(catalog: TLECatalog) -> List[Satrec]:
+    """
+    Возвращает модели SGP4 для всех объектов каталога в порядке записей.
+    Модели строятся прямо из строк TLE снимка, минуя кэш get_earth_satellite
+    (каталог больше SATELLITE_CACHE_SIZE и вытеснял бы весь кэш), и
+    переиспользуются до следующего обновления.
+    """
+    global _satrecs
+
+    generation, satrecs = _satrecs
+    if generation != catalog.generation or len(satrecs) != len(catalog):
+        satrecs = [
+            Satrec.twoline2rv(line1.decode("ascii"), line2.decode("ascii"))
+            for line1, line2 in zip(catalog.records["line1"].tolist(), catalog.records["line2"].tolist())
+        ]
+        _satrecs = (catalog.generation, satrecs)
+    return satrecs
+
+
+def propagate_catalog(
+    catalog: TLECatalog,
+    t: Time,
+    indices: Optional[np.ndarray] = None,
+    frame: str = "gcrs",
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Пропагирует N объектов каталога на M моментов времени одним векторным
+    вызовом SGP4 (SatrecArray).
+
+    Аргументы:
+        catalog (TLECatalog): Снимок каталога.
+        t (Time): Момент или массив моментов времени Skyfield.
+        indices (np.ndarray, optional): Индексы объектов каталога; по умолчанию весь каталог.
+        frame (str): 'gcrs' (как EarthSatellite.at) или 'teme' (сырой выход SGP4).
+
+    Возвращает:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]:
+            положения (N, M, 3) в км, скорости (N, M, 3) в км/с и коды ошибок
+            SGP4 (N, M); ненулевой код означает, что положение недостоверно.
+    """
+    satrecs = get_catalog_satrecs(catalog)
+    if indices is not None:
+        satrecs = [satrecs[i] for i in indices]
+
+    jd = np.atleast_1d(t.whole).astype(float)
+    # Та же шкала времени, что использует Skyfield при пропагации TLE (UTC)
+    fraction = np.atleast_1d(t.tai_fraction - t._leap_seconds() / DAY_S).astype(float)
+    jd, fraction = np.broadcast_arrays(jd, fraction)
+
+    if not satrecs:
+        empty = np.empty((0, len(jd), 3))
+        return empty, empty.copy(), np.empty((0, len(jd)), dtype=np.uint8)
+
+    errors, positions, velocities = SatrecArray(satrecs).sgp4(
+        np.ascontiguousarray(jd), np.ascontiguousarray(fraction)
+    )
+
+    if frame == "gcrs":
+        rotation = TEME.rotation_at(t)
+        if rotation.ndim == 2:
+            rotation = rotation[:, :, np.newaxis]
+        rotation = np.broadcast_to(rotation, (3, 3, len(jd)))
+        # r_gcrs = R^T · r_teme для каждого момента времени
+        positions = np.einsum("jim,nmj->nmi", rotation, positions)
+        velocities = np.einsum("jim,nmj->nmi", rotation, velocities)
+    elif frame != "teme":
+        raise ValueError(f"Неизвестная система координат: {frame}")
+
+    return positions, velocities, errors
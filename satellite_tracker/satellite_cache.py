@@ -0,0 +1,58 @@
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Tuple
+
+from skyfield.api import EarthSatellite, load
+
+logger = logging.getLogger(__name__)
+
+# Загрузка таймскейла Skyfield
+ts = load.timescale()
+
+# Кэш инициализированных моделей SGP4. Ключ — номер NORAD и пара строк TLE,
+# поэтому новый набор элементов для того же объекта никогда не попадет
+# на устаревшую модель. Кэш очищается при каждом обновлении каталога TLE,
+# а между обновлениями ограничен SATELLITE_CACHE_SIZE записями (LRU): запросы
+# могут передавать произвольные TLE, и без ограничения кэш рос бы бесконечно.
+# Модели всего каталога сюда не попадают (см. propagation.get_catalog_satrecs):
+# каталог больше кэша и вытеснял бы из него все остальное.
+SATELLITE_CACHE_SIZE = 4096
+_satellites: "OrderedDict[Tuple[int, str, str], EarthSatellite]" = OrderedDict()
+# Кэшем пользуются и обработчики в потоках (asyncio.to_thread)
+_satellites_lock = threading.Lock()
+
+
+def get_earth_satellite(sat_data: Dict[str, Any]) -> EarthSatellite:
+    """
+    Возвращает объект EarthSatellite для словаря с TLE-данными, переиспользуя
+    уже разобранную и инициализированную модель SGP4, если она есть в кэше.
+    """
+    line1 = sat_data["line1"]
+    line2 = sat_data["line2"]
+    key = (sat_data.get("number", 0), line1, line2)
+
+    with _satellites_lock:
+        satellite = _satellites.get(key)
+        if satellite is not None:
+            _satellites.move_to_end(key)
+            return satellite
+
+    # Разбор TLE и инициализация модели — вне блокировки
+    satellite = EarthSatellite(line1, line2, sat_data.get("name", "UNKNOWN"), ts)
+    with _satellites_lock:
+        satellite = _satellites.setdefault(key, satellite)
+        _satellites.move_to_end(key)
+        if len(_satellites) > SATELLITE_CACHE_SIZE:
+            _satellites.popitem(last=False)
+    return satellite
+
+
+def clear_satellite_cache() -> None:
+    """
+    Сбрасывает кэш моделей. Вызывается при обновлении каталога TLE.
+    """
+    with _satellites_lock:
+        count = len(_satellites)
+        _satellites.clear()
+    logger.info(f"Кэш моделей SGP4 очищен ({count} записей).")
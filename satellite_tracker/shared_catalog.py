@@ -0,0 +1,234 @@
+import os
+import glob
+import logging
+from datetime import datetime, timezone
+from multiprocessing.shared_memory import SharedMemory
+from typing import List, Optional
+
+import numpy as np
+
+from .catalog import CATALOG_DTYPE, TLECatalog
+
+logger = logging.getLogger(__name__)
+
+# Имя общего каталога передается воркерам через переменную окружения: ее наличие
+# означает, что снимки публикует отдельный процесс, а воркеры только читают их.
+SHARED_CATALOG_ENV = "RT0S_SHARED_CATALOG"
+
+# Каталог, в котором POSIX shared memory видна как файлы (Linux)
+_SHM_DIR = "/dev/shm"
+
+# Заголовок сегмента со снимком: число записей и время загрузки каталога
+_HEADER_DTYPE = np.dtype([("count", "i8"), ("fetched_at", "f8")])
+_HEADER_SIZE = 64
+
+# Сколько последних сегментов публикатор держит открытыми, чтобы воркер,
+# прочитавший номер поколения, успел подключиться к нему
+_KEEP_SEGMENTS = 2
+
+# Управляющий блок, открытый в этом процессе: (имя, счетчик поколений)
+_control: Optional[tuple] = None
+
+
+def _segment_name(name: str, generation: int) -> str:
+    return f"{name}_{generation}"
+
+
+def _open_generation_counter(name: str) -> np.ndarray:
+    """
+    Открывает счетчик поколений управляющего блока только для чтения.
+    """
+    global _control
+
+    if _control is None or _control[0] != name:
+        counter = np.memmap(
+            os.path.join(_SHM_DIR, f"{name}_control"), dtype="i8", mode="r", shape=(1,)
+        )
+        _control = (name, counter)
+    return _control[1]
+
+
+def create_shared_catalog_control(name: str) -> SharedMemory:
+    """
+    Создает управляющий блок общего каталога (вызывается в главном процессе до
+    запуска воркеров) и сообщает его имя дочерним процессам через окружение.
+    """
+    control = SharedMemory(name=f"{name}_control", create=True, size=8)
+    np.ndarray(1, dtype="i8", buffer=control.buf)[0] = 0
+    os.environ[SHARED_CATALOG_ENV] = name
+    logger.info(f"Создан общий каталог в shared memory: {name}")
+    return control
+
+
+def _unlink(segment: SharedMemory) -> None:
+    try:
+        segment.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def destroy_shared_catalog(name: str, control: SharedMemory) -> None:
+    """
+    Освобождает управляющий блок и все оставшиеся сегменты со снимками.
+
+    Вызывается в главном процессе при остановке: удалять сегменты при выходе
+    должен только он, публикатор лишь закрывает свои дескрипторы.
+    """
+    control.close()
+    _unlink(control)
+    for path in glob.glob(os.path.join(_SHM_DIR, f"{name}_*")):
+        try:
+            segment = SharedMemory(name=os.path.basename(path))
+        except FileNotFoundError:
+            continue
+        segment.close()
+        _unlink(segment)
+    os.environ.pop(SHARED_CATALOG_ENV, None)
+
+
+def shared_memory_supported() -> bool:
+    """
+    Читатели подключают снимки через файлы POSIX shared memory в /dev/shm,
+    поэтому общий каталог доступен только там, где этот каталог есть (Linux).
+    """
+    return os.path.isdir(_SHM_DIR)
+
+
+def shared_catalog_name() -> Optional[str]:
+    """
+    Имя общего каталога, если процесс работает как читатель общих снимков.
+    """
+    return os.environ.get(SHARED_CATALOG_ENV)
+
+
+class SharedCatalogPublisher:
+    """
+    Публикует снимки каталога в shared memory. Каждое поколение записывается
+    в отдельный сегмент, после чего номер поколения в управляющем блоке
+    обновляется одной записью; воркеры сравнивают его со своим снимком.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._control = SharedMemory(name=f"{name}_control")
+        self._generation = np.ndarray(1, dtype="i8", buffer=self._control.buf)
+        self._segments: List[SharedMemory] = []
+        self._published_catalog: Optional[TLECatalog] = None
+
+    def publish(self, catalog: TLECatalog) -> None:
+        """
+        Публикует снимок, если он отличается от уже опубликованного.
+        """
+        if catalog is self._published_catalog:
+            return
+
+        generation = int(self._generation[0]) + 1
+        records = catalog.records
+        segment = SharedMemory(
+            name=_segment_name(self.name, generation),
+            create=True,
+            size=_HEADER_SIZE + max(records.nbytes, 1),
+        )
+
+        header = np.ndarray(1, dtype=_HEADER_DTYPE, buffer=segment.buf)
+        header["count"] = len(records)
+        header["fetched_at"] = (
+            catalog.fetched_at.replace(tzinfo=timezone.utc).timestamp()
+            if catalog.fetched_at is not None
+            else np.nan
+        )
+        data = np.ndarray(len(records), dtype=CATALOG_DTYPE, buffer=segment.buf, offset=_HEADER_SIZE)
+        data[:] = records
+        del header, data
+
+        # Номер поколения меняется последним: читатели видят только готовые сегменты
+        self._generation[0] = generation
+        self._published_catalog = catalog
+        self._segments.append(segment)
+        logger.info(f"Опубликован снимок каталога: поколение {generation}, {len(records)} объектов.")
+
+        while len(self._segments) > _KEEP_SEGMENTS:
+            old_segment = self._segments.pop(0)
+            old_segment.close()
+            _unlink(old_segment)
+
+    def close(self) -> None:
+        """
+        Закрывает дескрипторы публикатора. Сегменты остаются в shared memory:
+        их удаляет главный процесс (destroy_shared_catalog).
+        """
+        for segment in self._segments:
+            segment.close()
+        self._segments = []
+        del self._generation
+        self._control.close()
+
+
+class StaleCatalogError(Exception):
+    """
+    Снимок нужного поколения уже удален из shared memory: публикатор успел
+    выложить более новые поколения.
+    """
+
+
+def _attach_segment(name: str, generation: int) -> TLECatalog:
+    """
+    Подключает сегмент поколения `generation` только для чтения, без копирования.
+
+    Исключения:
+        FileNotFoundError: Сегмента уже (или еще) нет.
+    """
+    path = os.path.join(_SHM_DIR, _segment_name(name, generation))
+    header = np.memmap(path, dtype=_HEADER_DTYPE, mode="r", shape=(1,))[0]
+    count = int(header["count"])
+    records = (
+        np.memmap(path, dtype=CATALOG_DTYPE, mode="r", offset=_HEADER_SIZE, shape=(count,))
+        if count
+        else np.empty(0, dtype=CATALOG_DTYPE)
+    )
+    fetched_at = (
+        None
+        if np.isnan(header["fetched_at"])
+        else datetime.fromtimestamp(float(header["fetched_at"]), timezone.utc).replace(tzinfo=None)
+    )
+    return TLECatalog(records, generation=generation, fetched_at=fetched_at)
+
+
+def attach_shared_catalog(current: Optional[TLECatalog]) -> Optional[TLECatalog]:
+    """
+    Возвращает последний опубликованный снимок как представление над shared memory
+    только для чтения, без копирования. Если поколение не изменилось, возвращает
+    `current`; если снимок еще не опубликован — None.
+    """
+    name = shared_catalog_name()
+    if name is None:
+        return None
+
+    counter = _open_generation_counter(name)
+    for _ in range(_KEEP_SEGMENTS):
+        generation = int(counter[0])
+        if generation == 0:
+            return None
+        if current is not None and current.generation == generation:
+            return current
+        try:
+            return _attach_segment(name, generation)
+        except FileNotFoundError:
+            # Сегмент успели заменить новым поколением — перечитываем счетчик
+            continue
+    return current
+
+
+def attach_shared_generation(generation: int) -> TLECatalog:
+    """
+    Подключает опубликованный снимок именно поколения `generation`, а не последний:
+    результат расчета должен относиться к тому снимку, под номером которого его
+    кэширует воркер.
+
+    Исключения:
+        StaleCatalogError: Сегмент этого поколения уже удален.
+    """
+    try:
+        return _attach_segment(shared_catalog_name(), generation)
+    except FileNotFoundError:
+        raise StaleCatalogError(f"Снимок каталога поколения {generation} больше не доступен.") from None
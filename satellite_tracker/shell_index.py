@@ -0,0 +1,149 @@
+import math
+import logging
+
+import numpy as np
+
+from .catalog import TLECatalog
+from .orbit import MU_KM3_PER_S2, EARTH_RADIUS_KM, _altitude_to_mean_motion
+
+logger = logging.getLogger(__name__)
+
+
+class AltitudeShellIndex:
+    """
+    Индекс высотных слоев каталога, который строится один раз при загрузке.
+
+    Объекты отсортированы по среднему движению (чем оно больше, тем ниже орбита),
+    поэтому количество объектов в любом слое [min_alt, max_alt] находится двумя
+    вызовами searchsorted вместо полного прохода по каталогу. Фильтр по среднему
+    движению совпадает с calculate_orbit_congestion_by_altitude.
+    """
+
+    def __init__(self, catalog: TLECatalog):
+        self.generation = catalog.generation
+
+        self.order = np.argsort(catalog.mean_motion, kind="stable")
+        self.sorted_mean_motion = catalog.mean_motion[self.order]
+        self.sorted_inclination = catalog.inclination[self.order]
+
+        # Большая полуось по третьему закону Кеплера (среднее движение в рад/с)
+        mean_motion_rad_s = catalog.mean_motion * (2 * math.pi / 86400.0)
+        with np.errstate(divide="ignore"):
+            semi_major_axis_km = np.cbrt(MU_KM3_PER_S2 / mean_motion_rad_s**2)
+
+        self.altitude_km = semi_major_axis_km - EARTH_RADIUS_KM
+        self.perigee_km = semi_major_axis_km * (1 - catalog.eccentricity) - EARTH_RADIUS_KM
+        self.apogee_km = semi_major_axis_km * (1 + catalog.eccentricity) - EARTH_RADIUS_KM
+        self.sorted_perigee_km = np.sort(self.perigee_km)
+        self.sorted_apogee_km = np.sort(self.apogee_km)
+
+    def _shell_slice(self, min_altitude_km: float, max_altitude_km: float) -> slice:
+        """
+        Возвращает диапазон отсортированного индекса, попадающий в слой высот.
+        """
+        max_mean_motion = _altitude_to_mean_motion(min_altitude_km)
+        min_mean_motion = _altitude_to_mean_motion(max_altitude_km)
+        start = np.searchsorted(self.sorted_mean_motion, min_mean_motion, side="left")
+        stop = np.searchsorted(self.sorted_mean_motion, max_mean_motion, side="right")
+        return slice(int(start), int(max(start, stop)))
+
+    def select(
+        self,
+        min_altitude_km: float,
+        max_altitude_km: float,
+        min_inclination: float = 0.0,
+        max_inclination: float = 180.0,
+    ) -> np.ndarray:
+        """
+        Возвращает индексы объектов каталога, чье среднее движение попадает
+        в слой высот, а наклонение — в заданный диапазон.
+        """
+        shell = self._shell_slice(min_altitude_km, max_altitude_km)
+        indices = self.order[shell]
+        if min_inclination > 0.0 or max_inclination < 180.0:
+            inclination = self.sorted_inclination[shell]
+            indices = indices[(inclination >= min_inclination) & (inclination <= max_inclination)]
+        return indices
+
+    def count(
+        self,
+        min_altitude_km: float,
+        max_altitude_km: float,
+        min_inclination: float = 0.0,
+        max_inclination: float = 180.0,
+    ) -> int:
+        """
+        Количество объектов в слое высот. Без ограничения по наклонению
+        отвечает за O(log n), иначе просматривает только объекты слоя.
+        """
+        shell = self._shell_slice(min_altitude_km, max_altitude_km)
+        if min_inclination <= 0.0 and max_inclination >= 180.0:
+            return shell.stop - shell.start
+
+        inclination = self.sorted_inclination[shell]
+        return int(
+            np.count_nonzero((inclination >= min_inclination) & (inclination <= max_inclination))
+        )
+
+    def count_grid(
+        self,
+        min_altitudes_km: np.ndarray,
+        max_altitudes_km: np.ndarray,
+        inclination_edges: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Матрица количества объектов для набора слоев высот и интервалов наклонения.
+
+        Границы всех слоев делят отсортированный индекс на отрезки, поэтому каталог
+        раскладывается по (отрезок, интервал наклонения) одним вызовом bincount,
+        а количество в каждом слое — разность накопленных сумм на его границах.
+        Каждая ячейка совпадает с count(min_alt, max_alt, edges[j], edges[j + 1])
+        с той разницей, что интервал наклонения полуоткрыт, кроме последнего.
+
+        Аргументы:
+            min_altitudes_km (np.ndarray): Нижние границы слоев (A,).
+            max_altitudes_km (np.ndarray): Верхние границы слоев (A,).
+            inclination_edges (np.ndarray): Возрастающие границы интервалов наклонения (I + 1,).
+
+        Возвращает:
+            np.ndarray: Количество объектов (A, I).
+        """
+        shells = [
+            self._shell_slice(low, high) for low, high in zip(min_altitudes_km, max_altitudes_km)
+        ]
+        starts = np.array([shell.start for shell in shells], dtype=np.int64)
+        stops = np.array([shell.stop for shell in shells], dtype=np.int64)
+
+        edges = np.asarray(inclination_edges, dtype=float)
+        bins = len(edges) - 1
+        inclination_bin = np.searchsorted(edges, self.sorted_inclination, side="right") - 1
+        # Правая граница последнего интервала включается
+        inclination_bin[self.sorted_inclination == edges[-1]] = bins - 1
+        in_range = (inclination_bin >= 0) & (inclination_bin < bins)
+
+        # Номер отрезка объекта — сколько границ слоев не превосходят его позицию
+        boundaries = np.unique(np.concatenate([starts, stops]))
+        segment = np.searchsorted(boundaries, np.arange(len(self.order)), side="right")
+        histogram = np.bincount(
+            segment[in_range] * bins + inclination_bin[in_range],
+            minlength=(len(boundaries) + 1) * bins,
+        ).reshape(len(boundaries) + 1, bins)
+
+        # cumulative[k] — количество объектов с позицией меньше boundaries[k]
+        cumulative = np.cumsum(histogram, axis=0)
+        return (
+            cumulative[np.searchsorted(boundaries, stops)]
+            - cumulative[np.searchsorted(boundaries, starts)]
+        )
+
+    def count_crossing(self, min_altitude_km: float, max_altitude_km: float) -> int:
+        """
+        Количество объектов, чья орбита (от перигея до апогея) пересекает слой высот.
+        Объекты с перигеем выше слоя и с апогеем ниже слоя не пересекаются между
+        собой, поэтому ответ получается двумя вызовами searchsorted.
+        """
+        above = len(self.sorted_perigee_km) - np.searchsorted(
+            self.sorted_perigee_km, max_altitude_km, side="right"
+        )
+        below = np.searchsorted(self.sorted_apogee_km, min_altitude_km, side="left")
+        return int(len(self.sorted_perigee_km) - above - below)
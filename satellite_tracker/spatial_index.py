@@ -0,0 +1,192 @@
+import logging
+from typing import Optional, Tuple
+
+import numpy as np
+from skyfield.timelib import Time
+
+from .catalog import TLECatalog
+from .propagation import propagate_catalog
+
+logger = logging.getLogger(__name__)
+
+# Размер ячейки сетки по умолчанию (км)
+DEFAULT_CELL_SIZE_KM = 100.0
+
+# Номера ячеек по каждой оси упаковываются в один ключ int64 по 21 биту
+_AXIS_BITS = 21
+_AXIS_OFFSET = 1 << (_AXIS_BITS - 1)
+
+# Смещения соседних ячеек (3x3x3) для запросов по радиусу
+_NEIGHBOR_OFFSETS = np.array(
+    [(dx, dy, dz) for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1)],
+    dtype=np.int64,
+)
+
+
+def _pack_cells(cells: np.ndarray) -> np.ndarray:
+    """
+    Упаковывает целочисленные координаты ячеек (..., 3) в ключи int64.
+    """
+    shifted = cells.astype(np.int64) + _AXIS_OFFSET
+    return (shifted[..., 0] << (2 * _AXIS_BITS)) | (shifted[..., 1] << _AXIS_BITS) | shifted[..., 2]
+
+
+class SpatialIndex:
+    """
+    Хешированная равномерная сетка над положениями объектов в один момент времени.
+
+    Точки сортируются по ключу ячейки, поэтому содержимое любой ячейки — это
+    непрерывный отрезок массива, который находится через searchsorted за O(log n).
+    Запросы по радиусу и по контейнеру просматривают только ячейки, которые
+    пересекают область запроса, а не весь каталог.
+    """
+
+    def __init__(
+        self,
+        positions: np.ndarray,
+        indices: Optional[np.ndarray] = None,
+        cell_size_km: float = DEFAULT_CELL_SIZE_KM,
+    ):
+        """
+        Аргументы:
+            positions (np.ndarray): Положения объектов (N, 3) в км.
+            indices (np.ndarray, optional): Индексы объектов в каталоге; по умолчанию 0..N-1.
+            cell_size_km (float): Размер ячейки сетки.
+        """
+        positions = np.asarray(positions, dtype=float)
+        if indices is None:
+            indices = np.arange(len(positions))
+
+        # Объекты без достоверного положения (ошибка SGP4) в индекс не попадают
+        valid = np.all(np.isfinite(positions), axis=1)
+        positions = positions[valid]
+        indices = np.asarray(indices)[valid]
+
+        self.cell_size_km = float(cell_size_km)
+        cells = np.floor(positions / self.cell_size_km).astype(np.int64)
+        keys = _pack_cells(cells)
+
+        order = np.argsort(keys, kind="stable")
+        self.positions = positions[order]
+        self.indices = indices[order]
+        self._keys = keys[order]
+        self._cell_keys, self._cell_starts = np.unique(self._keys, return_index=True)
+        self._cell_stops = np.append(self._cell_starts[1:], len(self._keys))
+
+    @classmethod
+    def from_catalog(
+        cls,
+        catalog: TLECatalog,
+        t: Time,
+        indices: Optional[np.ndarray] = None,
+        cell_size_km: float = DEFAULT_CELL_SIZE_KM,
+    ) -> "SpatialIndex":
+        """
+        Строит индекс по положениям объектов каталога (GCRS) на момент `t`.
+        """
+        if indices is None:
+            indices = np.arange(len(catalog))
+        positions, _, _ = propagate_catalog(catalog, t, indices)
+        return cls(positions[:, 0, :], indices, cell_size_km)
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def _cell_of(self, points: np.ndarray) -> np.ndarray:
+        return np.floor(points / self.cell_size_km).astype(np.int64)
+
+    def _gather(self, keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Возвращает позиции точек в отсортированных массивах для набора ключей
+        ячеек и номер ключа, к которому относится каждая точка.
+        """
+        keys = keys.ravel()
+        if len(self._cell_keys) == 0:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty
+
+        found = np.minimum(np.searchsorted(self._cell_keys, keys), len(self._cell_keys) - 1)
+        hit = self._cell_keys[found] == keys
+
+        starts = self._cell_starts[found[hit]]
+        counts = self._cell_stops[found[hit]] - starts
+        owners = np.repeat(np.flatnonzero(hit), counts)
+        # Непрерывные отрезки [start, stop) разворачиваются в плоский массив позиций
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        return np.repeat(starts, counts) + offsets, owners
+
+    def query_box(self, min_coords: np.ndarray, max_coords: np.ndarray) -> np.ndarray:
+        """
+        Индексы объектов, находящихся внутри контейнера [min_coords, max_coords].
+        """
+        min_coords = np.asarray(min_coords, dtype=float)
+        max_coords = np.asarray(max_coords, dtype=float)
+        low = self._cell_of(min_coords)
+        high = self._cell_of(max_coords)
+
+        if np.prod(high - low + 1) > len(self._cell_keys):
+            # Контейнер покрывает больше ячеек, чем занято: проще проверить все точки
+            candidates = np.arange(len(self.positions))
+        else:
+            grid = np.stack(
+                np.meshgrid(*[np.arange(low[i], high[i] + 1) for i in range(3)], indexing="ij"),
+                axis=-1,
+            )
+            candidates, _ = self._gather(_pack_cells(grid))
+
+        inside = np.all(
+            (self.positions[candidates] >= min_coords) & (self.positions[candidates] <= max_coords),
+            axis=1,
+        )
+        return np.sort(self.indices[candidates[inside]])
+
+    def query_radius(self, points: np.ndarray, radius_km: float) -> np.ndarray:
+        """
+        Индексы объектов в пределах `radius_km` хотя бы от одной из точек (K, 3)
+        или от одной точки (3,).
+        """
+        points = np.atleast_2d(np.asarray(points, dtype=float))
+        reach = int(np.ceil(radius_km / self.cell_size_km))
+        span = np.arange(-reach, reach + 1)
+        offsets = np.stack(np.meshgrid(span, span, span, indexing="ij"), axis=-1).reshape(-1, 3)
+
+        if len(offsets) > len(self.positions):
+            # Радиус много больше ячейки: проверяем все пары точка-объект напрямую
+            point_of = np.repeat(np.arange(len(points)), len(self.positions))
+            candidates = np.tile(np.arange(len(self.positions)), len(points))
+        else:
+            cells = self._cell_of(points)
+            keys = _pack_cells(cells[:, np.newaxis, :] + offsets[np.newaxis, :, :])
+            candidates, owners = self._gather(keys)
+            point_of = owners // len(offsets)
+
+        distance = np.linalg.norm(self.positions[candidates] - points[point_of], axis=1)
+        return np.unique(self.indices[candidates[distance <= radius_km]])
+
+    def query_pairs(self, radius_km: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Все пары объектов, находящихся друг от друга не дальше `radius_km`.
+
+        Возвращает:
+            Tuple[np.ndarray, np.ndarray]: пары индексов каталога (P, 2), где первый
+            индекс меньше второго, и расстояния между ними (P,) в км.
+        """
+        if radius_km > self.cell_size_km:
+            # Соседние ячейки должны покрывать радиус: перестраиваем сетку
+            return SpatialIndex(self.positions, self.indices, radius_km).query_pairs(radius_km)
+
+        cells = self._cell_of(self.positions)
+        keys = _pack_cells(cells[:, np.newaxis, :] + _NEIGHBOR_OFFSETS[np.newaxis, :, :])
+        candidates, owners = self._gather(keys)
+        first = owners // len(_NEIGHBOR_OFFSETS)
+
+        # Каждая пара учитывается один раз
+        keep = first < candidates
+        first, second = first[keep], candidates[keep]
+        distance = np.linalg.norm(self.positions[first] - self.positions[second], axis=1)
+        close = distance <= radius_km
+
+        pairs = np.stack([self.indices[first[close]], self.indices[second[close]]], axis=1)
+        pairs.sort(axis=1)
+        order = np.lexsort((pairs[:, 1], pairs[:, 0]))
+        return pairs[order], distance[close][order]
@@ -1,87 +1,594 @@
-import requests
-import time
+import asyncio
 import json
 import os
+import signal
 import logging
+import threading
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from typing import Callable, List, Dict, Any, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+import numpy as np
+
+from .catalog import CATALOG_DTYPE, TLECatalog, parse_tle_records
+from .satellite_cache import clear_satellite_cache
+from .shared_catalog import (
+    SHARED_CATALOG_ENV,
+    SharedCatalogPublisher,
+    attach_shared_catalog,
+    attach_shared_generation,
+    shared_catalog_name,
+)
 
 logger = logging.getLogger(__name__)
 
-CACHE_FILE = "/tmp/tle_cache.json"
+# Бинарный кэш: каталог и группы хранятся в файлах .npy (структурированные массивы
+# CATALOG_DTYPE), которые процессы открывают через mmap и разделяют без копирования.
+# Валидаторы HTTP и время загрузки групп лежат в небольшом meta.json.
+CACHE_DIR = "/tmp/tle_cache"
 CACHE_DURATION_HOURS = 4
 
-def get_all_trackable_objects() -> List[Dict[str, Any]]:
+# Параметры загрузки с CelesTrak
+REQUEST_TIMEOUT_S = 90
+MAX_CONCURRENT_REQUESTS = 8  # Одновременных запросов (и соединений в пуле)
+REQUEST_INTERVAL_PER_HOST_S = 0.2  # Минимальный интервал между запросами к одному хосту
+
+_CELESTRAK_URL = "https://celestrak.org/NORAD/elements/gp.php"
+CELESTRAK_GROUPS = {
+    "active": f"{_CELESTRAK_URL}?GROUP=active&FORMAT=tle",
+    "stations": f"{_CELESTRAK_URL}?GROUP=stations&FORMAT=tle",
+    "rocket-bodies": f"{_CELESTRAK_URL}?GROUP=rocket-bodies&FORMAT=tle",
+    "cosmos-1408-debris": f"{_CELESTRAK_URL}?GROUP=cosmos-1408-debris&FORMAT=tle",
+    "iridium-33-debris": f"{_CELESTRAK_URL}?GROUP=iridium-33-debris&FORMAT=tle",
+    "cosmos-2251-debris": f"{_CELESTRAK_URL}?GROUP=cosmos-2251-debris&FORMAT=tle",
+    "fengyun-1c-debris": f"{_CELESTRAK_URL}?GROUP=fengyun-1c-debris&FORMAT=tle",
+    "dmsp-f13-debris": f"{_CELESTRAK_URL}?GROUP=dmsp-f13-debris&FORMAT=tle",
+    "breeze-m-debris": f"{_CELESTRAK_URL}?GROUP=breeze-m-debris&FORMAT=tle",
+    "debris": f"{_CELESTRAK_URL}?GROUP=DEBRIS&FORMAT=tle",
+    "decaying": f"{_CELESTRAK_URL}?SPECIAL=DECAYING&FORMAT=tle",
+}
+
+# Срок актуальности отдельных групп (часы). Группы, которых нет в словаре,
+# перепроверяются каждые CACHE_DURATION_HOURS.
+GROUP_CACHE_DURATION_HOURS: Dict[str, float] = {}
+
+# Пауза перед повторной попыткой, если фоновое обновление не удалось
+REFRESH_RETRY_INTERVAL_S = 300
+# Как часто воркер опрашивает shared memory, пока первый снимок не опубликован
+SHARED_CATALOG_POLL_INTERVAL_S = 0.5
+
+# Текущий снимок каталога, общий для всех запросов процесса.
+_catalog: Optional[TLECatalog] = None
+# Момент, когда снимок нужно перепроверить (самый ранний срок среди групп)
+_catalog_expires_at = datetime.min
+# Версии групп, из которых построен снимок: (группа, время последнего изменения)
+_catalog_stamp: Tuple[Tuple[str, str], ...] = ()
+_catalog_lock = threading.Lock()
+_sync_refresh_lock = threading.Lock()
+# Единственное выполняющееся фоновое обновление (single-flight)
+_refresh_task: Optional[asyncio.Task] = None
+# Единственная выполняющаяся подготовка нового общего снимка (single-flight)
+_follow_task: Optional[asyncio.Task] = None
+
+
+def _is_fresh() -> bool:
+    return _catalog is not None and datetime.utcnow() < _catalog_expires_at
+
+
+def _group_expires_at(category: str, state: Optional[Dict[str, Any]]) -> datetime:
+    if state is None:
+        return datetime.min
+    hours = GROUP_CACHE_DURATION_HOURS.get(category, CACHE_DURATION_HOURS)
+    return datetime.fromisoformat(state["fetched_at"]) + timedelta(hours=hours)
+
+
+def _groups_expire_at(groups: Dict[str, Dict[str, Any]]) -> datetime:
+    return min(_group_expires_at(category, groups.get(category)) for category in CELESTRAK_GROUPS)
+
+
+def _load_records(path: str) -> np.ndarray:
     """
-    Загружает и парсит TLE-данные для всех отслеживаемых объектов,
-    используя файловый кэш для уменьшения количества запросов.
+    Открывает файл записей через mmap (только для чтения).
+    """
+    records = np.load(path, mmap_mode="r")
+    if records.dtype != CATALOG_DTYPE:
+        raise ValueError(f"Неожиданный формат записей в {path}")
+    return records
+
+
+def _save_records(path: str, records: np.ndarray) -> None:
+    """
+    Атомарно записывает массив записей: процессы, уже открывшие старый файл
+    через mmap, продолжают читать прежнюю версию.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, np.ascontiguousarray(records, dtype=CATALOG_DTYPE))
+    os.replace(tmp_path, path)
+
+
+def _read_cache_file() -> Tuple[Dict[str, Dict[str, Any]], Optional[list]]:
+    """
+    Читает файловый кэш. Для каждой группы возвращает ее записи (через mmap),
+    валидаторы HTTP (ETag, Last-Modified) и время последней проверки, а также
+    версию групп, из которой собран файл каталога.
+    """
+    meta_path = os.path.join(CACHE_DIR, "meta.json")
+    if not os.path.exists(meta_path):
+        return {}, None
+
+    try:
+        with open(meta_path, 'r') as f:
+            meta = json.load(f)
+        groups = {}
+        for category, state in meta["groups"].items():
+            datetime.fromisoformat(state["fetched_at"])
+            records = _load_records(os.path.join(CACHE_DIR, "groups", f"{category}.npy"))
+            groups[category] = {**state, "records": records}
+        return groups, meta.get("catalog_stamp")
+    except (OSError, json.JSONDecodeError, KeyError, TypeError, ValueError):
+        logger.warning("CACHE ERROR: Ошибка чтения кэша. Будут загружены свежие данные.")
+    return {}, None
+
+
+def _write_cache_file(groups: Dict[str, Dict[str, Any]]) -> None:
+    """
+    Сохраняет группы, объединенный каталог и метаданные. Метаданные пишутся
+    последними, поэтому читатели никогда не видят ссылок на незаписанные файлы.
     """
-    # Проверка кэша
-    if os.path.exists(CACHE_FILE):
-        with open(CACHE_FILE, 'r') as f:
-            try:
-                cache_data = json.load(f)
-                last_fetched_time = datetime.fromisoformat(cache_data["timestamp"])
-                if datetime.utcnow() - last_fetched_time < timedelta(hours=CACHE_DURATION_HOURS):
-                    logger.info("CACHE HIT: Загрузка данных из кэша.")
-                    return cache_data["data"]
-            except (json.JSONDecodeError, KeyError, ValueError):
-                logger.warning("CACHE ERROR: Ошибка чтения кэша. Будут загружены свежие данные.")
-
-    # Если кэш недействителен или отсутствует, загружаем данные из сети
-    logger.info("CACHE MISS: Кэш недействителен или отсутствует. Загрузка свежих данных с CelesTrak.")
-
-    base_url = "https://celestrak.org/NORAD/elements/gp.php"
-    urls = {
-        "active": f"{base_url}?GROUP=active&FORMAT=tle",
-        "stations": f"{base_url}?GROUP=stations&FORMAT=tle",
-        "rocket-bodies": f"{base_url}?GROUP=rocket-bodies&FORMAT=tle",
-        "cosmos-1408-debris": f"{base_url}?GROUP=cosmos-1408-debris&FORMAT=tle",
-        "iridium-33-debris": f"{base_url}?GROUP=iridium-33-debris&FORMAT=tle",
-        "cosmos-2251-debris": f"{base_url}?GROUP=cosmos-2251-debris&FORMAT=tle",
-        "fengyun-1c-debris": f"{base_url}?GROUP=fengyun-1c-debris&FORMAT=tle",
-        "dmsp-f13-debris": f"{base_url}?GROUP=dmsp-f13-debris&FORMAT=tle",
-        "breeze-m-debris": f"{base_url}?GROUP=breeze-m-debris&FORMAT=tle",
-        "debris": f"{base_url}?GROUP=DEBRIS&FORMAT=tle",
-        "decaying": f"{base_url}?SPECIAL=DECAYING&FORMAT=tle",
+    os.makedirs(os.path.join(CACHE_DIR, "groups"), exist_ok=True)
+    for category, state in groups.items():
+        _save_records(os.path.join(CACHE_DIR, "groups", f"{category}.npy"), state["records"])
+    _save_records(os.path.join(CACHE_DIR, "catalog.npy"), _merge_groups(groups))
+
+    meta = {
+        "timestamp": datetime.utcnow().isoformat(),
+        "catalog_stamp": [list(item) for item in _groups_stamp(groups)],
+        "groups": {
+            category: {key: value for key, value in state.items() if key != "records"}
+            for category, state in groups.items()
+        },
     }
+    meta_path = os.path.join(CACHE_DIR, "meta.json")
+    tmp_path = f"{meta_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, meta_path)
 
-    unique_objects: Dict[int, Dict[str, Any]] = {}
 
-    for category, url in urls.items():
-        logger.info(f"Загрузка данных из категории '{category}' с {url}...")
-        time.sleep(1)
+def _parse_tle_text(text: str) -> List[Dict[str, Any]]:
+    """
+    Разбирает ответ CelesTrak в формате трехстрочных TLE.
+    """
+    objects = []
+    lines = text.strip().splitlines()
+    for i in range(0, len(lines), 3):
+        try:
+            name = lines[i].strip()
+            line1 = lines[i + 1].strip()
+            line2 = lines[i + 2].strip()
+            if len(line1) != 69 or len(line2) != 69:
+                continue
+            sat_num = int(line1[2:7])
+            objects.append({"name": name, "number": sat_num, "line1": line1, "line2": line2})
+        except (IndexError, ValueError):
+            continue
+    return objects
 
+
+async def _fetch_group(
+    client: httpx.AsyncClient,
+    category: str,
+    url: str,
+    state: Optional[Dict[str, Any]],
+    semaphore: asyncio.Semaphore,
+    host_next_slot: Dict[str, float],
+) -> Optional[Dict[str, Any]]:
+    """
+    Загружает одну группу CelesTrak условным запросом, соблюдая ограничения на
+    число одновременных запросов и минимальный интервал между запросами к хосту.
+
+    Возвращает новое состояние группы или None, если запрос не удался.
+    """
+    headers = {}
+    if state is not None:
+        if state.get("etag"):
+            headers["If-None-Match"] = state["etag"]
+        if state.get("last_modified"):
+            headers["If-Modified-Since"] = state["last_modified"]
+
+    async with semaphore:
+        # Резервируем ближайший свободный слот для хоста до первого await,
+        # поэтому конкурирующие задачи получают разные слоты.
+        loop = asyncio.get_running_loop()
+        host = urlsplit(url).netloc
+        now = loop.time()
+        slot = max(now, host_next_slot.get(host, now))
+        host_next_slot[host] = slot + REQUEST_INTERVAL_PER_HOST_S
+        await asyncio.sleep(slot - now)
+
+        logger.info(f"Загрузка данных из категории '{category}' с {url}...")
         try:
-            response = requests.get(url, timeout=90)
-            response.raise_for_status()
-            lines = response.text.strip().splitlines()
-            logger.info(f"Получено {len(lines) // 3} объектов из '{category}'.")
-
-            for i in range(0, len(lines), 3):
-                try:
-                    name = lines[i].strip()
-                    line1 = lines[i + 1].strip()
-                    line2 = lines[i + 2].strip()
-                    if len(line1) != 69 or len(line2) != 69:
-                        continue
-                    sat_num = int(line1[2:7])
-                    unique_objects[sat_num] = {"name": name, "number": sat_num, "line1": line1, "line2": line2}
-                except (IndexError, ValueError):
-                    continue
-        except requests.exceptions.RequestException as e:
+            response = await client.get(url, headers=headers)
+            if response.status_code != 304:
+                response.raise_for_status()
+        except httpx.HTTPError as e:
             logger.error(f"Произошла ошибка при запросе {url}: {e}")
-            continue
+            return None
+
+    fetched_at = datetime.utcnow().isoformat()
+
+    if response.status_code == 304 and state is not None:
+        logger.info(f"Категория '{category}' не изменилась (304), используются сохраненные данные.")
+        return {**state, "fetched_at": fetched_at}
+
+    # Разбор TLE выполняется вне event loop
+    records, _ = await asyncio.to_thread(parse_tle_records, _parse_tle_text(response.text))
+    logger.info(f"Получено {len(records)} объектов из '{category}'.")
+    return {
+        "fetched_at": fetched_at,
+        "updated_at": fetched_at,
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "records": records,
+    }
+
+
+async def _update_groups_async(
+    groups: Dict[str, Dict[str, Any]],
+    client: Optional[httpx.AsyncClient] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Перепроверяет на CelesTrak только устаревшие группы. Все группы загружаются
+    параллельно через один пул HTTP-соединений; при ошибке сохраняются прежние
+    данные группы.
+    """
+    if client is None:
+        async with httpx.AsyncClient(
+            timeout=REQUEST_TIMEOUT_S,
+            limits=httpx.Limits(max_connections=MAX_CONCURRENT_REQUESTS),
+        ) as client:
+            return await _update_groups_async(groups, client)
+
+    now = datetime.utcnow()
+    stale = [
+        category for category in CELESTRAK_GROUPS
+        if _group_expires_at(category, groups.get(category)) <= now
+    ]
+    logger.info(f"CACHE MISS: Устарели группы {stale}. Загрузка свежих данных с CelesTrak.")
+
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    host_next_slot: Dict[str, float] = {}
+    results = await asyncio.gather(*[
+        _fetch_group(client, category, CELESTRAK_GROUPS[category], groups.get(category),
+                     semaphore, host_next_slot)
+        for category in stale
+    ])
 
-    object_list = list(unique_objects.values())
+    updated = dict(groups)
+    for category, state in zip(stale, results):
+        if state is not None:
+            updated[category] = state
+    return updated
 
-    # Сохранение данных в кэш
-    with open(CACHE_FILE, 'w') as f:
-        cache_content = {
-            "timestamp": datetime.utcnow().isoformat(),
-            "data": object_list
-        }
-        json.dump(cache_content, f)
 
-    logger.info(f"Загрузка завершена. Всего уникальных объектов: {len(object_list)}. Кэш обновлен.")
-    return object_list
+def _merge_groups(groups: Dict[str, Dict[str, Any]]) -> np.ndarray:
+    """
+    Объединяет группы в порядке CELESTRAK_GROUPS, убирая дубликаты по номеру NORAD:
+    объект остается на позиции первого появления, а данные берутся из последней
+    группы, как при последовательной вставке в словарь.
+    """
+    parts = [groups[category]["records"] for category in CELESTRAK_GROUPS if category in groups]
+    if not parts:
+        return np.empty(0, dtype=CATALOG_DTYPE)
+
+    records = np.concatenate(parts)
+    numbers = records["number"]
+    _, first_index = np.unique(numbers, return_index=True)
+    _, last_index_reversed = np.unique(numbers[::-1], return_index=True)
+    last_index = len(numbers) - 1 - last_index_reversed
+    return records[last_index[np.argsort(first_index, kind="stable")]]
+
+
+def _groups_stamp(groups: Dict[str, Dict[str, Any]]) -> Tuple[Tuple[str, str], ...]:
+    return tuple(
+        (category, groups[category].get("updated_at", ""))
+        for category in CELESTRAK_GROUPS if category in groups
+    )
+
+
+def _groups_fetched_at(groups: Dict[str, Dict[str, Any]]) -> datetime:
+    return max(
+        (datetime.fromisoformat(state["fetched_at"]) for state in groups.values()),
+        default=datetime.utcnow(),
+    )
+
+
+def _cached_records(groups: Dict[str, Dict[str, Any]], catalog_stamp: Optional[list]) -> np.ndarray:
+    """
+    Записи каталога из файлового кэша. Если файл каталога собран из тех же версий
+    групп, он открывается через mmap без разбора и копирования, иначе группы
+    объединяются заново.
+    """
+    if catalog_stamp is not None and tuple(map(tuple, catalog_stamp)) == _groups_stamp(groups):
+        try:
+            return _load_records(os.path.join(CACHE_DIR, "catalog.npy"))
+        except (OSError, ValueError) as e:
+            logger.warning(f"CACHE ERROR: Не удалось открыть файл каталога: {e}")
+    return _merge_groups(groups)
+
+
+def _install_catalog(
+    groups: Dict[str, Dict[str, Any]], catalog_stamp: Optional[list] = None
+) -> TLECatalog:
+    """
+    Делает текущим снимок каталога, собранный из групп, и атомарно подменяет им
+    предыдущий. Запросы, уже получившие предыдущий снимок, продолжают работать с ним.
+    Если данные групп не изменились (все ответы 304), продлевается срок текущего снимка.
+
+    Если файл каталога собран из тех же версий групп, записи открываются через mmap
+    без разбора и копирования.
+    """
+    global _catalog, _catalog_expires_at, _catalog_stamp
+
+    stamp = _groups_stamp(groups)
+    expires_at = _groups_expire_at(groups)
+
+    with _catalog_lock:
+        if _catalog is not None and stamp == _catalog_stamp:
+            _catalog_expires_at = max(expires_at, datetime.utcnow() + timedelta(seconds=REFRESH_RETRY_INTERVAL_S))
+            return _catalog
+
+        records = _cached_records(groups, catalog_stamp)
+        if len(records) == 0 and _catalog is not None:
+            logger.error("Не удалось загрузить ни одной группы TLE. Продолжаем использовать предыдущий снимок.")
+            _catalog_expires_at = datetime.utcnow() + timedelta(seconds=REFRESH_RETRY_INTERVAL_S)
+            return _catalog
+
+        generation = _catalog.generation + 1 if _catalog is not None else 1
+        catalog = _prepare_catalog(
+            TLECatalog(records, generation=generation, fetched_at=_groups_fetched_at(groups))
+        )
+        _catalog = catalog
+        _catalog_stamp = stamp
+        # Если какая-то группа так и не загрузилась, повторим попытку позже
+        _catalog_expires_at = max(expires_at, datetime.utcnow() + timedelta(seconds=REFRESH_RETRY_INTERVAL_S))
+        clear_satellite_cache()
+    logger.info(f"Загрузка завершена. Всего уникальных объектов: {len(catalog)} (поколение {generation}).")
+    return catalog
+
+
+def _prepare_catalog(catalog: TLECatalog) -> TLECatalog:
+    """
+    Строит индексы и карту загруженности снимка сразу, а не в первом запросе.
+    """
+    catalog.shell_index
+    catalog.congestion_report
+    catalog.congestion_cube
+    return catalog
+
+
+def _use_shared_catalog(catalog: TLECatalog) -> TLECatalog:
+    """
+    Делает подключенный общий снимок текущим, если он новее текущего.
+    """
+    global _catalog
+
+    with _catalog_lock:
+        if _catalog is None or catalog.generation > _catalog.generation:
+            _catalog = catalog
+            clear_satellite_cache()
+            logger.info(
+                f"Подключен общий снимок каталога: поколение {catalog.generation}, {len(catalog)} объектов."
+            )
+        return _catalog
+
+
+def _follow_shared_catalog() -> Optional[TLECatalog]:
+    """
+    В режиме общего каталога подключает последний снимок из shared memory.
+    Возвращает None, если режим выключен или снимок еще не опубликован.
+
+    Синхронная версия (процессы пула вычислений, скрипты): индексы снимка
+    строятся по мере обращения к ним.
+    """
+    catalog = attach_shared_catalog(_catalog)
+    if catalog is None or catalog is _catalog:
+        return catalog
+    return _use_shared_catalog(catalog)
+
+
+async def _adopt_shared_catalog(catalog: TLECatalog) -> TLECatalog:
+    # Индексы строятся вне event loop; до их готовности запросы получают прежний снимок
+    await asyncio.to_thread(_prepare_catalog, catalog)
+    return _use_shared_catalog(catalog)
+
+
+def get_catalog() -> TLECatalog:
+    """
+    Возвращает текущий снимок каталога TLE. Каталог строится один раз на каждое
+    обновление кэша и переиспользуется всеми запросами процесса.
+
+    Синхронная версия для кода вне event loop: при устаревшем кэше обновляет
+    каталог на месте. Обработчики запросов используют get_catalog_async().
+    """
+    catalog = _follow_shared_catalog()
+    if catalog is not None:
+        return catalog
+
+    if _is_fresh():
+        return _catalog
+
+    with _sync_refresh_lock:
+        # Другой поток мог обновить каталог, пока мы ждали блокировку
+        if _is_fresh():
+            return _catalog
+
+        groups, catalog_stamp = _read_cache_file()
+        if _groups_expire_at(groups) <= datetime.utcnow():
+            groups = asyncio.run(_update_groups_async(groups))
+            _write_cache_file(groups)
+            groups, catalog_stamp = _read_cache_file()
+        else:
+            logger.info("CACHE HIT: Загрузка данных из кэша.")
+        return _install_catalog(groups, catalog_stamp)
+
+
+def get_cached_catalog(generation: int) -> TLECatalog:
+    """
+    Снимок каталога для процессов вычислений. В режиме общего каталога это
+    опубликованный снимок поколения `generation` (тот же, что у воркера), иначе —
+    файловый кэш, из которого воркер построил свой снимок поколения `generation`;
+    снимок получает тот же номер поколения. Снимок перечитывается, только когда
+    номер меняется.
+
+    В отличие от get_catalog() данные с CelesTrak не загружаются никогда:
+    каталог обновляет только воркер (или отдельный процесс-публикатор).
+
+    Исключения:
+        StaleCatalogError: Снимок поколения `generation` уже удален из shared memory.
+    """
+    global _catalog
+
+    if shared_catalog_name() is not None:
+        with _catalog_lock:
+            if _catalog is not None and _catalog.generation == generation:
+                return _catalog
+        catalog = attach_shared_generation(generation)
+        with _catalog_lock:
+            _catalog = catalog
+            clear_satellite_cache()
+        return catalog
+
+    with _sync_refresh_lock:
+        if _catalog is not None and _catalog.generation == generation:
+            return _catalog
+
+        groups, catalog_stamp = _read_cache_file()
+        if not groups:
+            raise RuntimeError("Файловый кэш каталога TLE пуст: воркер еще не загрузил каталог.")
+        catalog = TLECatalog(
+            _cached_records(groups, catalog_stamp),
+            generation=generation,
+            fetched_at=_groups_fetched_at(groups),
+        )
+        with _catalog_lock:
+            _catalog = catalog
+            clear_satellite_cache()
+    return catalog
+
+
+async def _refresh_catalog() -> TLECatalog:
+    if _is_fresh():
+        return _catalog
+
+    # Чтение файла и построение каталога выполняются вне event loop
+    groups, catalog_stamp = await asyncio.to_thread(_read_cache_file)
+    if _groups_expire_at(groups) <= datetime.utcnow():
+        groups = await _update_groups_async(groups)
+        await asyncio.to_thread(_write_cache_file, groups)
+        # Перечитываем кэш, чтобы снимок ссылался на файлы через mmap
+        groups, catalog_stamp = await asyncio.to_thread(_read_cache_file)
+    else:
+        logger.info("CACHE HIT: Загрузка данных из кэша.")
+    return await asyncio.to_thread(_install_catalog, groups, catalog_stamp)
+
+
+async def refresh_catalog_async() -> TLECatalog:
+    """
+    Обновляет каталог, если он устарел. Одновременные вызовы ожидают одно и то же
+    обновление вместо того, чтобы загружать данные параллельно.
+    """
+    global _refresh_task
+
+    if _refresh_task is None or _refresh_task.done():
+        _refresh_task = asyncio.create_task(_refresh_catalog())
+    return await asyncio.shield(_refresh_task)
+
+
+async def get_catalog_async() -> TLECatalog:
+    """
+    Асинхронная версия get_catalog() для обработчиков запросов.
+
+    Устаревший снимок возвращается сразу, а обновление запускается в фоне
+    (stale-while-revalidate). Ожидание загрузки возможно только при самом
+    первом обращении, когда снимка еще нет.
+    """
+    global _refresh_task, _follow_task
+
+    if shared_catalog_name() is not None:
+        # Каталог обновляет отдельный процесс, воркер только читает снимки
+        if _catalog is not None and _follow_task is not None and not _follow_task.done():
+            return _catalog
+        catalog = attach_shared_catalog(_catalog)
+        while catalog is None:
+            await asyncio.sleep(SHARED_CATALOG_POLL_INTERVAL_S)
+            catalog = attach_shared_catalog(_catalog)
+        if catalog is _catalog:
+            return catalog
+
+        if _follow_task is None or _follow_task.done():
+            _follow_task = asyncio.create_task(_adopt_shared_catalog(catalog))
+        if _catalog is None:
+            return await asyncio.shield(_follow_task)
+        return _catalog
+
+    catalog = _catalog
+    if catalog is None:
+        return await refresh_catalog_async()
+
+    if not _is_fresh() and (_refresh_task is None or _refresh_task.done()):
+        _refresh_task = asyncio.create_task(_refresh_catalog())
+    return catalog
+
+
+async def run_catalog_refresher(
+    on_refresh: Optional[Callable[[TLECatalog], None]] = None,
+) -> None:
+    """
+    Фоновая задача, которая обновляет каталог по расписанию: сразу после
+    запуска и далее по истечении срока актуальности самой ранней группы.
+    `on_refresh` вызывается с текущим снимком после каждой проверки.
+    """
+    while True:
+        delay = REFRESH_RETRY_INTERVAL_S
+        try:
+            catalog = await refresh_catalog_async()
+            if on_refresh is not None:
+                on_refresh(catalog)
+            if _is_fresh():
+                delay = (_catalog_expires_at - datetime.utcnow()).total_seconds()
+        except Exception as e:
+            logger.error(f"Ошибка фонового обновления каталога TLE: {e}", exc_info=True)
+
+        await asyncio.sleep(max(delay, 1.0))
+
+
+def run_catalog_publisher(name: str) -> None:
+    """
+    Точка входа отдельного процесса, который обновляет каталог и публикует
+    каждый новый снимок в shared memory для воркеров.
+    """
+    # Этот процесс сам загружает каталог, а не читает общий
+    os.environ.pop(SHARED_CATALOG_ENV, None)
+    # SIGTERM завершает процесс так же штатно, как SIGINT от менеджера Sanic
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    publisher = SharedCatalogPublisher(name)
+    try:
+        asyncio.run(run_catalog_refresher(on_refresh=publisher.publish))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        publisher.close()
+
+
+def get_all_trackable_objects() -> List[Dict[str, Any]]:
+    """
+    Загружает и парсит TLE-данные для всех отслеживаемых объектов,
+    используя файловый кэш для уменьшения количества запросов.
+
+    Тонкое представление над get_catalog(): список словарей строится один раз
+    на снимок каталога и не должен изменяться вызывающим кодом.
+    """
+    return get_catalog().objects
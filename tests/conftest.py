@@ -0,0 +1,63 @@
+import math
+
+import numpy as np
+import pytest
+from sgp4.api import WGS72, Satrec
+from sgp4.exporter import export_tle
+
+from satellite_tracker.catalog import build_catalog
+from satellite_tracker.orbit import EARTH_RADIUS_KM, MU_KM3_PER_S2
+from satellite_tracker.satellite_cache import ts
+
+# Момент, относительно которого заданы эпохи синтетических TLE
+T_START = ts.utc(2026, 10, 17, 12)
+
+# Эпоха SGP4 отсчитывается в сутках от 1949-12-31 00:00 UTC
+_SGP4_EPOCH_JD = 2433281.5
+
+
+def make_tle_objects(count: int, seed: int = 1):
+    """
+    Синтетические TLE в формате get_all_trackable_objects(): плотный слой
+    550 км / 53°, солнечно-синхронные орбиты, разреженный LEO, несколько
+    эллиптических и высоких орбит. Эпохи — за последние сутки до T_START.
+    """
+    rng = np.random.default_rng(seed)
+    objects = []
+    for number in range(1, count + 1):
+        kind = rng.random()
+        if kind < 0.5:
+            altitude_km, inclination = rng.normal(550.0, 3.0), 53.0 + rng.normal(0.0, 0.1)
+        elif kind < 0.75:
+            altitude_km, inclination = rng.uniform(500.0, 600.0), 97.5 + rng.normal(0.0, 0.2)
+        elif kind < 0.95:
+            altitude_km, inclination = rng.uniform(300.0, 1500.0), rng.uniform(0.0, 180.0)
+        else:
+            altitude_km, inclination = rng.uniform(1500.0, 36000.0), rng.uniform(0.0, 120.0)
+        eccentricity = rng.uniform(0.0, 0.002) if kind < 0.95 else rng.uniform(0.0, 0.3)
+
+        semi_major_axis_km = EARTH_RADIUS_KM + altitude_km
+        mean_motion_rad_min = math.sqrt(MU_KM3_PER_S2 / semi_major_axis_km**3) * 60.0
+        satrec = Satrec()
+        satrec.sgp4init(
+            WGS72, "i", number, T_START.tt - _SGP4_EPOCH_JD - rng.uniform(0.0, 1.0),
+            rng.uniform(0.0, 1e-4), 0.0, 0.0, eccentricity, rng.uniform(0.0, 2 * math.pi),
+            math.radians(inclination), rng.uniform(0.0, 2 * math.pi), mean_motion_rad_min,
+            rng.uniform(0.0, 2 * math.pi),
+        )
+        line1, line2 = export_tle(satrec)
+        objects.append({"name": f"OBJECT {number}", "number": number, "line1": line1, "line2": line2})
+    return objects
+
+
+@pytest.fixture(scope="session")
+def t_start():
+    return T_START
+
+
+@pytest.fixture(scope="session")
+def tle_catalog():
+    """
+    Каталог из синтетических TLE, общий для тестов пропагации и поиска сближений.
+    """
+    return build_catalog(make_tle_objects(1500), generation=1)
@@ -0,0 +1,87 @@
+import math
+
+import numpy as np
+import pytest
+
+from satellite_tracker.catalog import CATALOG_DTYPE, TLECatalog
+from satellite_tracker.congestion import CongestionCube
+from satellite_tracker.orbit import EARTH_RADIUS_KM, MU_KM3_PER_S2
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    """
+    Синтетический каталог: высоты, наклонения и RAAN заданы напрямую.
+    """
+    rng = np.random.default_rng(7)
+    count = 5000
+    altitude_km = np.concatenate(
+        [rng.uniform(200.0, 2000.0, count - 500), rng.uniform(2000.0, 45000.0, 500)]
+    )
+    records = np.zeros(count, dtype=CATALOG_DTYPE)
+    records["number"] = np.arange(count)
+    semi_major_axis_km = EARTH_RADIUS_KM + altitude_km
+    records["mean_motion"] = np.sqrt(MU_KM3_PER_S2 / semi_major_axis_km**3) * 86400.0 / (2 * math.pi)
+    records["inclination"] = rng.uniform(0.0, 180.0, count)
+    records["raan"] = rng.uniform(0.0, 360.0, count)
+    return TLECatalog(records, generation=1)
+
+
+@pytest.fixture(scope="module")
+def cube(catalog):
+    return CongestionCube(catalog)
+
+
+@pytest.mark.parametrize(
+    "window, max_cells",
+    [
+        ((0.0, 2000.0, 0.0, 180.0, None, None), 10000),
+        ((0.0, 2000.0, 0.0, 180.0, None, None), 100),
+        ((0.0, 50000.0, 0.0, 180.0, None, None), 10000),
+        ((400.0, 600.0, 50.0, 55.0, None, None), 10000),
+        ((0.0, 2000.0, 0.0, 180.0, 0.0, 360.0), 10000),
+        ((0.0, 50000.0, 0.0, 180.0, 0.0, 360.0), 1000),
+        ((300.0, 1200.0, 40.0, 60.0, 0.0, 90.0), 100000),
+    ],
+)
+def test_grid_respects_max_cells(cube, window, max_cells):
+    level, edges, counts = cube.grid(*window, max_cells=max_cells)
+
+    assert counts.size <= max_cells
+    assert counts.shape == tuple(len(edge) - 1 for edge in edges)
+    assert level.dimensions == (3 if window[4] is not None else 2)
+
+
+def test_grid_picks_finest_fitting_level(cube):
+    level, _, counts = cube.grid(400.0, 600.0, 50.0, 55.0, max_cells=100000)
+
+    assert level.describe() == {"altitude_step_km": 1.0, "inclination_step_deg": 0.5}
+    assert counts.shape == (200, 10)
+
+
+def test_grid_rejects_window_that_never_fits(cube):
+    with pytest.raises(ValueError):
+        cube.grid(0.0, 50000.0, 0.0, 180.0, max_cells=1)
+
+
+def test_count_matches_brute_force(catalog, cube):
+    altitude = catalog.shell_index.altitude_km
+    inclination = catalog.inclination
+    raan = catalog.raan
+
+    for bounds in [(450.0, 550.0, 0.0, 180.0), (500.0, 1230.0, 40.5, 97.0), (1000.0, 30000.0, 20.0, 60.0)]:
+        low_altitude, high_altitude, low_inclination, high_inclination = bounds
+        expected = np.count_nonzero(
+            (altitude >= low_altitude) & (altitude < high_altitude)
+            & (inclination >= low_inclination) & (inclination < high_inclination)
+        )
+        assert cube.count(*bounds) == expected
+
+    expected = np.count_nonzero(
+        (altitude >= 0.0) & (altitude < 2000.0) & (raan >= 90.0) & (raan < 180.0)
+    )
+    assert cube.count(0.0, 2000.0, min_raan=90.0, max_raan=180.0) == expected
+
+
+def test_count_returns_none_for_unaligned_bounds(cube):
+    assert cube.count(450.5, 550.5) is None
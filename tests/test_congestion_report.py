@@ -0,0 +1,98 @@
+import json
+import math
+
+import numpy as np
+import pytest
+from skyfield.api import EarthSatellite
+
+from satellite_tracker.congestion import CongestionReport
+from satellite_tracker.orbit import _altitude_to_mean_motion
+from satellite_tracker.satellite_cache import ts
+
+
+def _congestion_map_loop(objects):
+    """
+    Поэлементная агрегация, как в calculate_orbit_congestion_by_altitude до векторизации.
+    """
+    congestion_map = {}
+    for sat_data in objects:
+        model = EarthSatellite(sat_data["line1"], sat_data["line2"], sat_data["name"], ts).model
+        mean_motion = model.no_kozai * (1440.0 / (2 * math.pi))
+        inclination_deg = math.degrees(model.inclo)
+        data = congestion_map.setdefault(
+            (round(mean_motion, 1), int(round(inclination_deg))),
+            {"count": 0, "inclination": [], "mean_motion": []},
+        )
+        data["count"] += 1
+        data["inclination"].append(inclination_deg)
+        data["mean_motion"].append(mean_motion)
+    return congestion_map
+
+
+@pytest.fixture(scope="module")
+def report(tle_catalog):
+    return CongestionReport(tle_catalog)
+
+
+@pytest.fixture(scope="module")
+def expected_map(tle_catalog):
+    return _congestion_map_loop(tle_catalog.objects)
+
+
+def _cells_as_map(cells):
+    return {
+        (int(cell["mean_motion_bin"]) / 10, int(cell["inclination_bin"])): (
+            int(cell["count"]), float(cell["avg_inclination"]), float(cell["avg_mean_motion"])
+        )
+        for cell in cells
+    }
+
+
+def test_report_matches_object_loop(report, expected_map):
+    cells = _cells_as_map(report.cells)
+
+    assert cells.keys() == expected_map.keys()
+    for key, data in expected_map.items():
+        count, avg_inclination, avg_mean_motion = cells[key]
+        assert count == data["count"]
+        assert avg_inclination == pytest.approx(np.mean(data["inclination"]), abs=1e-9)
+        assert avg_mean_motion == pytest.approx(np.mean(data["mean_motion"]), abs=1e-9)
+
+    keys = list(zip(report.cells["mean_motion_bin"].tolist(), report.cells["inclination_bin"].tolist()))
+    assert keys == sorted(keys)
+
+
+@pytest.mark.parametrize(
+    "bounds",
+    [
+        (None, None, None, None),
+        (500.0, 600.0, None, None),
+        (None, 1000.0, 50.0, 60.0),
+        (2000.0, None, None, 30.0),
+        (600.0, 500.0, None, None),
+    ],
+)
+def test_select_matches_cell_centers(report, expected_map, bounds):
+    min_altitude, max_altitude, min_inclination, max_inclination = bounds
+
+    selected = _cells_as_map(report.select(*bounds))
+
+    expected = {
+        key for key in expected_map
+        if (max_altitude is None or key[0] >= _altitude_to_mean_motion(max_altitude))
+        and (min_altitude is None or key[0] <= _altitude_to_mean_motion(min_altitude))
+        and (min_inclination is None or key[1] >= min_inclination)
+        and (max_inclination is None or key[1] <= max_inclination)
+    }
+    assert selected.keys() == expected
+
+
+def test_encoded_json_matches_cells(report, tle_catalog):
+    payload = json.loads(report.json_bytes)
+
+    assert payload["generation"] == tle_catalog.generation
+    assert payload["cell_count"] == len(report.cells)
+    assert payload["object_count"] == len(tle_catalog)
+    assert payload["count"] == report.cells["count"].tolist()
+    assert payload["mean_motion"] == (report.cells["mean_motion_bin"] / 10).tolist()
+    assert payload["inclination"] == report.cells["inclination_bin"].tolist()
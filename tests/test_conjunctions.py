@@ -0,0 +1,203 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from satellite_tracker.conjunctions import (
+    MAX_RELATIVE_SPEED_KM_S,
+    _query_pairs_along_step,
+    _propagate_pairs,
+    _query_primary_pairs_along_step,
+    refine_tca,
+    screen_conjunctions,
+)
+from satellite_tracker.propagation import get_catalog_satrecs, propagate_catalog
+from satellite_tracker.satellite_cache import ts
+from satellite_tracker.spatial_index import SpatialIndex
+
+WINDOW_HOURS = 0.5
+THRESHOLD_KM = 10.0
+# Шаг плотной выборки расстояний для проверки (секунды)
+DENSE_STEP_S = 1.0
+
+
+def _tca_offset_s(event, t_start):
+    return (ts.from_datetime(datetime.fromisoformat(event["tca"])) - t_start) * 86400.0
+
+
+@pytest.fixture(scope="module")
+def events(tle_catalog, t_start):
+    return screen_conjunctions(tle_catalog, t_start, WINDOW_HOURS, 60.0, THRESHOLD_KM)
+
+
+@pytest.fixture(scope="module")
+def close_approaches(tle_catalog, t_start):
+    """
+    Локальные минимумы расстояния ближе порога по плотной выборке SGP4.
+
+    Пары-кандидаты берутся по каждой точке выборки с шагом 5 с в радиусе порога
+    плюс путь, который пара может пройти за половину шага.
+    """
+    window_s = WINDOW_HOURS * 3600.0
+    coarse_step_s = 5.0
+    coarse = ts.tt_jd(t_start.tt + np.arange(0.0, window_s + coarse_step_s / 2, coarse_step_s) / 86400.0)
+    positions, _, _ = propagate_catalog(tle_catalog, coarse, frame="teme")
+    radius_km = THRESHOLD_KM + MAX_RELATIVE_SPEED_KM_S * coarse_step_s / 2
+    pairs = np.unique(
+        np.concatenate(
+            [SpatialIndex(positions[:, step], cell_size_km=radius_km).query_pairs(radius_km)[0]
+             for step in range(len(coarse))]
+        ),
+        axis=0,
+    )
+
+    dense_offsets_s = np.arange(0.0, window_s + DENSE_STEP_S / 2, DENSE_STEP_S)
+    objects, inverse = np.unique(pairs, return_inverse=True)
+    inverse = inverse.reshape(pairs.shape)
+    dense, _, _ = propagate_catalog(
+        tle_catalog, ts.tt_jd(t_start.tt + dense_offsets_s / 86400.0), objects, frame="teme"
+    )
+    distance = np.linalg.norm(dense[inverse[:, 0]] - dense[inverse[:, 1]], axis=2)
+
+    approaches = []
+    for (first, second), series in zip(pairs.tolist(), distance):
+        # Минимумы строго внутри окна: на краях минимум может лежать за окном
+        for k in np.flatnonzero((series[1:-1] <= series[:-2]) & (series[1:-1] <= series[2:])) + 1:
+            approaches.append(
+                (tle_catalog.number[first], tle_catalog.number[second], dense_offsets_s[k], series[k])
+            )
+    return approaches
+
+
+def test_query_pairs_along_step_matches_brute_force():
+    rng = np.random.default_rng(5)
+    positions = rng.uniform(-500.0, 500.0, size=(600, 3))
+    velocities = rng.normal(scale=5.0, size=(600, 3))
+    sub_offsets_s = np.array([-22.5, -7.5, 7.5, 22.5])
+    radius_km = 40.0
+
+    pairs = _query_pairs_along_step(positions, velocities, sub_offsets_s, radius_km)
+
+    moved = positions[np.newaxis] + velocities[np.newaxis] * sub_offsets_s[:, np.newaxis, np.newaxis]
+    distance = np.linalg.norm(moved[:, :, np.newaxis] - moved[:, np.newaxis, :], axis=3)
+    expected = np.argwhere(np.triu((distance <= radius_km).any(axis=0), k=1))
+    assert len(expected) > 0
+    np.testing.assert_array_equal(pairs, expected)
+
+    primary_rows = np.array([3, 77, 598])
+    involved = np.isin(expected, primary_rows).any(axis=1)
+    np.testing.assert_array_equal(
+        _query_primary_pairs_along_step(positions, velocities, primary_rows, sub_offsets_s, radius_km),
+        expected[involved],
+    )
+
+
+def test_screening_finds_every_close_approach(events, close_approaches, t_start):
+    by_pair = {}
+    for event in events:
+        key = (event["object_1"]["number"], event["object_2"]["number"])
+        by_pair.setdefault(key, []).append(_tca_offset_s(event, t_start))
+
+    # Запас на то, что минимум плотной выборки лежит выше истинного минимума
+    missed = [
+        approach
+        for approach in close_approaches
+        if approach[3] <= THRESHOLD_KM - 0.5
+        and not any(abs(offset - approach[2]) <= 60.0 for offset in by_pair.get(approach[:2], ()))
+    ]
+    assert len(close_approaches) > 10
+    assert missed == []
+
+
+def test_screening_reports_true_minima(events, close_approaches, t_start):
+    assert len(events) > 10
+    approaches = {}
+    for first, second, offset_s, distance in close_approaches:
+        approaches.setdefault((first, second), []).append((offset_s, distance))
+
+    for event in events:
+        key = (event["object_1"]["number"], event["object_2"]["number"])
+        assert event["miss_distance_km"] <= THRESHOLD_KM
+        assert key in approaches
+        offset_s = _tca_offset_s(event, t_start)
+        # Уточненное сближение не дальше минимума плотной выборки рядом с ним
+        nearby = [
+            distance for dense_offset_s, distance in approaches[key] if abs(dense_offset_s - offset_s) <= 2.0
+        ]
+        assert nearby
+        assert event["miss_distance_km"] <= min(nearby) + 1e-3
+
+
+def test_events_are_sorted_and_unique(events, t_start):
+    distances = [event["miss_distance_km"] for event in events]
+    assert distances == sorted(distances)
+    keys = [(event["object_1"]["number"], event["object_2"]["number"], event["tca"]) for event in events]
+    assert len(set(keys)) == len(keys)
+    for event in events:
+        assert event["object_1"]["number"] < event["object_2"]["number"]
+        assert 0.0 <= _tca_offset_s(event, t_start) <= WINDOW_HOURS * 3600.0 + 1e-3
+
+
+def test_primary_screening_matches_all_pairs(tle_catalog, events, t_start):
+    primary = np.unique(
+        [tle_catalog.number.tolist().index(event["object_1"]["number"]) for event in events[::7]]
+        + [0, len(tle_catalog) - 1]
+    )
+    numbers = set(tle_catalog.number[primary].tolist())
+
+    primary_events = screen_conjunctions(
+        tle_catalog, t_start, WINDOW_HOURS, 60.0, THRESHOLD_KM, primary=primary
+    )
+
+    expected = [
+        event for event in events
+        if event["object_1"]["number"] in numbers or event["object_2"]["number"] in numbers
+    ]
+    assert len(expected) > 0
+    assert primary_events == expected
+
+
+def test_propagate_pairs_matches_scalar_sgp4(tle_catalog, t_start):
+    rng = np.random.default_rng(13)
+    first = rng.integers(0, len(tle_catalog), 500)
+    second = rng.integers(0, len(tle_catalog), 500)
+    first[:50] = 7  # один объект во многих парах
+    fraction = 0.25 + rng.uniform(0.0, 0.05, 500)
+    satrecs = get_catalog_satrecs(tle_catalog)
+    jd = float(t_start.whole)
+
+    position_1, position_2, relative_velocity = _propagate_pairs(satrecs, first, second, jd, fraction)
+
+    for k in range(len(first)):
+        _, expected_1, velocity_1 = satrecs[first[k]].sgp4(jd, fraction[k])
+        _, expected_2, velocity_2 = satrecs[second[k]].sgp4(jd, fraction[k])
+        np.testing.assert_array_equal(position_1[k], expected_1)
+        np.testing.assert_array_equal(position_2[k], expected_2)
+        np.testing.assert_array_equal(relative_velocity[k], np.subtract(velocity_1, velocity_2))
+
+
+def test_refine_tca_converges_to_sampled_minimum(tle_catalog, t_start, close_approaches):
+    approaches = [approach for approach in close_approaches if approach[3] <= THRESHOLD_KM][:40]
+    assert len(approaches) >= 20
+    index_of = {number: index for index, number in enumerate(tle_catalog.number.tolist())}
+    first = np.array([index_of[approach[0]] for approach in approaches])
+    second = np.array([index_of[approach[1]] for approach in approaches])
+    sampled_offsets = np.array([approach[2] for approach in approaches])
+
+    # Начальные оценки сдвинуты на десятки секунд, как у линейной модели на шаге сетки
+    rng = np.random.default_rng(17)
+    guesses = sampled_offsets + rng.uniform(-20.0, 20.0, len(approaches))
+    offsets, distance, relative_speed = refine_tca(tle_catalog, first, second, t_start, guesses, 60.0)
+
+    assert np.all(np.abs(offsets - sampled_offsets) <= DENSE_STEP_S)
+    assert np.all(distance <= np.array([approach[3] for approach in approaches]) + 1e-6)
+
+    # В уточненный момент расстояние минимально: соседние моменты дальше
+    satrecs = get_catalog_satrecs(tle_catalog)
+    jd, fraction = float(t_start.whole), float(t_start.tai_fraction - t_start._leap_seconds() / 86400.0)
+    for shift_s in (-0.05, 0.05):
+        position_1, position_2, _ = _propagate_pairs(
+            satrecs, first, second, jd, fraction + (offsets + shift_s) / 86400.0
+        )
+        assert np.all(np.linalg.norm(position_1 - position_2, axis=1) >= distance - 1e-9)
+    assert np.all((relative_speed > 0.0) & (relative_speed < 16.0))
@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+from satellite_tracker.corridor import (
+    find_corridor_intersections,
+    find_corridor_intersections_batch,
+    prefilter_corridor_candidates,
+)
+from satellite_tracker.satellite_cache import get_earth_satellite, ts
+
+
+def _box(latitude_deg, longitude_deg, radius_km, half_size_km):
+    latitude, longitude = np.radians(latitude_deg), np.radians(longitude_deg)
+    center = radius_km * np.array(
+        [np.cos(latitude) * np.cos(longitude), np.cos(latitude) * np.sin(longitude), np.sin(latitude)]
+    )
+    return center - half_size_km, center + half_size_km
+
+
+# Контейнеры в GCRS: у экватора, в плотном слое 550 км на разных широтах,
+# выше наклонения этого слоя, высоко над Землей и под поверхностью
+BOXES = [
+    _box(0.0, 0.0, 6928.0, 600.0),
+    _box(30.0, 120.0, 6928.0, 500.0),
+    _box(52.0, -40.0, 6928.0, 500.0),
+    _box(65.0, 10.0, 6900.0, 400.0),
+    _box(-75.0, 200.0, 6900.0, 600.0),
+    _box(10.0, 80.0, 12000.0, 3000.0),
+    _box(0.0, 0.0, 3000.0, 500.0),
+]
+
+
+@pytest.fixture(scope="module")
+def t_now(t_start):
+    return ts.tt_jd(t_start.tt + 0.3)
+
+
+@pytest.fixture(scope="module")
+def object_paths(tle_catalog, t_now):
+    """
+    Точки орбит объектов, которые проверял /takeoff_risk до векторизации:
+    поштучная пропагация EarthSatellite, объекты дальше 15000 км пропускаются.
+    """
+    paths = {}
+    utc = t_now.utc
+    for index, sat_data in enumerate(tle_catalog.objects):
+        satellite = get_earth_satellite(sat_data)
+        if np.linalg.norm(satellite.at(t_now).position.km) > 15000:
+            continue
+        period_minutes = (1 / (satellite.model.no_kozai * (1440.0 / (2 * np.pi)))) * 1440
+        times = ts.utc(utc.year, utc.month, utc.day, utc.hour, np.arange(0, period_minutes, 5) * 60 / 3600)
+        paths[index] = satellite.at(times).position.km.T
+    return paths
+
+
+@pytest.mark.parametrize("box", BOXES)
+def test_corridor_intersections_match_object_loop(tle_catalog, t_now, object_paths, box):
+    min_coords, max_coords = box
+    expected = [
+        index
+        for index, sat_path in object_paths.items()
+        if np.any(np.all((sat_path >= min_coords) & (sat_path <= max_coords), axis=1))
+    ]
+
+    found = find_corridor_intersections(tle_catalog, *box, t_now)
+    unfiltered = find_corridor_intersections(tle_catalog, *box, t_now, np.arange(len(tle_catalog)))
+
+    np.testing.assert_array_equal(found, expected)
+    np.testing.assert_array_equal(unfiltered, expected)
+
+
+@pytest.mark.parametrize("box", BOXES)
+def test_prefilter_keeps_every_intersecting_object(tle_catalog, t_now, box):
+    everything = find_corridor_intersections(tle_catalog, *box, t_now, np.arange(len(tle_catalog)))
+    assert np.isin(everything, prefilter_corridor_candidates(tle_catalog, *box)).all()
+
+
+def test_prefilter_discards_by_radius_and_latitude(tle_catalog):
+    shell_index = tle_catalog.shell_index
+    min_coords, max_coords = BOXES[3]
+    candidates = prefilter_corridor_candidates(tle_catalog, min_coords, max_coords)
+
+    # Плотный слой 53° не поднимается до широты контейнера, орбиты выше 2000 км
+    # не опускаются до него
+    assert not np.isin(np.flatnonzero(np.abs(tle_catalog.inclination - 53.0) < 1.0), candidates).any()
+    assert not np.isin(np.flatnonzero(shell_index.perigee_km > 2000.0), candidates).any()
+    assert len(candidates) < len(tle_catalog) // 2
+
+
+def test_batch_matches_single_boxes(tle_catalog, t_now):
+    min_coords = np.array([box[0] for box in BOXES])
+    max_coords = np.array([box[1] for box in BOXES])
+
+    batch = find_corridor_intersections_batch(tle_catalog, min_coords, max_coords, t_now)
+
+    assert len(batch) == len(BOXES)
+    for found, box in zip(batch, BOXES):
+        np.testing.assert_array_equal(found, find_corridor_intersections(tle_catalog, *box, t_now))
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from utils.cpa_calculator import calculate_cpa, calculate_cpa_batch
+
+
+@pytest.fixture(scope="module")
+def pairs():
+    """
+    Пары на околоземных орбитах, включая совпадающие скорости (нулевая
+    относительная скорость) и почти совпадающие (ниже порога 1e-9).
+    """
+    rng = np.random.default_rng(11)
+    count = 2000
+    pos1 = rng.normal(scale=7000.0, size=(count, 3))
+    pos2 = pos1 + rng.normal(scale=50.0, size=(count, 3))
+    vel1 = rng.normal(scale=7.5, size=(count, 3))
+    vel2 = rng.normal(scale=7.5, size=(count, 3))
+    vel2[:20] = vel1[:20]
+    vel2[20:40] = vel1[20:40] + 1e-6
+    return pos1, vel1, pos2, vel2
+
+
+def test_batch_matches_scalar(pairs):
+    t_cpa, distance = calculate_cpa_batch(*pairs)
+
+    expected = [calculate_cpa(*pair) for pair in zip(*pairs)]
+    np.testing.assert_allclose(t_cpa, [cpa["time"] for cpa in expected], rtol=1e-12, atol=1e-9)
+    np.testing.assert_allclose(distance, [cpa["distance"] for cpa in expected], rtol=1e-12, atol=1e-9)
+    assert np.all(t_cpa[:40] == 0.0)
+
+
+def test_batch_broadcasts_one_object_against_many(pairs):
+    pos1, vel1, pos2, vel2 = pairs
+
+    t_cpa, distance = calculate_cpa_batch(pos1[0], vel1[0], pos2, vel2)
+
+    expected = [calculate_cpa(pos1[0], vel1[0], p, v) for p, v in zip(pos2, vel2)]
+    np.testing.assert_allclose(t_cpa, [cpa["time"] for cpa in expected], rtol=1e-12, atol=1e-9)
+    np.testing.assert_allclose(distance, [cpa["distance"] for cpa in expected], rtol=1e-12, atol=1e-9)
+
+
+def test_batch_distance_is_minimum_of_linear_motion(pairs):
+    pos1, vel1, pos2, vel2 = (array[40:200] for array in pairs)
+
+    t_cpa, distance = calculate_cpa_batch(pos1, vel1, pos2, vel2)
+
+    for offset in (-1.0, 1.0):
+        t = t_cpa + offset
+        shifted = np.linalg.norm((pos1 - pos2) + t[:, np.newaxis] * (vel1 - vel2), axis=1)
+        assert np.all(shifted >= distance)
+
+
+def test_batch_single_pair_and_empty():
+    t_cpa, distance = calculate_cpa_batch([0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [10.0, 5.0, 0.0], [0.0, 0.0, 0.0])
+    np.testing.assert_allclose(t_cpa, [10.0])
+    np.testing.assert_allclose(distance, [5.0])
+
+    empty = np.empty((0, 3))
+    t_cpa, distance = calculate_cpa_batch(empty, empty, empty, empty)
+    assert t_cpa.shape == distance.shape == (0,)
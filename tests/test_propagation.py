@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from satellite_tracker.propagation import propagate_catalog
+from satellite_tracker.satellite_cache import get_earth_satellite, ts
+
+
+@pytest.mark.parametrize("frame", ["gcrs", "teme"])
+def test_propagate_catalog_matches_earth_satellite(tle_catalog, t_start, frame):
+    indices = np.arange(0, len(tle_catalog), 7)
+    t = ts.tt_jd(t_start.tt + np.linspace(-0.5, 1.5, 9))
+
+    positions, velocities, errors = propagate_catalog(tle_catalog, t, indices, frame=frame)
+
+    assert positions.shape == velocities.shape == (len(indices), len(t), 3)
+    assert not errors.any()
+    for row, index in enumerate(indices):
+        satellite = get_earth_satellite(tle_catalog.objects[index])
+        if frame == "gcrs":
+            state = satellite.at(t)
+            expected_positions, expected_velocities = state.position.km.T, state.velocity.km_per_s.T
+        else:
+            expected_positions, expected_velocities = satellite.model.sgp4_array(
+                *np.broadcast_arrays(t.whole, t.tai_fraction - t._leap_seconds() / 86400.0)
+            )[1:]
+        np.testing.assert_allclose(positions[row], expected_positions, rtol=0, atol=1e-6)
+        np.testing.assert_allclose(velocities[row], expected_velocities, rtol=0, atol=1e-9)
+
+
+def test_propagate_catalog_single_moment(tle_catalog, t_start):
+    positions, velocities, errors = propagate_catalog(tle_catalog, t_start)
+    assert positions.shape == velocities.shape == (len(tle_catalog), 1, 3)
+    assert errors.shape == (len(tle_catalog), 1)
+
+
+def test_propagate_catalog_empty_selection(tle_catalog, t_start):
+    positions, velocities, errors = propagate_catalog(tle_catalog, t_start, np.arange(0))
+    assert positions.shape == velocities.shape == (0, 1, 3)
+    assert errors.shape == (0, 1)
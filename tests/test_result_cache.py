@@ -0,0 +1,96 @@
+import pytest
+
+from api import result_cache
+from api.result_cache import DEFAULT_RESULT_CACHE_QUANTIZATION, ResultCache, quantize_params
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """
+    Управляемое время для проверки TTL.
+    """
+    now = [1000.0]
+    monkeypatch.setattr(result_cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_lru_evicts_least_recently_used(clock):
+    cache = ResultCache(max_entries=3, ttl_s=60.0)
+    for key in "abc":
+        cache.put(key, 1, key.upper())
+
+    assert cache.get("a", 1) == "A"  # "a" становится самой свежей записью
+    cache.put("d", 1, "D")
+
+    assert cache.get("b", 1) is None
+    assert [cache.get(key, 1) for key in "acd"] == ["A", "C", "D"]
+    assert (len(cache), cache.evictions) == (3, 1)
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = ResultCache(max_entries=10, ttl_s=60.0)
+    cache.put("a", 1, "A")
+
+    clock[0] += 59.0
+    assert cache.get("a", 1) == "A"
+    clock[0] += 1.0
+    assert cache.get("a", 1) is None
+    assert len(cache) == 0
+
+    # Повторное сохранение продлевает срок жизни
+    cache.put("a", 1, "A2")
+    clock[0] += 30.0
+    cache.put("a", 1, "A3")
+    clock[0] += 45.0
+    assert cache.get("a", 1) == "A3"
+
+
+def test_new_generation_invalidates_and_old_generation_is_ignored(clock):
+    cache = ResultCache(max_entries=10, ttl_s=60.0)
+    cache.put("a", 1, "A1")
+
+    assert cache.get("a", 2) is None
+    assert (len(cache), cache.generation, cache.invalidations) == (0, 2, 1)
+
+    # Результат, посчитанный по старому снимку, не сохраняется и не выдается
+    cache.put("a", 1, "A1")
+    assert cache.get("a", 1) is None
+    assert cache.get("a", 2) is None
+    cache.put("a", 2, "A2")
+    assert cache.get("a", 2) == "A2"
+
+
+def test_disabled_cache_stores_nothing(clock):
+    cache = ResultCache(max_entries=0, ttl_s=60.0)
+    cache.put("a", 1, "A")
+    assert cache.get("a", 1) is None
+    assert len(cache) == 0
+
+
+def test_stats_count_hits_and_misses(clock):
+    cache = ResultCache(max_entries=10, ttl_s=60.0)
+    assert cache.stats()["hit_ratio"] is None
+
+    cache.get("a", 1)
+    cache.put("a", 1, "A")
+    cache.get("a", 1)
+    cache.get("a", 1)
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"], stats["generation"]) == (2, 1, 1, 1)
+    assert stats["hit_ratio"] == pytest.approx(2 / 3, abs=1e-4)
+
+
+def test_quantize_params_rounds_only_configured_parameters():
+    params = {"lat": 45.92, "lon": 63.34, "altitude": 551.3, "inclination": 51.64, "A_rocket": 40.123}
+
+    quantized = quantize_params(params, DEFAULT_RESULT_CACHE_QUANTIZATION)
+
+    assert quantized["A_rocket"] == 40.123
+    for name, step in DEFAULT_RESULT_CACHE_QUANTIZATION.items():
+        if name in params:
+            assert abs(quantized[name] - params[name]) <= step / 2 + 1e-9
+            assert quantized[name] == pytest.approx(round(quantized[name] / step) * step, abs=1e-9)
+    # Близкие запросы попадают в один ключ
+    assert quantize_params({**params, "altitude": 551.31}, DEFAULT_RESULT_CACHE_QUANTIZATION) == quantized
+    assert params["lat"] == 45.92
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from satellite_tracker.orbit import calculate_orbit_congestion_by_altitude
+from satellite_tracker.shell_index import AltitudeShellIndex
+
+SHELLS = [
+    (0.0, 2000.0, 0.0, 180.0),
+    (540.0, 560.0, 0.0, 180.0),
+    (540.0, 560.0, 50.0, 55.0),
+    (500.0, 600.0, 97.0, 98.0),
+    (2000.0, 40000.0, 0.0, 60.0),
+    (700.0, 600.0, 0.0, 180.0),
+    (-100.0, 300.0, 0.0, 180.0),
+]
+
+
+@pytest.fixture(scope="module")
+def shell_index(tle_catalog):
+    return AltitudeShellIndex(tle_catalog)
+
+
+@pytest.mark.parametrize("shell", SHELLS)
+def test_select_and_count_match_full_scan(tle_catalog, shell_index, shell):
+    _, filtered = calculate_orbit_congestion_by_altitude(tle_catalog, *shell)
+    expected = sorted(sat_data["number"] for sat_data in filtered)
+
+    assert sorted(tle_catalog.number[shell_index.select(*shell)].tolist()) == expected
+    assert shell_index.count(*shell) == len(expected)
+
+
+def test_count_grid_matches_histogram(tle_catalog, shell_index):
+    min_altitudes = np.array([0.0, 300.0, 540.0, 545.0, 600.0, 2000.0])
+    max_altitudes = np.array([2000.0, 500.0, 560.0, 555.0, 700.0, 40000.0])
+    edges = np.array([0.0, 30.0, 53.0, 90.0, 97.5, 180.0])
+
+    grid = shell_index.count_grid(min_altitudes, max_altitudes, edges)
+
+    for i, (low, high) in enumerate(zip(min_altitudes, max_altitudes)):
+        # np.histogram делит наклонения так же: интервалы полуоткрыты, кроме последнего
+        inclination = tle_catalog.inclination[shell_index.select(low, high)]
+        assert grid[i].tolist() == np.histogram(inclination, edges)[0].tolist()
+
+
+@pytest.mark.parametrize("low, high", [(0.0, 300.0), (540.0, 560.0), (1000.0, 2000.0), (35000.0, 36000.0)])
+def test_count_crossing_matches_full_scan(shell_index, low, high):
+    crossing = (shell_index.perigee_km <= high) & (shell_index.apogee_km >= low)
+    assert shell_index.count_crossing(low, high) == np.count_nonzero(crossing)
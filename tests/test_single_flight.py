@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+
+from api.single_flight import SingleFlight
+
+
+def _counting_factory(calls, result, delay_s=0.01):
+    async def compute():
+        calls.append(result)
+        await asyncio.sleep(delay_s)
+        return result
+
+    return compute
+
+
+def test_concurrent_calls_with_same_key_share_one_computation():
+    async def scenario():
+        flight, calls = SingleFlight(), []
+        results = await asyncio.gather(
+            *(flight.run(("risk", 1), _counting_factory(calls, "a")) for _ in range(5)),
+            flight.run(("risk", 2), _counting_factory(calls, "b")),
+        )
+        return flight, calls, results
+
+    flight, calls, results = asyncio.run(scenario())
+    assert results == ["a"] * 5 + ["b"]
+    assert sorted(calls) == ["a", "b"]
+    assert (flight.started, flight.coalesced, len(flight)) == (2, 4, 0)
+
+
+def test_finished_key_is_computed_again():
+    async def scenario():
+        flight, calls = SingleFlight(), []
+        first = await flight.run("key", _counting_factory(calls, 1))
+        second = await flight.run("key", _counting_factory(calls, 1))
+        return calls, first, second
+
+    calls, first, second = asyncio.run(scenario())
+    assert (first, second) == (1, 1)
+    assert calls == [1, 1]
+
+
+def test_error_is_shared_and_not_cached():
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def scenario():
+        flight = SingleFlight()
+        results = await asyncio.gather(
+            *(flight.run("key", failing) for _ in range(3)), return_exceptions=True
+        )
+        return flight, results, await flight.run("key", _counting_factory([], "ok"))
+
+    flight, results, retried = asyncio.run(scenario())
+    assert all(isinstance(result, ValueError) for result in results)
+    assert retried == "ok"
+    assert flight.started == 2
+
+
+def test_cancelled_waiter_does_not_cancel_shared_computation():
+    async def scenario():
+        flight, calls = SingleFlight(), []
+        factory = _counting_factory(calls, "done", delay_s=0.05)
+        cancelled = asyncio.ensure_future(flight.run("key", factory))
+        waiting = asyncio.ensure_future(flight.run("key", factory))
+        await asyncio.sleep(0.01)
+        cancelled.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        return calls, await waiting
+
+    calls, result = asyncio.run(scenario())
+    assert result == "done"
+    assert calls == ["done"]
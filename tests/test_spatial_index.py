@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+
+from satellite_tracker.propagation import propagate_catalog
+from satellite_tracker.spatial_index import SpatialIndex
+
+
+@pytest.fixture(scope="module")
+def points():
+    """
+    Точки на сфере радиуса слоя 550 км со сгущениями, несколько NaN
+    (объекты с ошибкой SGP4) и отрицательные координаты по всем осям.
+    """
+    rng = np.random.default_rng(3)
+    directions = rng.normal(size=(3000, 3))
+    directions[:500] = directions[0] + rng.normal(scale=0.01, size=(500, 3))
+    points = 6928.0 * directions / np.linalg.norm(directions, axis=1, keepdims=True)
+    points[[10, 700, 2999]] = np.nan
+    return points
+
+
+@pytest.fixture(scope="module")
+def indices(points):
+    # Индексы каталога не совпадают с позициями в массиве
+    return np.arange(len(points)) * 3 + 11
+
+
+def _distances(points):
+    return np.linalg.norm(points[:, np.newaxis, :] - points[np.newaxis, :, :], axis=2)
+
+
+@pytest.fixture(scope="module")
+def point_distances(points):
+    return _distances(points)
+
+
+@pytest.mark.parametrize("cell_size_km", [25.0, 100.0, 400.0])
+@pytest.mark.parametrize("radius_km", [5.0, 50.0, 150.0])
+def test_query_pairs_matches_brute_force(points, indices, point_distances, cell_size_km, radius_km):
+    index = SpatialIndex(points, indices, cell_size_km)
+    pairs, distance = index.query_pairs(radius_km)
+
+    with np.errstate(invalid="ignore"):
+        first, second = np.nonzero(np.triu(point_distances <= radius_km, k=1))
+    expected = np.stack([indices[first], indices[second]], axis=1)
+
+    np.testing.assert_array_equal(pairs, expected)
+    np.testing.assert_allclose(distance, np.linalg.norm(points[first] - points[second], axis=1))
+
+
+@pytest.mark.parametrize("radius_km", [10.0, 100.0, 1000.0])
+def test_query_radius_matches_brute_force(points, indices, radius_km):
+    index = SpatialIndex(points, indices, 100.0)
+    queries = np.vstack([points[[0, 1, 600]], [[0.0, 0.0, 0.0]], -points[[1200]]])
+
+    found = index.query_radius(queries, radius_km)
+
+    with np.errstate(invalid="ignore"):
+        near = np.linalg.norm(points[:, np.newaxis, :] - queries[np.newaxis, :, :], axis=2) <= radius_km
+    np.testing.assert_array_equal(found, indices[np.flatnonzero(near.any(axis=1))])
+    np.testing.assert_array_equal(index.query_radius(queries[0], radius_km), indices[np.flatnonzero(near[:, 0])])
+
+
+@pytest.mark.parametrize(
+    "min_coords, max_coords",
+    [
+        ([-7000.0, -7000.0, -7000.0], [7000.0, 7000.0, 7000.0]),
+        ([0.0, 0.0, 0.0], [7000.0, 7000.0, 7000.0]),
+        ([-300.0, -7000.0, -300.0], [300.0, -6000.0, 300.0]),
+        ([6000.0, -50.0, -50.0], [6000.0, 50.0, 50.0]),
+    ],
+)
+def test_query_box_matches_brute_force(points, indices, min_coords, max_coords):
+    index = SpatialIndex(points, indices, 100.0)
+
+    found = index.query_box(min_coords, max_coords)
+
+    with np.errstate(invalid="ignore"):
+        inside = np.all((points >= min_coords) & (points <= max_coords), axis=1)
+    np.testing.assert_array_equal(found, indices[inside])
+
+
+def test_index_skips_invalid_positions(points, indices):
+    index = SpatialIndex(points, indices)
+    assert len(index) == len(points) - 3
+    assert not np.isin(indices[[10, 700, 2999]], index.query_box([-1e5] * 3, [1e5] * 3)).any()
+
+
+def test_from_catalog_uses_catalog_positions(tle_catalog, t_start):
+    selection = np.arange(0, len(tle_catalog), 2)
+    index = SpatialIndex.from_catalog(tle_catalog, t_start, selection)
+    positions, _, _ = propagate_catalog(tle_catalog, t_start, selection)
+
+    pairs, _ = index.query_pairs(200.0)
+
+    first, second = np.nonzero(np.triu(_distances(positions[:, 0, :]) <= 200.0, k=1))
+    np.testing.assert_array_equal(pairs, np.stack([selection[first], selection[second]], axis=1))
@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from utils.trajectory import TIME_STEP_S, get_cached_trajectory, integrate_trajectory
+
+LAUNCHES = [
+    (45.92, 63.34, 550.0, 51.6),
+    (28.52, -80.65, 400.0, 28.5),
+    (62.93, 40.58, 800.0, 97.5),
+    (5.24, -52.77, 300.0, 5.0),
+]
+
+
+@pytest.mark.parametrize("launch", LAUNCHES)
+@pytest.mark.parametrize("hours", [0.0, 5.5, 13.0, 24.0 * 3 + 19.0])
+def test_cached_trajectory_matches_fresh_integration(launch, hours):
+    launch_date = datetime.now(timezone.utc) + timedelta(hours=hours)
+
+    positions, velocities = get_cached_trajectory(*launch, launch_date=launch_date)
+    fresh_positions, fresh_velocities = integrate_trajectory(*launch, launch_date=launch_date)
+
+    assert positions.shape == fresh_positions.shape
+    np.testing.assert_allclose(positions, fresh_positions, rtol=0, atol=1e-3)
+    np.testing.assert_allclose(velocities, fresh_velocities, rtol=0, atol=1e-6)
+
+
+def test_itrs_velocities_are_relative_to_earth():
+    positions, velocities = get_cached_trajectory(*LAUNCHES[0], frame="itrs")
+
+    # Интегратор сначала обновляет скорость, затем положение: смещение за шаг
+    # определяется скоростью в конце шага. Без учета вращения Земли (ω x r)
+    # расхождение было бы порядка 0.5 км/с.
+    displacement_velocities = np.diff(positions, axis=0) / TIME_STEP_S
+    np.testing.assert_allclose(displacement_velocities, velocities[1:], rtol=0, atol=0.02)
+
+
+def test_reference_trajectory_is_pinned():
+    # Байконур, 2025-10-04 12:00 UTC, как в примере запроса /takeoff_risk. Значения
+    # получены с базисом восток-север от оси вращения Земли; с прежним базисом от
+    # полюса GCRS конечная точка отличалась на 16 км.
+    launch_date = datetime(2025, 10, 4, 12, 0, 0, tzinfo=timezone.utc)
+
+    positions, velocities = integrate_trajectory(45.96, 63.30, 550.0, 98.7, launch_date=launch_date)
+
+    assert len(positions) == 67
+    np.testing.assert_allclose(positions[0], [-1027.764467, -4318.197551, 4564.417451], rtol=0, atol=1e-3)
+    np.testing.assert_allclose(positions[33], [231.374019, -4637.374047, 4260.594423], rtol=0, atol=1e-3)
+    np.testing.assert_allclose(positions[-1], [3633.363938, -4903.299482, 3394.195311], rtol=0, atol=1e-3)
+    np.testing.assert_allclose(velocities[-1], [13.26659, 0.378046, -3.40292], rtol=0, atol=1e-5)
+
+    cached_positions, _ = get_cached_trajectory(45.96, 63.30, 550.0, 98.7, launch_date=launch_date)
+    np.testing.assert_allclose(cached_positions[-1], positions[-1], rtol=0, atol=1e-3)
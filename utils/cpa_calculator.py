@@ -45,4 +45,39 @@ def calculate_cpa(
     # Длина этого вектора и есть минимальное расстояние
     min_distance = np.linalg.norm(cpa_vector)
 
-    return {"time": t_cpa, "distance": min_distance}
\ No newline at end of file
+    return {"time": t_cpa, "distance": min_distance}
+
+
+def calculate_cpa_batch(
+    pos1: np.ndarray, vel1: np.ndarray, pos2: np.ndarray, vel2: np.ndarray
+):
+    """
+    Векторный вариант calculate_cpa для массива пар объектов.
+
+    Принимает массивы формы (K, 3) для K пар или один объект (3,) против
+    массива (N, 3) — формы согласуются по правилам broadcasting NumPy.
+    Скалярные произведения считаются через einsum, а случай нулевой
+    относительной скорости обрабатывается маской, без ветвлений в Python.
+
+    Возвращает:
+        tuple: Два массива формы (K,):
+            t_cpa (np.ndarray): Время до минимального сближения (в секундах); 0 для пар
+                                с нулевой относительной скоростью.
+            distance (np.ndarray): Минимальное расстояние сближения (в км).
+    """
+    relative_pos = np.atleast_2d(np.asarray(pos1, dtype=float) - np.asarray(pos2, dtype=float))
+    relative_vel = np.atleast_2d(np.asarray(vel1, dtype=float) - np.asarray(vel2, dtype=float))
+    relative_pos, relative_vel = np.broadcast_arrays(relative_pos, relative_vel)
+
+    vel_dot_vel = np.einsum("ij,ij->i", relative_vel, relative_vel)
+    pos_dot_vel = np.einsum("ij,ij->i", relative_pos, relative_vel)
+
+    # Для пар с нулевой относительной скоростью расстояние постоянно, время условно 0
+    moving = vel_dot_vel >= 1e-9
+    t_cpa = np.zeros_like(vel_dot_vel)
+    np.divide(-pos_dot_vel, vel_dot_vel, out=t_cpa, where=moving)
+
+    cpa_vector = relative_pos + t_cpa[:, np.newaxis] * relative_vel
+    distance = np.sqrt(np.einsum("ij,ij->i", cpa_vector, cpa_vector))
+
+    return t_cpa, distance
@@ -1,6 +1,8 @@
 import math
 import logging  # Добавили импорт
 
+import numpy as np
+
 logger = logging.getLogger(__name__)  # Создали логгер
 
 # Константы, используемые в формуле
@@ -85,6 +87,108 @@ def calculate_collision_financial_risk(
     }
 
 
+# Параметры статистической модели риска на участке выведения (/api/takeoff_risk)
+TAKEOFF_CORRIDOR_RADIUS_KM = 75  # Средний радиус для расчета объема коридора
+TAKEOFF_V_REL_KM_S = 10.0
+# Верхние границы вероятности для классов риска при выведении
+TAKEOFF_RISK_CLASS_THRESHOLDS = np.array([1e-7, 1e-6, 1e-5, 1e-4, 1e-3, 1e-2])
+TAKEOFF_RISK_CLASSES = [
+    "A+ (Minimal)",
+    "A (Very Low)",
+    "B (Low)",
+    "C (Moderate)",
+    "D (High)",
+    "E (Very High)",
+    "F (Extremely High)",
+]
+
+
+def calculate_takeoff_collision_risk(
+        N_objects,
+        trajectory_length_km,
+        ascent_time_s,
+        A_rocket,
+        C_total_loss,
+) -> dict:
+    """
+    Рассчитывает статистический риск столкновения на участке выведения по плотности
+    объектов в цилиндрическом коридоре вдоль траектории.
+
+    Все аргументы могут быть числами или массивами NumPy одной формы (по одному
+    элементу на вариант запуска), поэтому обзор множества вариантов считается
+    одним векторным вызовом.
+
+    Возвращает:
+        dict: Массивы 'corridor_volume_km3', 'collision_risk', 'financial_risk',
+        'insurance_premium' и список 'risk_class' той же длины.
+    """
+    N_objects = np.atleast_1d(np.asarray(N_objects, dtype=float))
+    corridor_volume_km3 = np.pi * (TAKEOFF_CORRIDOR_RADIUS_KM ** 2) * np.asarray(trajectory_length_km, dtype=float)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        density = N_objects / corridor_volume_km3
+    A_effective_km2 = np.asarray(A_rocket, dtype=float) / 1_000_000
+
+    expected_collisions = density * TAKEOFF_V_REL_KM_S * A_effective_km2 * np.asarray(ascent_time_s, dtype=float)
+    P_collision = 1.0 - np.exp(-expected_collisions)
+    financial_risk = P_collision * np.asarray(C_total_loss, dtype=float)
+
+    classes = np.searchsorted(TAKEOFF_RISK_CLASS_THRESHOLDS, P_collision, side="right")
+    return {
+        "corridor_volume_km3": np.atleast_1d(corridor_volume_km3),
+        "collision_risk": np.atleast_1d(P_collision),
+        "financial_risk": np.atleast_1d(financial_risk),
+        "insurance_premium": np.atleast_1d(financial_risk * INSURANCE_COEFFICIENT),
+        "risk_class": [TAKEOFF_RISK_CLASSES[index] for index in np.atleast_1d(classes)],
+    }
+
+
+def calculate_collision_financial_risk_batch(
+        N_objects,
+        H_upper,
+        H_lower,
+        V_rel: float,
+        A_effective: float,
+        T_years: float,
+        C_full: float,
+        D_lost: float,
+) -> dict:
+    """
+    Векторный вариант calculate_collision_financial_risk() для сетки орбит.
+
+    N_objects, H_upper и H_lower могут быть массивами NumPy любой совместимой
+    формы (например, количество объектов (A, I) и границы слоев (A, 1)).
+    Ячейки с нулевым или отрицательным объемом слоя получают NaN.
+
+    Возвращает:
+        dict: Массивы 'financial_risk', 'collision_risk', 'insurance_premium'
+        и вложенный список 'risk_class' той же формы.
+    """
+    N_objects = np.asarray(N_objects, dtype=float)
+    R_upper = R_EARTH_KM + np.asarray(H_upper, dtype=float)
+    R_lower = R_EARTH_KM + np.asarray(H_lower, dtype=float)
+    V_shell = (4 / 3) * np.pi * (R_upper ** 3 - R_lower ** 3)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        density = np.where(V_shell > 0, N_objects / V_shell, np.nan)
+    T_seconds = T_years * SEC_PER_YEAR
+    A_effective_km2 = A_effective / 1_000_000
+
+    expected_collisions = density * V_rel * A_effective_km2 * T_seconds
+    P_collision = 1.0 - np.exp(-expected_collisions)
+    financial_risk = P_collision * (C_full + D_lost)
+
+    # Те же границы, что в assign_risk_class(): сравнение строгое
+    classes = np.searchsorted(TAKEOFF_RISK_CLASS_THRESHOLDS, P_collision, side="left")
+    risk_class = np.array(TAKEOFF_RISK_CLASSES, dtype=object)[classes]
+    return {
+        "financial_risk": np.round(financial_risk, 2),
+        "collision_risk": P_collision,
+        "insurance_premium": np.round(financial_risk * INSURANCE_COEFFICIENT, 2),
+        "risk_class": risk_class.tolist(),
+    }
+
+
 def calculate_launch_collision_risk(
         N_conjunctions: int,
         launch_cylinder_radius_m: float,  # Изменен тип на float для точности
@@ -1,27 +1,50 @@
 import math
 import numpy as np
 from datetime import timedelta, timezone, datetime
+from functools import lru_cache
+from typing import Optional, Tuple
 from skyfield.api import load, EarthSatellite
+from skyfield.framelib import itrs
 from skyfield.toposlib import wgs84
 
 ts = load.timescale()
 R_EARTH_KM = 6371.0
 MU_KM3_PER_S2 = 398600.4418  # Гравитационный параметр Земли
+EARTH_ROTATION_RATE_RAD_S = 7.2921150e-5  # Угловая скорость вращения Земли
 
+# Параметры интегрирования участка выведения
+TIME_STEP_S = 10
+MAX_FLIGHT_TIME_S = 1500
+ESTIMATED_ASCENT_TIME_S = 600
 
-def generate_simplified_trajectory(
-        launch_lat,
-        launch_lon,
-        target_altitude_km,
-        inclination_deg,
-):
+# Кэш траекторий: размер и шаг квантования параметров запуска в ключе
+TRAJECTORY_CACHE_SIZE = 512
+LAUNCH_ANGLE_QUANTUM_DEG = 0.01
+ALTITUDE_QUANTUM_KM = 1.0
+
+
+def _earth_axis(t) -> np.ndarray:
     """
-    Генерирует эталонную траекторию запуска для определения ее геометрии.
-    Использует фиксированную дату, так как нам важен путь, а не точное время.
+    Ось вращения Земли (полюс ITRS) в GCRS на момент t.
+    """
+    # r_itrs = R · r_gcrs, поэтому полюс ITRS в GCRS — третья строка R
+    return itrs.rotation_at(t)[2]
+
+
+def _launch_conditions(
+        launch_lat: float,
+        launch_lon: float,
+        target_altitude_km: float,
+        inclination_deg: float,
+        launch_date: Optional[datetime] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, float, float]:
+    """
+    Начальное состояние ракеты (GCRS), ось вращения Земли (GCRS), направление
+    тяги в локальной системе (восток, север, вверх), ускорение от тяги и целевая
+    орбитальная скорость.
     """
-    time_step_s = 10
-    max_flight_time_s = 1500
-    launch_date = datetime.now(timezone.utc)  # Дата нужна только для расчетов skyfield
+    if launch_date is None:
+        launch_date = datetime.now(timezone.utc)  # Дата нужна только для расчетов skyfield
 
     t_launch = ts.from_datetime(launch_date)
     launch_site = wgs84.latlon(launch_lat, launch_lon, elevation_m=0)
@@ -39,49 +62,296 @@ def generate_simplified_trajectory(
     thrust_local = np.array([math.sin(azimuth_rad), math.cos(azimuth_rad), 0.35])
     thrust_local /= np.linalg.norm(thrust_local)
 
-    trajectory = []
-
-    current_pos_gcrs = launch_site_gcrs.position.km
-    current_vel_gcrs = launch_site_gcrs.velocity.km_per_s
+    start_pos_gcrs = launch_site_gcrs.position.km
+    start_vel_gcrs = launch_site_gcrs.velocity.km_per_s
+    earth_axis_gcrs = _earth_axis(t_launch)
 
     target_orbital_radius = R_EARTH_KM + target_altitude_km
     target_orbital_speed = math.sqrt(MU_KM3_PER_S2 / target_orbital_radius)
 
-    estimated_ascent_time = 600
-    required_delta_v = target_orbital_speed - np.linalg.norm(current_vel_gcrs)
-    thrust_acceleration_scalar = (required_delta_v / estimated_ascent_time) * 1.8
+    required_delta_v = target_orbital_speed - np.linalg.norm(start_vel_gcrs)
+    thrust_acceleration_scalar = (required_delta_v / ESTIMATED_ASCENT_TIME_S) * 1.8
+
+    return (
+        start_pos_gcrs, start_vel_gcrs, earth_axis_gcrs, thrust_local, thrust_acceleration_scalar,
+        target_orbital_speed,
+    )
 
-    time_s = 0
-    current_altitude = 0
-    current_speed = 0
 
-    while not (
-            current_altitude >= target_altitude_km and current_speed >= target_orbital_speed) and time_s < max_flight_time_s:
-        dist_from_center = np.linalg.norm(current_pos_gcrs)
+def integrate_trajectory(
+        launch_lat: float,
+        launch_lon: float,
+        target_altitude_km: float,
+        inclination_deg: float,
+        launch_date: Optional[datetime] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Интегрирует упрощенную траекторию выведения с шагом TIME_STEP_S.
+
+    Массивы результата выделяются заранее на максимальное время полета, а шаг
+    интегрирования считается на скалярах float без создания временных массивов
+    NumPy (локальный базис восток-север-вверх раскрыт покомпонентно).
+
+    Восток и север отсчитываются от оси вращения Земли, а не от полюса GCRS, поэтому
+    траектории для разных моментов запуска отличаются только поворотом вокруг этой оси.
+
+    Возвращает:
+        Tuple[np.ndarray, np.ndarray]: положения (T, 3) в км и скорости (T, 3) в км/с
+        (GCRS) после каждого шага.
+    """
+    start_pos, start_vel, earth_axis, thrust_local, thrust_acceleration, target_orbital_speed = _launch_conditions(
+        launch_lat, launch_lon, target_altitude_km, inclination_deg, launch_date
+    )
+
+    max_steps = math.ceil(MAX_FLIGHT_TIME_S / TIME_STEP_S)
+    positions = np.empty((max_steps, 3))
+    velocities = np.empty((max_steps, 3))
+
+    x, y, z = (float(value) for value in start_pos)
+    vx, vy, vz = (float(value) for value in start_vel)
+    axis_x, axis_y, axis_z = (float(value) for value in earth_axis)
+    thrust_east, thrust_north, thrust_up = (float(value) for value in thrust_local)
+    dt = TIME_STEP_S
+
+    current_altitude = 0.0
+    current_speed = 0.0
+    steps = 0
+    while steps < max_steps and not (
+            current_altitude >= target_altitude_km and current_speed >= target_orbital_speed):
+        dist_from_center = math.sqrt(x * x + y * y + z * z)
         current_altitude = dist_from_center - R_EARTH_KM
-        current_speed = np.linalg.norm(current_vel_gcrs)
+        current_speed = math.sqrt(vx * vx + vy * vy + vz * vz)
 
-        z_axis_gcrs = np.array([0, 0, 1])
-        up_vec = current_pos_gcrs / dist_from_center
-        east_vec = np.cross(z_axis_gcrs, up_vec)
-        east_vec /= np.linalg.norm(east_vec)
-        north_vec = np.cross(up_vec, east_vec)
-        local_to_gcrs_matrix = np.column_stack((east_vec, north_vec, up_vec))
-        thrust_vector_gcrs = local_to_gcrs_matrix @ thrust_local
+        # Локальный базис: вверх, восток = ось Земли x вверх, север = вверх x восток
+        up_x, up_y, up_z = x / dist_from_center, y / dist_from_center, z / dist_from_center
+        east_x = axis_y * up_z - axis_z * up_y
+        east_y = axis_z * up_x - axis_x * up_z
+        east_z = axis_x * up_y - axis_y * up_x
+        east_norm = math.sqrt(east_x * east_x + east_y * east_y + east_z * east_z)
+        east_x, east_y, east_z = east_x / east_norm, east_y / east_norm, east_z / east_norm
+        north_x = up_y * east_z - up_z * east_y
+        north_y = up_z * east_x - up_x * east_z
+        north_z = up_x * east_y - up_y * east_x
 
         gravity_accel_scalar = -MU_KM3_PER_S2 / (dist_from_center ** 2)
-        gravity_vector = up_vec * gravity_accel_scalar
+        ax = (east_x * thrust_east + north_x * thrust_north + up_x * thrust_up) * thrust_acceleration \
+            + up_x * gravity_accel_scalar
+        ay = (east_y * thrust_east + north_y * thrust_north + up_y * thrust_up) * thrust_acceleration \
+            + up_y * gravity_accel_scalar
+        az = (east_z * thrust_east + north_z * thrust_north + up_z * thrust_up) * thrust_acceleration \
+            + up_z * gravity_accel_scalar
+
+        vx += ax * dt
+        vy += ay * dt
+        vz += az * dt
+        x += vx * dt
+        y += vy * dt
+        z += vz * dt
 
-        thrust_acceleration_vector = thrust_vector_gcrs * thrust_acceleration_scalar
-        total_acceleration_vector = thrust_acceleration_vector + gravity_vector
+        positions[steps] = (x, y, z)
+        velocities[steps] = (vx, vy, vz)
+        steps += 1
 
-        current_vel_gcrs += total_acceleration_vector * time_step_s
-        current_pos_gcrs += current_vel_gcrs * time_step_s
+    return positions[:steps], velocities[:steps]
+
+
+def integrate_trajectories_batch(
+        launch_lats,
+        launch_lons,
+        target_altitudes_km,
+        inclinations_deg,
+        launch_date: Optional[datetime] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Интегрирует B траекторий выведения одновременно: параметры запуска
+    (массивы, согласуемые по broadcasting) задают ведущую ось пакета, и каждый
+    шаг интегрирования выполняется векторно для всех траекторий сразу.
+    Траектория, достигшая целевой орбиты, дальше не обновляется.
+
+    Возвращает:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: положения (B, T, 3) и скорости
+        (B, T, 3) в GCRS, где T — наибольшее число шагов в пакете (хвосты коротких
+        траекторий заполнены NaN), и число шагов каждой траектории (B,).
+    """
+    launch_lats, launch_lons, target_altitudes_km, inclinations_deg = (
+        np.ravel(value).astype(float)
+        for value in np.broadcast_arrays(launch_lats, launch_lons, target_altitudes_km, inclinations_deg)
+    )
+    if launch_date is None:
+        launch_date = datetime.now(timezone.utc)
+    batch = len(launch_lats)
 
-        trajectory.append({
-            "position": current_pos_gcrs.copy(),
-            "velocity": current_vel_gcrs.copy()
-        })
-        time_s += time_step_s
+    t_launch = ts.from_datetime(launch_date)
+    launch_site_gcrs = wgs84.latlon(launch_lats, launch_lons, elevation_m=0).at(t_launch)
+    pos = launch_site_gcrs.position.km.T.reshape(batch, 3).copy()
+    vel = launch_site_gcrs.velocity.km_per_s.T.reshape(batch, 3).copy()
+    earth_axis = _earth_axis(t_launch)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cos_azimuth_arg = np.cos(np.radians(inclinations_deg)) / np.cos(np.radians(launch_lats))
+    azimuth_rad = np.nan_to_num(np.arccos(np.clip(cos_azimuth_arg, -1.0, 1.0)))
+
+    thrust_local = np.stack([np.sin(azimuth_rad), np.cos(azimuth_rad), np.full(batch, 0.35)], axis=1)
+    thrust_local /= np.linalg.norm(thrust_local, axis=1, keepdims=True)
+
+    target_orbital_speed = np.sqrt(MU_KM3_PER_S2 / (R_EARTH_KM + target_altitudes_km))
+    required_delta_v = target_orbital_speed - np.linalg.norm(vel, axis=1)
+    thrust_acceleration = (required_delta_v / ESTIMATED_ASCENT_TIME_S) * 1.8
+
+    max_steps = math.ceil(MAX_FLIGHT_TIME_S / TIME_STEP_S)
+    positions = np.full((batch, max_steps, 3), np.nan)
+    velocities = np.full((batch, max_steps, 3), np.nan)
+    steps = np.zeros(batch, dtype=int)
+
+    current_altitude = np.zeros(batch)
+    current_speed = np.zeros(batch)
+    for step in range(max_steps):
+        active = ~((current_altitude >= target_altitudes_km) & (current_speed >= target_orbital_speed))
+        if not np.any(active):
+            break
+
+        dist_from_center = np.linalg.norm(pos, axis=1)
+        current_altitude = np.where(active, dist_from_center - R_EARTH_KM, current_altitude)
+        current_speed = np.where(active, np.linalg.norm(vel, axis=1), current_speed)
+
+        # Локальный базис: вверх, восток = ось Земли x вверх, север = вверх x восток
+        up_vec = pos / dist_from_center[:, np.newaxis]
+        east_vec = np.cross(earth_axis, up_vec)
+        east_vec /= np.linalg.norm(east_vec, axis=1, keepdims=True)
+        north_vec = np.cross(up_vec, east_vec)
 
-    return trajectory
\ No newline at end of file
+        thrust_vector = (
+            east_vec * thrust_local[:, 0:1] + north_vec * thrust_local[:, 1:2] + up_vec * thrust_local[:, 2:3]
+        )
+        gravity_accel_scalar = -MU_KM3_PER_S2 / dist_from_center ** 2
+        total_acceleration = (
+            thrust_vector * thrust_acceleration[:, np.newaxis] + up_vec * gravity_accel_scalar[:, np.newaxis]
+        )
+
+        vel = np.where(active[:, np.newaxis], vel + total_acceleration * TIME_STEP_S, vel)
+        pos = np.where(active[:, np.newaxis], pos + vel * TIME_STEP_S, pos)
+
+        positions[active, step] = pos[active]
+        velocities[active, step] = vel[active]
+        steps += active
+
+    longest = int(steps.max()) if batch else 0
+    return positions[:, :longest], velocities[:, :longest], steps
+
+
+def _step_rotations(launch_date: datetime, steps: int) -> np.ndarray:
+    """
+    Матрицы поворота GCRS -> ITRS (3, 3, T) на моменты после каждого шага интегрирования.
+    """
+    times = ts.from_datetime(launch_date) + np.arange(1, steps + 1) * TIME_STEP_S / 86400.0
+    return itrs.rotation_at(times).reshape(3, 3, steps)
+
+
+def _earth_rotation_velocity(positions_itrs: np.ndarray) -> np.ndarray:
+    """
+    Скорость ω x r точек, неподвижных относительно Земли (ITRS, км/с).
+    """
+    velocities = np.empty_like(positions_itrs)
+    velocities[:, 0] = -EARTH_ROTATION_RATE_RAD_S * positions_itrs[:, 1]
+    velocities[:, 1] = EARTH_ROTATION_RATE_RAD_S * positions_itrs[:, 0]
+    velocities[:, 2] = 0.0
+    return velocities
+
+
+def _quantize(value: float, quantum: float) -> float:
+    return round(round(value / quantum) * quantum, 6)
+
+
+@lru_cache(maxsize=TRAJECTORY_CACHE_SIZE)
+def _earth_fixed_trajectory(
+        launch_lat: float,
+        launch_lon: float,
+        target_altitude_km: float,
+        inclination_deg: float,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Интегрирует траекторию на текущий момент и переводит ее в земную систему
+    координат (ITRS): каждую точку на момент соответствующего шага, скорости —
+    относительно Земли. Массивы доступны только для чтения.
+    """
+    launch_date = datetime.now(timezone.utc)
+    positions, velocities = integrate_trajectory(
+        launch_lat, launch_lon, target_altitude_km, inclination_deg, launch_date
+    )
+
+    # r_itrs = R · r_gcrs, v_itrs = R · v_gcrs - ω x r_itrs
+    rotation = _step_rotations(launch_date, len(positions))
+    positions = np.einsum("ijt,tj->ti", rotation, positions)
+    velocities = np.einsum("ijt,tj->ti", rotation, velocities) - _earth_rotation_velocity(positions)
+    positions.flags.writeable = False
+    velocities.flags.writeable = False
+    return positions, velocities
+
+
+def get_cached_trajectory(
+        launch_lat: float,
+        launch_lon: float,
+        target_altitude_km: float,
+        inclination_deg: float,
+        launch_date: Optional[datetime] = None,
+        frame: str = "gcrs",
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Возвращает траекторию выведения из LRU-кэша.
+
+    Ключ кэша — параметры запуска, округленные до LAUNCH_ANGLE_QUANTUM_DEG и
+    ALTITUDE_QUANTUM_KM (траектория строится по округленным значениям). От времени
+    запуска траектория зависит только через поворот Земли вокруг своей оси (см.
+    integrate_trajectory), поэтому в кэше она хранится в земной системе координат,
+    а для нужного момента поворачивается в GCRS без повторного интегрирования и
+    совпадает с заново проинтегрированной.
+
+    Аргументы:
+        launch_date (datetime, optional): Момент запуска для frame='gcrs'; по умолчанию сейчас.
+        frame (str): 'gcrs' — траектория для момента запуска, 'itrs' — не зависящая
+            от времени траектория относительно Земли.
+
+    Возвращает:
+        Tuple[np.ndarray, np.ndarray]: положения (T, 3) в км и скорости (T, 3) в км/с
+        (для 'itrs' — скорости относительно Земли).
+    """
+    positions, velocities = _earth_fixed_trajectory(
+        _quantize(launch_lat, LAUNCH_ANGLE_QUANTUM_DEG),
+        _quantize(launch_lon, LAUNCH_ANGLE_QUANTUM_DEG),
+        _quantize(target_altitude_km, ALTITUDE_QUANTUM_KM),
+        _quantize(inclination_deg, LAUNCH_ANGLE_QUANTUM_DEG),
+    )
+    if frame == "itrs":
+        return positions, velocities
+    if frame != "gcrs":
+        raise ValueError(f"Неизвестная система координат: {frame}")
+
+    if launch_date is None:
+        launch_date = datetime.now(timezone.utc)
+    rotation = _step_rotations(launch_date, len(positions))
+    return (
+        np.einsum("jit,tj->ti", rotation, positions),
+        np.einsum("jit,tj->ti", rotation, velocities + _earth_rotation_velocity(positions)),
+    )
+
+
+def generate_simplified_trajectory(
+        launch_lat,
+        launch_lon,
+        target_altitude_km,
+        inclination_deg,
+):
+    """
+    Генерирует эталонную траекторию запуска для определения ее геометрии.
+    Использует текущую дату, так как нам важен путь, а не точное время.
+
+    Обертка над integrate_trajectory() для совместимости: возвращает список
+    словарей {'position', 'velocity'} по одному на шаг.
+    """
+    positions, velocities = integrate_trajectory(
+        launch_lat, launch_lon, target_altitude_km, inclination_deg
+    )
+    return [
+        {"position": position, "velocity": velocity}
+        for position, velocity in zip(positions, velocities)
+    ]